@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark: evtest Text-Parser vs. nativer evdev Reader (struct.iter_unpack)
+
+Verwendung:
+    python3 bench/bench_evdev_reader.py                     # synthetisches Fixture
+    python3 bench/bench_evdev_reader.py --fixture touch.evdev
+
+Ein echtes Fixture lässt sich mit 'sudo cat /dev/input/event15 > touch.evdev'
+aufnehmen (Strg+C nach einigen Gesten).
+"""
+
+import argparse
+import os
+import re
+import struct
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from touch_evdev import (EvdevReader, parse_evtest_line, format_evtest_line, assemble_frames,
+                         EVENT_FORMAT, EV_ABS, ABS_X, ABS_Y, ABS_MT_POSITION_X, ABS_MT_POSITION_Y)
+from touch_synth import synthesize
+
+
+def synthesize_events(gestures=200, points_per_gesture=150, rate_hz=200):
+    """Erzeuge Drag-Gesten wie ein Multi-Touch Controller (siehe touch_synth.py)"""
+    return synthesize(gestures, points_per_gesture, rate_hz)
+
+
+def legacy_line_loop(lines):
+    """Hot Path der bisherigen evtest-Schleife (Regex + Substring-Checks pro Zeile)"""
+    positions = 0
+    for line in lines:
+        current_time = time.time()
+        event_match = re.search(r'Event: time (\d+\.\d+)', line)
+        if event_match:
+            event_time = float(event_match.group(1))
+        else:
+            event_time = current_time
+        if "BTN_TOUCH" in line:
+            if "value 1" in line or "value 0" in line:
+                positions += 0
+        elif "ABS_MT_POSITION_X" in line or "ABS_X" in line:
+            match = re.search(r'value (\d+)', line)
+            if match:
+                positions += 1
+        elif "ABS_MT_POSITION_Y" in line or "ABS_Y" in line:
+            match = re.search(r'value (\d+)', line)
+            if match:
+                positions += 1
+    return positions
+
+
+def count_frames(frames):
+    """Konsumiere Frames und zähle Positions-Updates"""
+    positions = 0
+    for event_time, events in frames:
+        for ev_type, code, value in events:
+            if ev_type == EV_ABS and code in (ABS_X, ABS_Y, ABS_MT_POSITION_X, ABS_MT_POSITION_Y):
+                positions += 1
+    return positions
+
+
+def evtest_parser(lines):
+    """evtest-Fallback: Zeile → Event-Tupel → Frames"""
+    return count_frames(assemble_frames(e for e in map(parse_evtest_line, lines) if e))
+
+
+def best_of(func, repeat):
+    """Kleinste Laufzeit aus mehreren Durchläufen"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--fixture', help='Rohe input_event Aufnahme (z.B. von /dev/input/eventN)')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix="bench_evdev_")
+    fixture = args.fixture
+    if fixture:
+        with open(fixture, 'rb') as f:
+            data = f.read()
+        data = data[:len(data) - len(data) % struct.calcsize(EVENT_FORMAT)]
+        events = list(struct.iter_unpack(EVENT_FORMAT, data))
+    else:
+        events = synthesize_events()
+        fixture = os.path.join(tmp_dir, "synthetic.evdev")
+        with open(fixture, 'wb') as f:
+            f.write(b''.join(struct.pack(EVENT_FORMAT, *e) for e in events))
+
+    lines = [format_evtest_line(e) for e in events]
+
+    def run_evdev():
+        reader = EvdevReader(fixture)
+        try:
+            return count_frames(reader.frames())
+        finally:
+            reader.close()
+
+    results = [
+        ("evtest Legacy-Schleife", best_of(lambda: legacy_line_loop(lines), args.repeat)),
+        ("evtest Parser (Fallback)", best_of(lambda: evtest_parser(lines), args.repeat)),
+        ("evdev struct.iter_unpack", best_of(run_evdev, args.repeat)),
+    ]
+
+    print(f"Fixture: {fixture} ({len(events):,} Events, {sum(map(len, lines)):,} Bytes als evtest-Text)")
+    baseline = results[0][1]
+    for name, elapsed in results:
+        rate = len(events) / elapsed if elapsed > 0 else float('inf')
+        print(f"  {name:26} {elapsed * 1000:8.1f}ms  {rate:12,.0f} Events/s  {baseline / elapsed:5.1f}x")
+
+    if not args.fixture:
+        os.remove(fixture)
+    os.rmdir(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Punkt-Kodierung - JSON im Bash-Script vs. .trec (raw, varint, zlib)
+
+Schreibt eine synthetische Aufnahme (Drags mit Punkten alle paar ms, dazu Taps)
+in allen Darstellungen und misst Dateigröße, Bytes pro Punkt und Ladezeit:
+    do_timed_drag   JSON-Tripel pro Drag ('[[812, 431, 37], ...]'), wie ältere Recordings
+    do_fast_drag    flache Zahlenliste (aktueller Bash-Export)
+    trec raw        int32-Spalten per mmap
+    trec varint     Zig-Zag-Delta-Varints (touch_codec)
+    trec zlib       varint + zlib
+Laden = load_recording bis zu den Spalten, Plan = zusätzlich compile_plan
+(das, was der Player vor dem ersten Durchlauf tut).
+
+Verwendung:
+    python3 bench/bench_point_codec.py
+    python3 bench/bench_point_codec.py --drags 2000 --points 300 --runs 5
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from touch_format import RecordingBuilder, export_script, write_trec, load_recording
+from touch_replay import compile_plan
+from bench_script_drag import META, legacy_script
+
+
+def build_recording(drags, points, seed=1):
+    """drags Drags (Kreisbögen mit Jitter, 3-12ms Punktabstand) im Wechsel mit Taps"""
+    rng = random.Random(seed)
+    builder = RecordingBuilder(dict(META))
+    for d in range(drags):
+        cx, cy = rng.randint(300, 1600), rng.randint(300, 800)
+        radius = rng.randint(50, 250)
+        angle = rng.random() * math.tau
+        t = 0
+        path = []
+        for i in range(points):
+            path.append([int(cx + radius * math.cos(angle + i * 0.02)) + rng.randint(-1, 1),
+                         int(cy + radius * math.sin(angle + i * 0.02)) + rng.randint(-1, 1), t])
+            t += rng.randint(3, 12)
+        builder.add_drag(rng.randint(100, 1500), path)
+        builder.add_tap(rng.randint(100, 800), rng.randint(0, 1919), rng.randint(0, 1079), rng.randint(40, 120))
+    return builder.build()
+
+
+def best_of(runs, func):
+    """Bestes Ergebnis aus runs Läufen in Sekunden"""
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def load(path):
+    recording = load_recording(path)
+    recording.close()
+
+
+def load_and_compile(path):
+    recording = load_recording(path)
+    try:
+        compile_plan(recording)
+    finally:
+        recording.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--drags', type=int, default=500)
+    parser.add_argument('--points', type=int, default=200, help='Punkte pro Drag')
+    parser.add_argument('--runs', type=int, default=3, help='Läufe pro Variante (bester zählt)')
+    args = parser.parse_args()
+
+    recording = build_recording(args.drags, args.points)
+    total_points = recording.point_count
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fast_path = os.path.join(tmp, 'fast.sh')
+        json_path = os.path.join(tmp, 'json.sh')
+        export_script(recording, fast_path)
+        with open(fast_path) as f:
+            content = f.read()
+        with open(json_path, 'w') as f:
+            f.write(legacy_script(content))
+
+        variants = [('do_timed_drag', json_path), ('do_fast_drag', fast_path)]
+        for packing in ('raw', 'varint', 'zlib'):
+            path = os.path.join(tmp, f'{packing}.trec')
+            write_trec(path, recording, packing)
+            variants.append((f'trec {packing}', path))
+
+        # Alle Varianten müssen dieselben Punkte liefern
+        reference = compile_plan(recording)
+        for name, path in variants:
+            loaded = load_recording(path)
+            try:
+                plan = compile_plan(loaded)
+            finally:
+                loaded.close()
+            if plan.columns() != reference.columns():
+                sys.exit(f"{name}: Plan weicht von der Aufnahme ab")
+
+        results = []
+        for name, path in variants:
+            size = os.path.getsize(path)
+            results.append((name, size, best_of(args.runs, lambda: load(path)),
+                            best_of(args.runs, lambda: load_and_compile(path))))
+
+    print(f"{args.drags} Drags x {args.points} Punkte + {args.drags} Taps = {total_points} Punkte, "
+          f"bester von {args.runs} Läufen")
+    print(f"{'Variante':<15} {'Größe':>10} {'Bytes/Punkt':>12} {'Laden':>10} {'Plan':>10}")
+    for name, size, load_time, plan_time in results:
+        print(f"{name:<15} {size / 1024:>8.1f}KB {size / total_points:>12.2f} "
+              f"{load_time * 1000:>8.1f}ms {plan_time * 1000:>8.1f}ms")
+    json_size = results[0][1]
+    print()
+    for name, size, load_time, _ in results[2:]:
+        print(f"{name}: {json_size / size:.1f}x kleiner als do_timed_drag, "
+              f"Laden {results[0][2] / max(load_time, 1e-9):.0f}x schneller")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Durchsatz von record_touches mit synthetischem Input
+
+Jedes Szenario läuft in einem eigenen Prozess (saubere Peak-RSS) und speist
+den Recorder entweder mit evtest-Text über eine Pipe oder mit rohen
+input_event Records aus einer Fake-Device-Datei (bzw. FIFO bei --pace).
+Gemessen werden Events/s, Verarbeitungszeit pro Event und Frame
+(p50/p95/p99/max), Peak-Speicher und Größe der Ausgabe.
+
+Verwendung:
+    python3 bench/bench_recorder.py                      # Standard-Matrix, JSON nach bench/results/
+    python3 bench/bench_recorder.py --quick
+    python3 bench/bench_recorder.py --input evdev --contacts 1,5 --rates 200,1000
+    python3 bench/bench_recorder.py --compare bench/results/alt.json   # Regressionen markieren
+"""
+
+import argparse
+import importlib.util
+import itertools
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from array import array
+from contextlib import redirect_stdout
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+from touch_synth import synthesize, encode_evdev, SHAPES
+from touch_stats import percentile
+from touch_format import read_trec_info
+
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+SUITE_VERSION = 1
+
+# Kennzahlen für --compare: (Schlüssel, True wenn größer besser)
+COMPARE_METRICS = (
+    ('events_per_sec', True),
+    ('event_us_p99', False),
+    ('frame_us_p99', False),
+    ('peak_rss_kb', False),
+    ('output_bytes', False),
+)
+
+
+def load_recorder_module():
+    """smooth-touch-recorder.py als Modul laden (Dateiname mit Bindestrich)"""
+    spec = importlib.util.spec_from_file_location('smooth_touch_recorder',
+                                                  os.path.join(REPO_DIR, 'smooth-touch-recorder.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def scenario_name(s):
+    name = f"{s['input']}-{s['shape']}-{s['contacts']}c-{int(s['rate'])}hz"
+    if s['pace']:
+        name += f"-pace{s['pace']:g}"
+    return name
+
+
+def timed_frames(frames, frame_times, event_times):
+    """Zeit zwischen Ausgabe eines Frames und Anforderung des nächsten = Verarbeitung im Recorder"""
+    clock = time.perf_counter
+    for frame in frames:
+        count = len(frame[-1]) or 1
+        start = clock()
+        yield frame
+        elapsed = clock() - start
+        frame_times.append(elapsed)
+        event_times.append(elapsed / count)
+
+
+def run_scenario(scenario, work_dir):
+    """Ein Szenario im aktuellen Prozess ausführen und Messwerte liefern"""
+    recorder_module = load_recorder_module()
+    from touch_evdev import EvdevReader, EvtestReader
+
+    events = synthesize(scenario['gestures'], scenario['points'], scenario['rate'],
+                        scenario['contacts'], scenario['shape'], scenario['gap_ms'])
+    synth_args = [sys.executable, os.path.join(BENCH_DIR, 'touch_synth.py'),
+                  '--gestures', str(scenario['gestures']), '--points', str(scenario['points']),
+                  '--rate', str(scenario['rate']), '--contacts', str(scenario['contacts']),
+                  '--shape', scenario['shape'], '--gap-ms', str(scenario['gap_ms']),
+                  '--pace', str(scenario['pace'])]
+    if scenario['pace']:
+        synth_args.append('--now')  # Kernel-artige Zeitstempel, damit der Capture-Lag messbar ist
+
+    frame_times = array('d')
+    event_times = array('d')
+    feeder = None
+    fixture = os.path.join(work_dir, 'input.evdev')
+    if scenario['input'] == 'evdev':
+        if scenario['pace']:
+            os.mkfifo(fixture)
+            feeder = subprocess.Popen(synth_args + ['--format', 'evdev', '--output', fixture])
+        else:
+            with open(fixture, 'wb') as f:
+                f.write(encode_evdev(events))
+
+    class TimedEvdevReader(EvdevReader):
+        def frames(self):
+            return timed_frames(super().frames(), frame_times, event_times)
+
+    class TimedEvtestReader(EvtestReader):
+        def frames(self):
+            return timed_frames(super().frames(), frame_times, event_times)
+
+    def open_source(device_path, backend="auto"):
+        if scenario['input'] == 'evdev':
+            return TimedEvdevReader(fixture)
+        return TimedEvtestReader(device_path, synth_args + ['--format', 'evtest'])
+
+    recorder_module.open_event_source = open_source
+    recorder = recorder_module.PrecisionTouchRecorder()
+    recorder.record_dir = os.path.join(work_dir, 'out')
+    os.makedirs(recorder.record_dir)
+    recorder.selected_monitor = 'BENCH'
+    recorder.monitors = {'BENCH': {'width': 1920, 'height': 1200, 'x': 0, 'y': 0}}
+    recorder.quiet = not scenario['live']
+    recorder.countdown = 0
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        recorder.record_touches(0, 'bench', debug_mode=scenario['debug'])
+    elapsed = time.perf_counter() - start
+    rss_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if feeder is not None:
+        feeder.wait()
+
+    output_bytes = 0
+    timing = {}
+    for entry in os.scandir(recorder.record_dir):
+        output_bytes += entry.stat().st_size
+        if entry.name.endswith('.trec'):
+            timing = read_trec_info(entry.path).meta.get('timing', {})
+    frame_us = sorted(v * 1e6 for v in frame_times)
+    event_us = sorted(v * 1e6 for v in event_times)
+    return {
+        'name': scenario_name(scenario),
+        'scenario': scenario,
+        'events': len(events),
+        'frames': len(frame_times),
+        'elapsed_s': elapsed,
+        'events_per_sec': len(events) / elapsed if elapsed > 0 else 0.0,
+        'processing_s': sum(frame_times),
+        'event_us_p50': percentile(event_us, 50),
+        'event_us_p95': percentile(event_us, 95),
+        'event_us_p99': percentile(event_us, 99),
+        'event_us_max': event_us[-1] if event_us else 0.0,
+        'frame_us_p50': percentile(frame_us, 50),
+        'frame_us_p99': percentile(frame_us, 99),
+        'frame_us_max': frame_us[-1] if frame_us else 0.0,
+        'peak_rss_kb': rss_peak,
+        'rss_growth_kb': rss_peak - rss_before,
+        'output_bytes': output_bytes,
+        'timing': timing,
+    }
+
+
+def run_isolated(scenario):
+    """Szenario in einem Kindprozess ausführen (Peak-RSS pro Szenario)"""
+    work_dir = tempfile.mkdtemp(prefix='bench_recorder_')
+    result_file = os.path.join(work_dir, 'result.json')
+    try:
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--run-one', json.dumps(scenario),
+                               '--result-file', result_file, '--work-dir', work_dir],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if proc.returncode != 0 or not os.path.exists(result_file):
+            return {'name': scenario_name(scenario), 'scenario': scenario,
+                    'error': proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"}
+        with open(result_file) as f:
+            return json.load(f)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def git_commit():
+    try:
+        result = subprocess.run(['git', '-C', REPO_DIR, 'rev-parse', '--short', 'HEAD'],
+                                capture_output=True, text=True)
+        dirty = subprocess.run(['git', '-C', REPO_DIR, 'status', '--porcelain', '--untracked-files=no'],
+                               capture_output=True, text=True).stdout.strip()
+        return result.stdout.strip() + ('-dirty' if dirty else '') if result.returncode == 0 else None
+    except OSError:
+        return None
+
+
+def build_scenarios(args):
+    """Kreuzprodukt aus Eingabe, Form, Kontakten und Rate"""
+    scenarios = []
+    for input_kind, shape, contacts, rate in itertools.product(
+            args.input.split(','), args.shapes.split(','),
+            (int(v) for v in args.contacts.split(',')), (float(v) for v in args.rates.split(','))):
+        if shape == 'pinch' and contacts < 2:
+            continue
+        scenarios.append({
+            'input': input_kind, 'shape': shape, 'contacts': contacts, 'rate': rate,
+            'gestures': args.gestures, 'points': args.points, 'gap_ms': args.gap_ms,
+            'pace': args.pace, 'live': args.live, 'debug': args.debug,
+        })
+    return scenarios
+
+
+def compare(results, baseline_file, threshold):
+    """Abweichungen gegenüber einer früheren Ergebnisdatei; liefert Anzahl Regressionen"""
+    with open(baseline_file) as f:
+        baseline = {r['name']: r for r in json.load(f)['results'] if 'error' not in r}
+    regressions = 0
+    print(f"\nVergleich mit {baseline_file} (Schwelle {threshold:.0%}):")
+    for result in results:
+        old = baseline.get(result['name'])
+        if old is None or 'error' in result:
+            continue
+        changes = []
+        for key, higher_is_better in COMPARE_METRICS:
+            if not old.get(key):
+                continue
+            change = (result[key] - old[key]) / old[key]
+            worse = -change if higher_is_better else change
+            marker = ' ❗' if worse > threshold else ''
+            regressions += bool(marker)
+            changes.append(f"{key} {change:+.1%}{marker}")
+        print(f"  {result['name']:36} " + ', '.join(changes))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--gestures', type=int, default=100, help='Gesten pro Szenario')
+    parser.add_argument('--points', type=int, default=150, help='Frames pro Geste')
+    parser.add_argument('--gap-ms', type=int, default=300, help='Pause zwischen Gesten')
+    parser.add_argument('--contacts', default='1,2,5', help='Kontakte pro Geste, kommagetrennt')
+    parser.add_argument('--input', default='evdev,evtest', help='evdev (Fake-Device-Datei), evtest (Text über Pipe)')
+    parser.add_argument('--shapes', default='circle,pinch', help=f"Kommagetrennt: {', '.join(SHAPES)}")
+    parser.add_argument('--rates', default='200,1000', help='Frame-Raten in Hz, kommagetrennt')
+    parser.add_argument('--pace', type=float, default=0.0,
+                        help='Eingabe mit Zeitstempeln einspeisen (1.0 = Echtzeit, 0 = maximaler Durchsatz)')
+    parser.add_argument('--live', action='store_true', help='Statuszeile aktiv lassen (Standard: --quiet)')
+    parser.add_argument('--debug', action='store_true', help='Debug-NDJSON mitschreiben')
+    parser.add_argument('--quick', action='store_true', help='Kleine Matrix für schnelle Checks')
+    parser.add_argument('--output', help='Ergebnis-JSON (Standard: bench/results/recorder_<zeit>_<commit>.json)')
+    parser.add_argument('--compare', help='Frühere Ergebnisdatei zum Vergleich')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Regressions-Schwelle (Standard: 10%%)')
+    parser.add_argument('--run-one', help=argparse.SUPPRESS)
+    parser.add_argument('--result-file', help=argparse.SUPPRESS)
+    parser.add_argument('--work-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        result = run_scenario(json.loads(args.run_one), args.work_dir)
+        with open(args.result_file, 'w') as f:
+            json.dump(result, f)
+        return 0
+
+    if args.quick:
+        args.input, args.shapes, args.contacts, args.rates, args.gestures = 'evdev,evtest', 'circle', '1,2', '200', 20
+
+    scenarios = build_scenarios(args)
+    commit = git_commit()
+    print(f"Recorder-Benchmark: {len(scenarios)} Szenarien, Commit {commit or '?'}")
+    print(f"  {'Szenario':36} {'Events':>9} {'Events/s':>12} {'µs/Ev p50':>10} {'p99':>8} "
+          f"{'Frame p99':>10} {'RSS MB':>7} {'Output':>9}")
+    results = []
+    for scenario in scenarios:
+        result = run_isolated(scenario)
+        results.append(result)
+        if 'error' in result:
+            print(f"  {result['name']:36} FEHLER: {result['error']}")
+            continue
+        print(f"  {result['name']:36} {result['events']:9,} {result['events_per_sec']:12,.0f} "
+              f"{result['event_us_p50']:10.1f} {result['event_us_p99']:8.1f} {result['frame_us_p99']:10.1f} "
+              f"{result['peak_rss_kb'] / 1024:7.1f} {result['output_bytes'] / 1024:8.0f}K")
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"recorder_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{commit or 'nogit'}.json")
+    with open(output, 'w') as f:
+        json.dump({
+            'suite': 'recorder',
+            'version': SUITE_VERSION,
+            'commit': commit,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results,
+        }, f, indent=2)
+    print(f"\nErgebnisse: {output}")
+
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
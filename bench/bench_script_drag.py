@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Drag-Replay im Bash-Script - python3 pro Drag vs. do_fast_drag
+
+Exportiert eine synthetische Aufnahme zweimal: mit der bisherigen
+do_timed_drag-Funktion (python3 + bash pro Drag, ein xdotool pro Punkt) und
+mit do_fast_drag (eine xdotool-Kette pro Drag). xdotool und xrandr werden
+durch Stubs ersetzt, alle Punkt-Abstände sind 0 ms - gemessen wird also nur
+der Overhead, den die Script-Funktionen selbst verursachen.
+
+Verwendung:
+    python3 bench/bench_script_drag.py
+    python3 bench/bench_script_drag.py --drags 50 --points 40 --runs 5
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from touch_format import RecordingBuilder, export_script
+
+# Bisherige Funktionen aus dem Script-Header (vor do_fast_drag)
+LEGACY_FUNCTIONS = r'''# High precision sleep function
+sleep_ms() {
+    local ms=$1
+    if [ $ms -gt 0 ]; then
+        sleep $(echo "scale=6; $ms/1000" | bc)
+    fi
+}
+
+# Timed drag with precise movement points
+do_timed_drag() {
+    local points="$1"  # JSON array of [x, y, time_ms] points
+
+    # Parse JSON und erstelle Arrays
+    echo "$points" | python3 -c "
+import sys, json
+points = json.loads(sys.stdin.read())
+if len(points) < 2:
+    print('Error: Need at least 2 points for drag')
+    sys.exit(1)
+
+# Start point
+x0, y0, t0 = points[0]
+print(f'xdotool mousemove {x0 + $MONITOR_X} {y0 + $MONITOR_Y}')
+print(f'xdotool mousedown 1')
+
+# Move through points with precise timing
+for i in range(1, len(points)):
+    x, y, t = points[i]
+    delay = t - points[i-1][2]
+    if delay > 0:
+        print(f'sleep_ms {delay}')
+    print(f'xdotool mousemove {x + $MONITOR_X} {y + $MONITOR_Y}')
+
+# Release
+print(f'xdotool mouseup 1')
+" | bash
+}
+
+'''
+
+META = {'monitor': 'BENCH', 'width': 1920, 'height': 1080, 'monitor_x': 0, 'monitor_y': 0,
+        'device': 'bench', 'recorded_at': '', 'touch_max_x': 16000, 'touch_max_y': 9600}
+
+
+def build_recording(drags, points):
+    """drags Drags mit je points Punkten ohne Pausen"""
+    builder = RecordingBuilder(dict(META))
+    for d in range(drags):
+        builder.add_drag(0, [[100 + i * 5, 100 + d % 500, 0] for i in range(points)])
+    return builder.build()
+
+
+def legacy_script(content):
+    """Aktuellen Export in die bisherige Form (JSON + python3 pro Drag) umschreiben"""
+    start = content.index("# High precision sleep function")
+    end = content.index("# Key press")
+    content = content[:start] + LEGACY_FUNCTIONS + content[end:]
+
+    def to_json(match):
+        values = [int(v) for v in match.group(1).split()]
+        return "do_timed_drag '" + json.dumps([values[i:i + 3] for i in range(0, len(values), 3)]) + "'"
+
+    return re.sub(r"^do_fast_drag ((?:-?\d+ ?)+)$", to_json, content, flags=re.M)
+
+
+def write_stubs(directory):
+    """xdotool (no-op) und xrandr (passender Monitor) als Stubs"""
+    stubs = {
+        'xdotool': '#!/bin/sh\nexit 0\n',
+        'xrandr': f"#!/bin/sh\necho \"{META['monitor']} connected {META['width']}x{META['height']}+0+0\"\n",
+    }
+    for name, body in stubs.items():
+        path = os.path.join(directory, name)
+        with open(path, 'w') as f:
+            f.write(body)
+        os.chmod(path, 0o755)
+
+
+def run_script(path, env, runs):
+    """Bestes Ergebnis aus runs Läufen in Sekunden"""
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(['bash', path], env=env, stdout=subprocess.DEVNULL, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--drags', type=int, default=30)
+    parser.add_argument('--points', type=int, default=30, help='Punkte pro Drag')
+    parser.add_argument('--runs', type=int, default=3, help='Läufe pro Variante (bester zählt)')
+    args = parser.parse_args()
+
+    for tool in ('bash', 'python3'):
+        if not shutil.which(tool):
+            sys.exit(f"{tool} nicht gefunden")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_stubs(tmp)
+        env = dict(os.environ, PATH=tmp + os.pathsep + os.environ.get('PATH', ''))
+
+        empty_path = os.path.join(tmp, 'empty.sh')
+        fast_path = os.path.join(tmp, 'fast.sh')
+        legacy_path = os.path.join(tmp, 'legacy.sh')
+        export_script(build_recording(0, args.points), empty_path)
+        export_script(build_recording(args.drags, args.points), fast_path)
+        with open(fast_path) as f:
+            content = f.read()
+        with open(legacy_path, 'w') as f:
+            f.write(legacy_script(content))
+
+        baseline = run_script(empty_path, env, args.runs)
+        results = {}
+        for name, path in (('python3 pro Drag', legacy_path), ('do_fast_drag', fast_path)):
+            total = run_script(path, env, args.runs)
+            results[name] = (total, (total - baseline) / max(1, args.drags))
+
+    print(f"{args.drags} Drags x {args.points} Punkte, Stub-xdotool, bester von {args.runs} Läufen")
+    print(f"{'Variante':<20} {'gesamt':>10} {'pro Drag':>12}")
+    for name, (total, per_drag) in results.items():
+        print(f"{name:<20} {total * 1000:>8.1f}ms {per_drag * 1000:>10.2f}ms")
+    legacy, fast = results['python3 pro Drag'][1], results['do_fast_drag'][1]
+    if fast > 0:
+        print(f"\nOverhead pro Drag: {legacy / fast:.1f}x kleiner ({(legacy - fast) * 1000:.2f}ms gespart)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark: StreamingSimplifier bei langen Gesten - Fehler gegen die Rohpunkte
+
+Speist synthetische Drags mit 200 Hz (alle 5 ms ein Punkt, wie der Recorder
+sie bekommt) in den StreamingSimplifier mit den Recorder-Vorgaben und misst
+die tatsächliche Abweichung (synchroner Raum-Fehler px, Zeit-Fehler ms) jedes
+Rohpunkts vom Ergebnis. Vergleich: jeder n-te Rohpunkt mit gleicher Punktzahl.
+Gemessen wird auch die längste Unterbrechung durch ein add() - so lange steht
+die Lese-Schleife des Recorders.
+
+Bricht ab, wenn die Abweichung über der Toleranz liegt, die der Simplifier
+danach meldet (tolerance_px/tolerance_ms, bei widened in den Metadaten).
+
+Verwendung:
+    python3 bench/bench_simplifier.py
+    python3 bench/bench_simplifier.py --seconds 10,40,60,300 --max-points 500
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from touch_geometry import StreamingSimplifier, _segment_error
+
+RATE_HZ = 200
+
+
+def build_drag(seconds, seed=1):
+    """Drag über seconds Sekunden: überlagerte Bögen mit ±1px Rauschen"""
+    rng = random.Random(seed)
+    points = []
+    for i in range(int(seconds * RATE_HZ)):
+        t = i * 1000 // RATE_HZ
+        s = t / 1000.0
+        x = 960 + 600 * math.sin(s * 0.7) + 80 * math.sin(s * 3.1) + rng.randint(-1, 1)
+        y = 540 + 350 * math.sin(s * 0.45 + 1) + 60 * math.cos(s * 2.3) + rng.randint(-1, 1)
+        points.append([int(x), int(y), t])
+    return points
+
+
+def deviation(raw, kept):
+    """Größter (px, ms) Fehler der Rohpunkte gegenüber dem Pfad durch kept (Teilfolge von raw)"""
+    worst_space = worst_time = 0.0
+    segment = 0
+    for point in raw:
+        while segment < len(kept) - 2 and point[2] > kept[segment + 1][2]:
+            segment += 1
+        space_error, time_error = _segment_error(kept[segment], kept[segment + 1], point)
+        worst_space = max(worst_space, space_error)
+        worst_time = max(worst_time, time_error)
+    return worst_space, worst_time
+
+
+def every_nth(raw, count):
+    """Vergleichs-Ausdünnung: jeder n-te Punkt, letzter Punkt immer dabei"""
+    step = max(1, math.ceil((len(raw) - 1) / max(1, count - 1)))
+    points = raw[::step]
+    if points[-1] is not raw[-1]:
+        points.append(raw[-1])
+    return points
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', default='10,40,60', help='Drag-Dauern, kommagetrennt')
+    parser.add_argument('--max-points', type=int, default=500)
+    parser.add_argument('--tolerance-px', type=float, default=1.5)
+    parser.add_argument('--tolerance-ms', type=float, default=10)
+    args = parser.parse_args()
+
+    print(f"{'Dauer':>6} {'Roh':>7} {'Punkte':>7} {'Fehler':>15} {'gemeldet':>15} {'jeder n-te':>15} "
+          f"{'add max':>9} {'gesamt':>9}")
+    failed = False
+    for seconds in (float(value) for value in args.seconds.split(',')):
+        raw = build_drag(seconds)
+        simplifier = StreamingSimplifier(args.tolerance_px, args.tolerance_ms, args.max_points)
+        clock = time.perf_counter
+        longest = 0.0
+        start = clock()
+        for point in raw:
+            before = clock()
+            simplifier.add(point)
+            longest = max(longest, clock() - before)
+        kept = simplifier.finish()
+        total = clock() - start
+
+        space_error, time_error = deviation(raw, kept)
+        reported = (simplifier.tolerance_px, simplifier.tolerance_ms)
+        baseline = deviation(raw, every_nth(raw, len(kept)))
+        print(f"{seconds:>5g}s {len(raw):>7} {len(kept):>7} "
+              f"{space_error:>6.1f}px/{time_error:>4.0f}ms {reported[0]:>6.1f}px/{reported[1]:>4.0f}ms "
+              f"{baseline[0]:>6.1f}px/{baseline[1]:>4.0f}ms {longest * 1000:>7.1f}ms {total * 1000:>7.0f}ms")
+        if len(kept) > args.max_points or space_error > reported[0] + 1e-9 or time_error > reported[1] + 1e-9:
+            failed = True
+    if failed:
+        sys.exit("Abweichung über der gemeldeten Toleranz bzw. mehr als --max-points Punkte")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Synthetischer Touch-Stream: input_event Records (evdev) oder evtest-Text
+
+Erzeugt Gesten wie ein Multi-Touch Controller (MT Protokoll B + Single-Touch
+Achsen für Kontakt 0) mit einstellbarer Rate, Kontaktzahl und Form.
+
+Verwendung:
+    python3 bench/touch_synth.py --format evdev --output touch.evdev
+    python3 bench/touch_synth.py --format evtest --pace 1.0 | python3 ...   # Echtzeit-Pipe
+"""
+
+import argparse
+import math
+import os
+import struct
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from touch_evdev import (format_evtest_line, EVENT_FORMAT, EV_SYN, EV_KEY, EV_ABS, SYN_REPORT,
+                         BTN_TOUCH, ABS_X, ABS_Y, ABS_MT_SLOT, ABS_MT_TRACKING_ID,
+                         ABS_MT_POSITION_X, ABS_MT_POSITION_Y)
+
+SHAPES = ('circle', 'line', 'tap', 'pinch')
+
+
+def contact_position(shape, gesture, index, contact, contacts, points):
+    """Rohposition eines Kontakts im Frame index einer Geste"""
+    progress = index / max(1, points - 1)
+    if shape == 'circle':
+        angle = gesture * 0.37 + index * 0.05 + 2 * math.pi * contact / contacts
+        return int(8000 + 6000 * math.cos(angle)), int(4800 + 3600 * math.sin(angle))
+    if shape == 'line':
+        return int(1000 + 14000 * progress), int(1000 + 7600 * (contact + 1) / (contacts + 1))
+    if shape == 'tap':
+        return 2000 + (gesture * 1231 + contact * 1500) % 12000, 1500 + (gesture * 977) % 6000
+    if shape == 'pinch':
+        angle = 2 * math.pi * contact / contacts
+        radius = 500 + 4000 * progress
+        return int(8000 + radius * math.cos(angle)), int(4800 + radius * 0.6 * math.sin(angle))
+    raise ValueError(f"Unbekannte Form: {shape} (erlaubt: {', '.join(SHAPES)})")
+
+
+def synthesize(gestures=200, points_per_gesture=150, rate_hz=200, contacts=1, shape='circle',
+               gap_ms=300, start_time=1_700_000_000.0):
+    """Events (sec, usec, type, code, value) für gestures Gesten mit je points_per_gesture Frames"""
+    events = []
+    t = start_time
+    step = 1.0 / rate_hz
+    tracking_id = 0
+    slot = 0
+
+    def emit(ev_type, code, value):
+        sec = int(t)
+        events.append((sec, int((t - sec) * 1e6), ev_type, code, value))
+
+    for g in range(gestures):
+        first_id = tracking_id + 1
+        tracking_id += contacts
+        for i in range(points_per_gesture):
+            for c in range(contacts):
+                x, y = contact_position(shape, g, i, c, contacts, points_per_gesture)
+                if i == 0 or slot != c:
+                    emit(EV_ABS, ABS_MT_SLOT, c)
+                    slot = c
+                if i == 0:
+                    emit(EV_ABS, ABS_MT_TRACKING_ID, first_id + c)
+                emit(EV_ABS, ABS_MT_POSITION_X, x)
+                emit(EV_ABS, ABS_MT_POSITION_Y, y)
+                if c == 0:
+                    primary = (x, y)
+            if i == 0:
+                emit(EV_KEY, BTN_TOUCH, 1)
+            emit(EV_ABS, ABS_X, primary[0])
+            emit(EV_ABS, ABS_Y, primary[1])
+            emit(EV_SYN, SYN_REPORT, 0)
+            t += step
+        for c in reversed(range(contacts)):
+            if slot != c:
+                emit(EV_ABS, ABS_MT_SLOT, c)
+                slot = c
+            emit(EV_ABS, ABS_MT_TRACKING_ID, -1)
+        emit(EV_KEY, BTN_TOUCH, 0)
+        emit(EV_SYN, SYN_REPORT, 0)
+        t += gap_ms / 1000.0
+    return events
+
+
+def encode_evdev(events):
+    """Events als rohe input_event Records"""
+    return b''.join(struct.pack(EVENT_FORMAT, *e) for e in events)
+
+
+def encode_evtest(events):
+    """Events als evtest-Textzeilen"""
+    return ''.join(format_evtest_line(e) for e in events).encode()
+
+
+def iter_frames(events):
+    """Events in Frames bis einschließlich SYN_REPORT gruppieren"""
+    frame = []
+    for event in events:
+        frame.append(event)
+        if event[2] == EV_SYN and event[3] == SYN_REPORT:
+            yield frame
+            frame = []
+    if frame:
+        yield frame
+
+
+def stream(events, out, fmt='evdev', pace=0.0, stamp_now=False):
+    """Events frameweise schreiben; pace > 0 hält die Zeitstempel ein (1.0 = Echtzeit)
+
+    stamp_now ersetzt die Zeitstempel durch die Uhrzeit beim Schreiben - wie der
+    Kernel, der Events beim Eintreffen stempelt (nur mit pace sinnvoll).
+    """
+    encode = encode_evdev if fmt == 'evdev' else encode_evtest
+    if pace <= 0:
+        out.write(encode(events))
+        out.flush()
+        return
+    first = events[0][0] + events[0][1] / 1e6 if events else 0.0
+    start = time.perf_counter()
+    for frame in iter_frames(events):
+        sec, usec = frame[-1][0], frame[-1][1]
+        delay = (sec + usec / 1e6 - first) / pace - (time.perf_counter() - start)
+        if delay > 0:
+            time.sleep(delay)
+        if stamp_now:
+            now = time.time()
+            sec, usec = int(now), int((now - int(now)) * 1e6)
+            frame = [(sec, usec, ev_type, code, value) for _, _, ev_type, code, value in frame]
+        out.write(encode(frame))
+        out.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--gestures', type=int, default=200)
+    parser.add_argument('--points', type=int, default=150, help='Frames pro Geste')
+    parser.add_argument('--rate', type=float, default=200, help='Frames pro Sekunde während einer Geste')
+    parser.add_argument('--contacts', type=int, default=1)
+    parser.add_argument('--shape', choices=SHAPES, default='circle')
+    parser.add_argument('--gap-ms', type=int, default=300, help='Pause zwischen Gesten')
+    parser.add_argument('--format', choices=('evdev', 'evtest'), default='evdev')
+    parser.add_argument('--pace', type=float, default=0.0,
+                        help='Zeitstempel einhalten (1.0 = Echtzeit, 0 = so schnell wie möglich)')
+    parser.add_argument('--now', action='store_true',
+                        help='Zeitstempel = Uhrzeit beim Schreiben (mit --pace, für Capture-Lag Messungen)')
+    parser.add_argument('--output', help='Datei oder FIFO (Standard: stdout)')
+    args = parser.parse_args()
+
+    events = synthesize(args.gestures, args.points, args.rate, args.contacts, args.shape, args.gap_ms)
+    try:
+        if args.output:
+            with open(args.output, 'wb') as out:
+                stream(events, out, args.format, args.pace, args.now)
+        else:
+            stream(events, sys.stdout.buffer, args.format, args.pace, args.now)
+    except BrokenPipeError:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Recording-Compiler - Alte Scripts auf interpreterfreie Drags umstellen
+
+Ältere Recordings starten pro do_timed_drag einen python3-Interpreter (plus
+bash und bc pro sleep_ms). Der Compiler liest jedes Script (bzw. die .trec
+daneben) und exportiert es neu: Drags als do_fast_drag (eine xdotool-Kette
+pro Drag), sleep_ms ohne bc. Das Script bleibt eigenständig ausführbar.
+
+Verwendung:
+    python3 compile-recordings.py                       # alle Scripts in /home/dai/recordings
+    python3 compile-recordings.py login.sh other.sh --dry-run
+"""
+
+import argparse
+import os
+import shutil
+import sys
+
+from touch_format import load_recording, export_script, GESTURE_TAP, GESTURE_KEY
+
+# Farben
+class Colors:
+    RED = '\033[0;31m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    CYAN = '\033[0;36m'
+    GRAY = '\033[0;90m'
+    NC = '\033[0m'
+
+DEFAULT_DIR = "/home/dai/recordings"
+
+# Merkmale eines Scripts mit Interpreter-Aufrufen pro Geste
+LEGACY_MARKERS = ('python3 -c', '| bc')
+
+
+def needs_compile(path):
+    """True wenn das Script noch python3/bc pro Geste startet oder ohne Terminal im Resolution-Check blockiert"""
+    with open(path, 'r', errors='replace') as f:
+        content = f.read()
+    if "do_tap" not in content and "Touch Recording" not in content:
+        return False, 0
+    interpreter_starts = content.count("\ndo_timed_drag '") + content.count("\nsleep_ms ")
+    blocking_check = "verify_resolution()" in content and "TOUCH_SKIP_VERIFY" not in content
+    return blocking_check or any(marker in content for marker in LEGACY_MARKERS), interpreter_starts
+
+
+def compile_script(path, backup=True):
+    """Script neu exportieren; liefert Anzahl kompilierter Drags"""
+    recording = load_recording(path)
+    try:
+        drags = sum(1 for kind, _, _, points in recording
+                    if kind not in (GESTURE_TAP, GESTURE_KEY) and len(points) >= 2)
+        tmp_path = path + '.tmp'
+        export_script(recording, tmp_path)
+    finally:
+        recording.close()
+    if backup:
+        shutil.copy2(path, path + '.orig')
+    os.chmod(tmp_path, 0o755)
+    os.replace(tmp_path, path)
+    return drags
+
+
+def collect(paths):
+    """Scripts aus Dateien und Verzeichnissen"""
+    scripts = []
+    for path in paths:
+        if os.path.isdir(path):
+            scripts.extend(sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith('.sh')))
+        else:
+            scripts.append(path)
+    return scripts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('paths', nargs='*', default=[DEFAULT_DIR], help='Scripts oder Verzeichnisse')
+    parser.add_argument('--dry-run', action='store_true', help='Nur anzeigen, nichts schreiben')
+    parser.add_argument('--no-backup', action='store_true', help='Kein .orig neben dem Script ablegen')
+    parser.add_argument('--force', action='store_true', help='Auch bereits kompilierte Scripts neu exportieren')
+    args = parser.parse_args()
+
+    compiled = skipped = failed = drags = removed = 0
+    for path in collect(args.paths):
+        name = os.path.basename(path)
+        try:
+            legacy, interpreter_starts = needs_compile(path)
+            if not legacy and not args.force:
+                skipped += 1
+                continue
+            if args.dry_run:
+                print(f"{Colors.YELLOW}~{Colors.NC} {name} ({interpreter_starts} Interpreter-Starts)")
+                compiled += 1
+                removed += interpreter_starts
+                continue
+            count = compile_script(path, backup=not args.no_backup)
+        except Exception as e:
+            print(f"{Colors.RED}✗ {name}: {e}{Colors.NC}")
+            failed += 1
+            continue
+        print(f"{Colors.GREEN}✓{Colors.NC} {name}: {count} Drags → do_fast_drag")
+        compiled += 1
+        drags += count
+        removed += interpreter_starts
+
+    action = "zu kompilieren" if args.dry_run else "kompiliert"
+    print(f"\n{Colors.CYAN}{compiled} Scripts {action}, {skipped} aktuell, {failed} Fehler{Colors.NC}")
+    if compiled:
+        print(f"{Colors.GRAY}{removed} python3/bc-Starts pro Replay entfallen"
+              + (f", {drags} Drags" if drags else "") + f"{Colors.NC}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
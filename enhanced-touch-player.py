@@ -10,10 +10,24 @@ import subprocess
 import signal
 import threading
 from datetime import datetime
-import glob
 import re
 import tempfile
 import shutil
+import csv
+import json
+
+from touch_format import (recording_info, load_recording, export_script, sibling_trec, measure_script_overhead,
+                          script_speed_estimate)
+from touch_replay import (open_backend, ReplayEngine, PlanCache, OP_KEY_DOWN, calibrate_backend, achievable_speed,
+                          parse_rate)
+from touch_speed import parse_curve
+from touch_geometry import parse_resample
+from touch_verify import open_capture, verify
+from touch_farm import run_farm, start_xvfb
+from touch_catalog import RecordingCatalog
+
+# Spalten der Fidelity-CSV (ein Eintrag pro ausgegebenem Event)
+FIDELITY_COLUMNS = ('loop', 'event', 'gesture', 'op', 'slot', 'planned_ms', 'actual_ms', 'lateness_ms')
 
 # Farben
 class Colors:
@@ -59,8 +73,48 @@ class EnhancedTouchPlayer:
         self.random_speed_max = 2.0
         self.speed_change_mode = "per_loop"  # per_loop, gradual, chaos
         
+        # Speed-Kurve: Tempo ändert sich während des Playbacks (Zeit-Warp in der Engine)
+        self.speed_curve = None
+        self.curve_elapsed = 0.0  # Kurvenzeit in Sekunden, läuft über alle Durchläufe weiter
+        
+        # Durchsatz-Modus: Aufnahme-Timing ignorieren (None = aus, 0 = maximal, sonst Events/s)
+        self.target_rate = None
+        
+        # Injection settings
+        self.playback_backend = "auto"  # auto, xtest, xdotool, uinput (Multi-Touch), bash (Kompatibilität: Script ausführen)
+        self.injector = None  # Persistente Verbindung, bleibt über alle Loops offen
+        self.engine = None
+        self.plan_cache = PlanCache()  # Kompilierte Pläne, Speed wird zur Laufzeit angewendet
+        self.replay_offset = None  # Monitor-Offset des ausgewählten Recordings
+        self.replay_offset_script = None
+        self.resampler = None  # Drag-Punkte vor dem Replay zusammenfassen / auf Frame-Raster legen (touch_geometry)
+        
+        # Overhead-Kompensation: Kosten pro Event/Pause beim ersten Playback messen und von den Wartezeiten abziehen
+        self.overhead_compensation = True
+        self.calibration = None  # Injection-Backend: {'inject_ms', 'wake_ms', 'lead_ms'}
+        self.script_overhead = None  # Bash-Backend: {'command_ms', 'sleep_ms'}, {} wenn nicht messbar
+        self.reachable_speeds = {}  # (Script, Speed, Backend) -> erreichbare Speed
+        
+        # Recording-Katalog (SQLite im Recording-Verzeichnis)
+        self.catalog = None
+        self.catalog_entries = {}
+        
+        # Timing-Fidelity (geplant vs. tatsächlich) neben dem Playback-Log
+        self.write_fidelity_events = True  # CSV mit jedem Event; False = nur JSONL-Report pro Durchlauf
+        self.last_fidelity = None
+        
+        # Closed-Loop Verifikation: abgespielte Events mitschneiden und mit dem Plan vergleichen
+        self.verify_replay = False
+        self.verify_px = 1.0  # erlaubte Positionsabweichung
+        self.verify_ms = 10.0  # erlaubte Start-/End-Verspätung pro Geste
+        self.capture = None  # XInput2 oder evdev-Knoten des uinput-Geräts, bleibt wie das Backend offen
+        
     def __del__(self):
         """Cleanup temp directory"""
+        if getattr(self, 'capture', None):
+            self.capture.close()
+        if getattr(self, 'injector', None):
+            self.injector.close()
         if hasattr(self, 'temp_dir') and os.path.exists(self.temp_dir):
             shutil.rmtree(self.temp_dir)
     
@@ -77,75 +131,67 @@ class EnhancedTouchPlayer:
         with open(self.log_file, 'a') as f:
             f.write(log_entry + "\n")
     
-    def find_recordings(self):
-        """Finde alle Touch-Recording Scripts"""
-        scripts = []
-        pattern = os.path.join(self.recordings_dir, "*.sh")
-        
-        for file in sorted(glob.glob(pattern)):
-            # Prüfe ob es ein Touch-Script ist
-            with open(file, 'r') as f:
-                content = f.read(500)
-                if "Touch Recording" in content or "do_tap" in content:
-                    scripts.append(file)
-                    
-        return scripts
+    def find_recordings(self, **filters):
+        """Finde alle Touch-Recordings über den Katalog (nur geänderte Dateien werden gelesen)"""
+        if self.catalog is None:
+            self.catalog = RecordingCatalog(self.recordings_dir)
+        self.catalog.refresh()
+        if self.catalog.indexed:
+            self.log(f"Katalog: {self.catalog.indexed} Recording(s) neu indiziert", "INFO")
+        
+        self.catalog_entries = {entry.path: entry for entry in self.catalog.query(**filters)}
+        return list(self.catalog_entries)
     
     def show_recordings(self, scripts):
         """Zeige verfügbare Recordings"""
         print(f"\n{Colors.CYAN}=== VERFÜGBARE RECORDINGS ==={Colors.NC}")
         
         for i, script in enumerate(scripts):
+            entry = self.catalog_entries.get(script)
             filename = os.path.basename(script)
-            size = os.path.getsize(script) / 1024  # KB
-            mtime = datetime.fromtimestamp(os.path.getmtime(script))
-            
-            # Zähle Touch-Events
-            touch_count = 0
-            with open(script, 'r') as f:
-                content = f.read()
-                touch_count = content.count('do_tap') + content.count('do_drag') + content.count('do_timed_drag')
-            
             print(f"{Colors.YELLOW}[{i+1}]{Colors.NC} {filename}")
-            print(f"    📅 {mtime.strftime('%Y-%m-%d %H:%M')}")
-            print(f"    📊 {touch_count} Touch-Events, {size:.1f} KB")
+            if entry is None:
+                continue
             
+            mtime = datetime.fromtimestamp(entry.mtime)
+            print(f"    📅 {mtime.strftime('%Y-%m-%d %H:%M')}  🖥️  {entry.monitor} {entry.resolution}")
+            print(f"    📊 {entry.gesture_count} Touch-Events, {entry.size / 1024:.1f} KB")
             # Zeige geschätzte Duration
-            duration = self.estimate_duration(script)
-            if duration:
-                print(f"    ⏱️  ~{duration:.1f}s @ 1x Speed")
+            if entry.total_ms:
+                print(f"    ⏱️  ~{entry.duration:.1f}s @ 1x Speed")
     
     def estimate_duration(self, script_path):
         """Schätze die Dauer eines Scripts"""
+        entry = self.catalog_entries.get(script_path)
+        if entry is not None:
+            return entry.duration
         try:
-            with open(script_path, 'r') as f:
-                content = f.read()
-            
-            total_ms = 0
-            
-            # Finde alle sleep_ms commands
-            for match in re.finditer(r'sleep_ms (\d+)', content):
-                total_ms += int(match.group(1))
-            
-            # Finde do_tap mit duration
-            for match in re.finditer(r'do_tap \d+ \d+ (\d+)', content):
-                total_ms += int(match.group(1))
-            
-            # Schätze drag duration aus JSON
-            for match in re.finditer(r'do_timed_drag \'([^\']+)\'', content):
-                try:
-                    import json
-                    points = json.loads(match.group(1))
-                    if points and len(points) > 0:
-                        # Letzter timestamp ist die Duration
-                        total_ms += points[-1][2]
-                except:
-                    total_ms += 1000  # Default 1s für drag
-            
-            return total_ms / 1000.0
-        except:
+            return recording_info(script_path).duration
+        except Exception:
             return None
     
+    def parse_catalog_filter(self, text):
+        """Filter-Eingabe ('name', 'monitor=X', 'res=WxH', 'sort=feld', 'desc') in Katalog-Argumente"""
+        filters = {}
+        for token in text.split():
+            key, _, value = token.partition('=')
+            if not value:
+                if key == 'desc':
+                    filters['descending'] = True
+                else:
+                    filters['name'] = key
+            elif key == 'monitor':
+                filters['monitor'] = value
+            elif key in ('res', 'resolution'):
+                filters['resolution'] = value
+            elif key == 'sort':
+                filters['order_by'] = value
+            elif key == 'min':
+                filters['min_duration'] = float(value)
+            elif key == 'max':
+                filters['max_duration'] = float(value)
+        return filters
+    
     def select_recording(self):
         """Wähle ein Recording aus"""
         scripts = self.find_recordings()
@@ -153,6 +199,20 @@ class EnhancedTouchPlayer:
         if not scripts:
             self.log("Keine Recordings gefunden!", "ERROR")
             return False
+        
+        # Bei vielen Recordings filtern/sortieren (Abfrage läuft auf dem Katalog)
+        if len(scripts) > 20:
+            print(f"\n{Colors.GRAY}{len(scripts)} Recordings - Filter z.B. 'login', 'monitor=HDMI-1', "
+                  f"'res=1920x1200', 'sort=duration' (Enter = alle){Colors.NC}")
+            try:
+                filters = self.parse_catalog_filter(input(f"{Colors.CYAN}Filter: {Colors.NC}"))
+                if filters:
+                    scripts = self.find_recordings(**filters)
+            except ValueError as e:
+                self.log(f"Ungültiger Filter: {e}", "WARN")
+            if not scripts:
+                self.log("Keine passenden Recordings gefunden!", "ERROR")
+                return False
             
         self.show_recordings(scripts)
         
@@ -189,11 +249,17 @@ class EnhancedTouchPlayer:
         print(f"{Colors.YELLOW}[5]{Colors.NC} Sehr schnell (2.0x) - Quick Test")
         print(f"{Colors.YELLOW}[6]{Colors.NC} Turbo (3.0x) - Stress-Test")
         print(f"{Colors.YELLOW}[7]{Colors.NC} Custom - Eigene Geschwindigkeit")
+        print(f"{Colors.YELLOW}[8]{Colors.NC} 📉 Speed-Kurve - Tempo ändert sich während des Playbacks")
+        print(f"{Colors.YELLOW}[9]{Colors.NC} 🚀 Durchsatz - Maximal oder feste Events/s (Aufnahme-Timing ignorieren)")
         
         try:
-            choice = input(f"\n{Colors.CYAN}Geschwindigkeit [1-7]: {Colors.NC}")
+            choice = input(f"\n{Colors.CYAN}Geschwindigkeit [1-9]: {Colors.NC}")
             
-            if choice == '1':
+            if choice == '8':
+                return self.configure_speed_curve()
+            elif choice == '9':
+                return self.configure_rate()
+            elif choice == '1':
                 self.playback_speed = 0.25
                 preset = "Sehr langsam"
             elif choice == '2':
@@ -218,6 +284,8 @@ class EnhancedTouchPlayer:
             else:
                 return False
             
+            self.speed_curve = None
+            self.target_rate = None
             print(f"{Colors.GREEN}✅ Geschwindigkeit: {preset} ({self.playback_speed}x){Colors.NC}")
             
             # Zeige angepasste Duration
@@ -233,15 +301,92 @@ class EnhancedTouchPlayer:
             self.log(f"Ungültige Eingabe: {e}", "ERROR")
             return False
     
+    def configure_speed_curve(self):
+        """Speed-Kurve als Funktion der Playback-Zeit (nur Injection-Backends, nicht Bash)"""
+        print(f"\n{Colors.CYAN}=== SPEED-KURVE ==={Colors.NC}")
+        print(f"{Colors.GRAY}Die Kurve läuft über alle Durchläufe weiter (Zeit = Sekunden Playback){Colors.NC}")
+        print(f"{Colors.YELLOW}ramp:0.5:3:120{Colors.NC}          Rampe 0.5x → 3x in 120s")
+        print(f"{Colors.YELLOW}sine:1.5:1:30{Colors.NC}           Sinus 1.5x ±1 mit 30s Periode")
+        print(f"{Colors.YELLOW}steps:0=1,60=2,120=4{Colors.NC}    Stufen (ab Sekunde = Speed)")
+        print(f"{Colors.YELLOW}walk:42:0.5:3{Colors.NC}           Random Walk mit Seed 42 zwischen 0.5x und 3x")
+        print(f"{Colors.GRAY}              walk:SEED:MIN:MAX:SCHRITT:INTERVALL für feinere Steuerung{Colors.NC}")
+        
+        try:
+            curve = parse_curve(input(f"\n{Colors.CYAN}Kurve: {Colors.NC}"))
+        except ValueError as e:
+            self.log(str(e), "ERROR")
+            return False
+        
+        self.speed_curve = curve
+        self.target_rate = None
+        self.use_random_speed = False
+        if self.playback_backend == "bash":
+            print(f"{Colors.YELLOW}⚠️  Bash-Backend kann keine Kurve abspielen - Injection-Backend wählen (Menü 8){Colors.NC}")
+        print(f"{Colors.GREEN}✅ Speed-Kurve: {curve.describe()}{Colors.NC}")
+        return True
+    
+    def configure_rate(self):
+        """Durchsatz-Modus: Events ohne Aufnahme-Timing so schnell wie möglich oder mit fester Rate ausgeben"""
+        print(f"\n{Colors.CYAN}=== DURCHSATZ ==={Colors.NC}")
+        print(f"{Colors.GRAY}Pausen und Haltezeiten der Aufnahme entfallen, Reihenfolge und Down/Up-Paare bleiben.{Colors.NC}")
+        print(f"{Colors.GRAY}Leer oder 'max' = so schnell wie das Backend kann, Zahl = Ziel-Rate in Events/s{Colors.NC}")
+        
+        try:
+            rate = parse_rate(input(f"\n{Colors.CYAN}Rate [max]: {Colors.NC}") or "max")
+        except ValueError as e:
+            self.log(str(e), "ERROR")
+            return False
+        
+        self.target_rate = rate
+        self.speed_curve = None
+        self.use_random_speed = False
+        if self.playback_backend == "bash":
+            print(f"{Colors.YELLOW}⚠️  Bash-Backend kann keinen Durchsatz-Modus - Injection-Backend wählen (Menü 8){Colors.NC}")
+        print(f"{Colors.GREEN}✅ Durchsatz: {self.speed_label()}{Colors.NC}")
+        return True
+    
+    def speed_label(self):
+        """Anzeige der aktuellen Speed-Einstellung"""
+        if self.target_rate is not None:
+            return f"{self.target_rate:g} Events/s" if self.target_rate else "max. Durchsatz"
+        if self.speed_curve:
+            return self.speed_curve.describe()
+        return f"{self.playback_speed}x"
+    
     def create_speed_adjusted_script(self):
         """Erstelle ein geschwindigkeits-angepasstes Script"""
         if not self.selected_script:
             return None
         
+        # Overhead-Kompensation braucht die .trec (alte Scripts ohne .trec nur skaliert)
+        has_trec = self.selected_script.endswith('.trec') or os.path.exists(sibling_trec(self.selected_script))
+        overhead = self.script_overhead if has_trec else None
+        
         # Wenn normale Geschwindigkeit, nutze Original
-        if self.playback_speed == 1.0:
+        if self.playback_speed == 1.0 and self.selected_script.endswith('.sh') and not overhead:
             return self.selected_script
         
+        variant = f"{self.playback_speed}x_komp" if overhead else f"{self.playback_speed}x"
+        modified_path = os.path.join(self.temp_dir, f"speed_{variant}_{os.path.splitext(os.path.basename(self.selected_script))[0]}.sh")
+        
+        # Schon für diese Speed erzeugt (Loops mit gleicher Speed)
+        if os.path.exists(modified_path) and os.path.getmtime(modified_path) >= os.path.getmtime(self.selected_script):
+            self.modified_script = modified_path
+            return modified_path
+        
+        # Binäres Recording vorhanden: Zeiten skalieren und Script exportieren
+        if has_trec:
+            recording = load_recording(self.selected_script)
+            try:
+                if overhead:
+                    self.check_reachable_speed(script_speed_estimate, recording, self.playback_speed, overhead)
+                export_script(recording, modified_path, self.playback_speed, overhead)
+            finally:
+                recording.close()
+            self.modified_script = modified_path
+            return modified_path
+        
+        # Altes Script ohne .trec: Text anpassen
         # Lese Original-Script
         with open(self.selected_script, 'r') as f:
             content = f.read()
@@ -280,12 +425,20 @@ class EnhancedTouchPlayer:
         
         content = re.sub(r"do_timed_drag '([^']+)'", adjust_timed_drag, content)
         
+        # Passe do_fast_drag an (jeder dritte Wert ist der Timestamp)
+        def adjust_fast_drag(match):
+            values = match.group(1).split()
+            for i in range(2, len(values), 3):
+                values[i] = str(int(int(values[i]) / self.playback_speed))
+            return "do_fast_drag " + " ".join(values)
+        
+        content = re.sub(r"do_fast_drag ((?:-?\d+ ?)+)", adjust_fast_drag, content)
+        
         # Füge Speed-Info zum Header hinzu
         speed_info = f"\n# PLAYBACK SPEED: {self.playback_speed}x\n"
         content = content.replace("# RECORDED EVENTS:", speed_info + "# RECORDED EVENTS:")
         
         # Speichere modifiziertes Script
-        modified_path = os.path.join(self.temp_dir, f"speed_{self.playback_speed}x_{os.path.basename(self.selected_script)}")
         with open(modified_path, 'w') as f:
             f.write(content)
         
@@ -350,8 +503,13 @@ class EnhancedTouchPlayer:
                 print(f"{Colors.YELLOW}[2]{Colors.NC} 🎲 Zufällige Geschwindigkeit pro Durchlauf")
                 print(f"{Colors.YELLOW}[3]{Colors.NC} 📈 Graduelle Änderung (langsam → schnell)")
                 print(f"{Colors.YELLOW}[4]{Colors.NC} 🌀 Chaos Mode (völlig zufällig)")
+                print(f"{Colors.YELLOW}[5]{Colors.NC} 📉 Speed-Kurve (ändert sich auch innerhalb eines Durchlaufs)")
+                
+                speed_choice = input(f"\n{Colors.CYAN}Speed-Modus [1-5]: {Colors.NC}")
                 
-                speed_choice = input(f"\n{Colors.CYAN}Speed-Modus [1-4]: {Colors.NC}")
+                if speed_choice in ('2', '3', '4'):
+                    self.speed_curve = None
+                    self.target_rate = None
                 
                 if speed_choice == '2':
                     self.use_random_speed = True
@@ -369,6 +527,9 @@ class EnhancedTouchPlayer:
                     self.random_speed_min = 0.1
                     self.random_speed_max = 5.0
                     print(f"{Colors.YELLOW}⚠️  CHAOS MODE: 0.1x - 5.0x{Colors.NC}")
+                    
+                elif speed_choice == '5':
+                    self.configure_speed_curve()
                 else:
                     self.use_random_speed = False
                 
@@ -440,6 +601,8 @@ class EnhancedTouchPlayer:
                 
             self.use_random_speed = True
             self.speed_change_mode = "per_loop"
+            self.speed_curve = None
+            self.target_rate = None
             
             print(f"\n{Colors.GREEN}✅ Random Speed konfiguriert:{Colors.NC}")
             print(f"   Range: {self.random_speed_min}x - {self.random_speed_max}x")
@@ -496,8 +659,362 @@ class EnhancedTouchPlayer:
             else:
                 return round(random.uniform(0.5, 2.5), 2)
     
+    def get_monitor_offset(self, meta):
+        """Aktuelle Monitor-Position per xrandr (wie verify_resolution im Script)"""
+        monitor = meta.get('monitor')
+        offset = (meta.get('monitor_x', 0), meta.get('monitor_y', 0))
+        if not monitor:
+            return offset
+        try:
+            result = subprocess.run(['xrandr'], capture_output=True, text=True)
+            for line in result.stdout.split('\n'):
+                if line.startswith(f"{monitor} connected"):
+                    match = re.search(r'(\d+)x(\d+)\+(\d+)\+(\d+)', line)
+                    if match:
+                        width, height, x, y = map(int, match.groups())
+                        if (width, height) != (meta.get('width'), meta.get('height')):
+                            self.log(f"Auflösung geändert: Aufnahme {meta.get('width')}x{meta.get('height')}, aktuell {width}x{height}", "WARN")
+                        return x, y
+            self.log(f"Monitor '{monitor}' nicht gefunden - nutze aufgezeichnete Position", "WARN")
+        except Exception:
+            pass
+        return offset
+    
+    def get_replay_offset(self):
+        """Monitor-Offset des ausgewählten Recordings (einmal pro Auswahl ermittelt)"""
+        if self.replay_offset is None or self.replay_offset_script != self.selected_script:
+            self.replay_offset = self.get_monitor_offset(recording_info(self.selected_script).meta)
+            self.replay_offset_script = self.selected_script
+        return self.replay_offset
+    
+    def play_recording(self):
+        """Spiele das Recording direkt über das Injection-Backend ab (kein Fork pro Event)"""
+        speed_info = f" @ {self.playback_speed}x Speed" if self.playback_speed != 1.0 else ""
+        if self.speed_curve:
+            speed_info = f" @ Kurve ab {self.curve_elapsed:.1f}s"
+        elif self.target_rate is not None:
+            speed_info = f" @ {self.speed_label()}"
+        
+        try:
+            plan = self.replay_plan()
+            offset = self.get_replay_offset()
+            if self.injector is None:
+                self.injector = open_backend(self.playback_backend)
+                self.engine = ReplayEngine(self.injector)
+                self.log(f"Injection-Backend: {self.injector.name}")
+                if self.overhead_compensation:
+                    self.calibrate_injector(plan, offset)
+            if plan.multitouch and not getattr(self.injector, 'multitouch', False):
+                self.log(f"Multi-Touch Gesten: {self.injector.name} spielt nur den primären Kontakt (uinput-Backend wählen)", "WARN")
+            
+            if self.verify_replay and self.capture is None:
+                try:
+                    self.capture = open_capture(self.injector)
+                    self.log(f"Verifikation: Mitschnitt über {self.capture.name}")
+                except OSError as e:
+                    self.log(f"Verifikation nicht möglich: {e}", "WARN")
+                    self.verify_replay = False
+            
+            if self.calibration and not self.speed_curve and self.target_rate is None:
+                self.check_reachable_speed(achievable_speed, plan, self.playback_speed,
+                                           self.calibration['inject_ms'],
+                                           getattr(self.injector, 'multitouch', False))
+            
+            loop = self.play_count + 1
+            resampling = f" | Resampling {self.resampler.describe()}" if self.resampler else ""
+            self.log(f"Starte Playback #{loop}{speed_info}{resampling}")
+            capture = self.capture if self.verify_replay else None
+            if capture:
+                capture.start()
+            result = self.engine.play(plan, self.speed_curve or self.playback_speed, offset, self.curve_elapsed,
+                                      self.target_rate)
+            if self.speed_curve:
+                self.curve_elapsed += result['curve_elapsed']
+            if capture:
+                time.sleep(0.1)  # Nachzügler aus der X/Kernel-Queue einsammeln
+                summary, gestures = verify(plan, result['trace'], capture.stop(), result['origin'], offset,
+                                           self.verify_px, self.verify_ms)
+                summary['source'] = capture.name
+                result['verification'] = (summary, gestures)
+            self.write_fidelity(loop, result, plan)
+            
+            if result['completed']:
+                self.play_count += 1
+                reached = (f"{result['events_per_s']:.0f} Events/s" if self.target_rate is not None
+                           else f"{result['effective_speed']:.2f}x")
+                self.log(f"Playback #{self.play_count} erfolgreich{speed_info} ({result['events']} Events in {result['elapsed']:.1f}s, "
+                         f"{reached} erreicht)")
+                if self.target_rate is not None:
+                    self.log_throughput(result)
+                else:
+                    self.log_timing(result)
+                self.log_fidelity(self.last_fidelity)
+                if 'verification' in result:
+                    return self.log_verification(*result['verification'])
+                return True
+            else:
+                self.log(f"Playback abgebrochen nach {result['events']}/{result['planned_events']} Events", "WARN")
+                return False
+                
+        except Exception as e:
+            self.log(f"Playback Fehler: {e}", "ERROR")
+            return False
+    
+    def log_timing(self, result):
+        """Verspätung gegenüber den absoluten Deadlines (prüft die ±1ms Angabe)"""
+        lateness = result['lateness']
+        if not lateness['count']:
+            return
+        level = "INFO" if lateness['within_tolerance'] >= 0.99 else "WARN"
+        self.log(f"Timing: p50 {lateness['p50']:.2f}ms | p95 {lateness['p95']:.2f}ms | "
+                 f"p99 {lateness['p99']:.2f}ms | max {lateness['max']:.2f}ms | "
+                 f"±1ms: {lateness['within_tolerance'] * 100:.1f}% | Drift {result['drift_ms']:+.1f}ms", level)
+        if 'speed_range' in result:
+            low, high = result['speed_range']
+            self.log(f"Speed-Kurve: {result['speed_curve']} | {low:.2f}x - {high:.2f}x in diesem Durchlauf")
+    
+    def log_throughput(self, result):
+        """Erreichter Durchsatz und Fehlbetrag gegenüber der Ziel-Rate"""
+        text = f"Durchsatz: {result['events_per_s']:.0f} Events/s | {result['gestures_per_s']:.1f} Gesten/s"
+        level = "INFO"
+        if result.get('target_rate'):
+            shortfall = result['rate_shortfall']
+            text += f" | Ziel {result['target_rate']:g}/s, Fehlbetrag {shortfall * 100:.1f}%"
+            if shortfall > 0.03:
+                level = "WARN"
+                text += f" - {self.injector.name} schafft die Rate nicht"
+        self.log(text, level)
+    
+    def calibrate_injector(self, plan, offset):
+        """Kosten pro Injection und Aufwach-Verspätung messen; die Engine startet jedes Event um deren Summe früher"""
+        first = next((i for i, op in enumerate(plan.op) if op < OP_KEY_DOWN), None)
+        point = (plan.x[first] + offset[0], plan.y[first] + offset[1]) if first is not None else offset
+        self.calibration = calibrate_backend(self.injector, self.engine.scheduler, point)
+        self.engine.lead = self.calibration['lead_ms'] / 1000.0
+        self.log(f"Kalibrierung {self.injector.name}: {self.calibration['inject_ms']:.3f}ms pro Event, "
+                 f"Aufwachen {self.calibration['wake_ms']:.3f}ms → Vorlauf {self.calibration['lead_ms']:.3f}ms")
+    
+    def calibrate_script(self):
+        """Kosten pro xdotool-Aufruf und sleep im Bash-Script einmal messen"""
+        try:
+            self.script_overhead = measure_script_overhead()
+            self.log(f"Kalibrierung Bash-Script: {self.script_overhead['command_ms']:.2f}ms pro xdotool, "
+                     f"{self.script_overhead['sleep_ms']:.2f}ms pro sleep")
+        except OSError as e:
+            self.script_overhead = {}
+            self.log(f"Kalibrierung nicht möglich: {e} - keine Overhead-Kompensation", "WARN")
+    
+    def check_reachable_speed(self, estimate, source, speed, *args):
+        """Einmal pro Script/Speed/Backend warnen, wenn die Speed mit den gemessenen Kosten nicht erreichbar ist"""
+        backend = self.injector.name if self.injector else self.playback_backend
+        key = (self.selected_script, speed, backend)
+        if key in self.reachable_speeds:
+            return self.reachable_speeds[key]
+        reachable = self.reachable_speeds[key] = estimate(source, speed, *args)
+        if reachable < speed * 0.97:
+            self.log(f"⚠️  {speed}x ist mit {backend} nicht erreichbar - maximal ~{reachable:.2f}x "
+                     f"(Kosten pro Event/Aufruf übersteigen die Pausen)", "WARN")
+        return reachable
+    
+    def fidelity_paths(self):
+        """CSV (Events) und JSONL (Report pro Durchlauf) neben der Log-Datei"""
+        base = os.path.splitext(self.log_file)[0]
+        return base + "_fidelity.csv", base + "_fidelity.jsonl"
+    
+    def write_fidelity(self, loop, result, plan=None):
+        """Geplante vs. tatsächliche Ausgabezeit jedes Events und Fidelity-Report des Durchlaufs schreiben"""
+        csv_path, jsonl_path = self.fidelity_paths()
+        trace = result.get('trace')
+        entry = {
+            'loop': loop,
+            'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'recording': os.path.basename(self.selected_script),
+            'backend': self.injector.name if trace is not None else self.playback_backend,
+            'speed': self.speed_label() if trace is not None else f"{self.playback_speed}x",
+            'completed': result['completed'],
+            'elapsed_s': round(result['elapsed'], 4),
+        }
+        if result.get('effective_speed'):
+            entry['effective_speed'] = round(result['effective_speed'], 3)
+        if trace is not None and self.target_rate is not None:
+            entry['events_per_s'] = round(result['events_per_s'], 1)
+            entry['gestures_per_s'] = round(result['gestures_per_s'], 2)
+            if self.target_rate:
+                entry['target_rate'] = self.target_rate
+                entry['rate_shortfall'] = round(result['rate_shortfall'], 4)
+        if trace is not None and self.resampler:
+            entry['resampling'] = self.resampler.spec()
+        calibration = self.calibration if trace is not None else self.script_overhead
+        if calibration:
+            entry['calibration'] = calibration
+        if trace is not None:
+            if self.write_fidelity_events:
+                try:
+                    new_file = not os.path.exists(csv_path)
+                    with open(csv_path, 'a', newline='') as f:
+                        writer = csv.writer(f)
+                        if new_file:
+                            writer.writerow(FIDELITY_COLUMNS)
+                        writer.writerows((loop, *row) for row in trace.rows(plan))
+                except OSError as e:
+                    self.log(f"Fidelity-CSV nicht schreibbar: {e}", "WARN")
+            report = trace.report(plan)
+            entry.update(report)
+            entry['planned_events'] = result['planned_events']
+            entry['skipped_events'] = result['skipped_events']
+            entry['scheduler'] = {k: round(v, 4) for k, v in result['lateness'].items()}
+            entry['lateness'] = {k: round(v, 4) for k, v in report['lateness'].items()}
+            entry['drift_ms'] = round(report['drift_ms'], 4)
+            entry['drift_trend_ms'] = round(report['drift_trend_ms'], 4)
+            if 'speed_range' in result:
+                entry['speed_range'] = [round(v, 3) for v in result['speed_range']]
+            if 'verification' in result:
+                entry['verification'], entry['verification_gestures'] = result['verification']
+        else:
+            # Bash-Backend: keine Zeit pro Event, nur Gesamtdauer und Return Code
+            entry['returncode'] = result.get('returncode')
+        
+        try:
+            with open(jsonl_path, 'a') as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            self.log(f"Fidelity-Report nicht schreibbar: {e}", "WARN")
+        self.last_fidelity = entry
+        return entry
+    
+    def log_fidelity(self, entry):
+        """Ausgabe-Verspätung, Drift und schlechteste Gesten eines Durchlaufs"""
+        lateness = entry.get('lateness')
+        if not lateness or not lateness['count']:
+            return
+        level = "INFO" if lateness['within_tolerance'] >= 0.99 else "WARN"
+        self.log(f"Fidelity: Ausgabe p50 {lateness['p50']:.2f}ms | p95 {lateness['p95']:.2f}ms | "
+                 f"p99 {lateness['p99']:.2f}ms | max {lateness['max']:.2f}ms | "
+                 f"Drift {entry['drift_ms']:+.2f}ms (Trend {entry['drift_trend_ms']:+.2f}ms)", level)
+        worst = ", ".join(f"#{g['gesture'] + 1} max {g['max_ms']:.1f}ms" for g in entry['worst_gestures'][:3])
+        if worst:
+            self.log(f"Schlechteste Gesten: {worst}", level)
+    
+    def log_verification(self, summary, gestures):
+        """Ergebnis der Closed-Loop Verifikation; False bei Abweichung außerhalb der Toleranz"""
+        level = "INFO" if summary['passed'] else "ERROR"
+        self.log(f"Verifikation ({summary['source']}): {summary['matched']}/{summary['gestures']} Gesten, "
+                 f"{summary['extra']} zusätzlich | Position max {summary['px']['max']:.1f}px | "
+                 f"Latenz p50 {summary['latency_ms']['p50']:.2f}ms, max {summary['latency_ms']['max']:.2f}ms", level)
+        if not summary['passed']:
+            failed = [g for g in gestures if not g['matched'] or g['px_max'] > summary['tolerance']['px']
+                      or max(abs(g['start_ms']), abs(g['end_ms'])) > summary['tolerance']['ms'] or g['missing_points']]
+            for g in failed[:5]:
+                if not g['matched']:
+                    self.log(f"  Geste #{g['gesture'] + 1}: nicht angekommen", "ERROR")
+                else:
+                    self.log(f"  Geste #{g['gesture'] + 1}: {g['px_max']:.1f}px, Start {g['start_ms']:+.1f}ms, "
+                             f"Ende {g['end_ms']:+.1f}ms", "ERROR")
+        return summary['passed']
+    
+    def configure_verification(self):
+        """Closed-Loop Verifikation ein-/ausschalten und Toleranzen setzen"""
+        print(f"\n{Colors.CYAN}=== CLOSED-LOOP VERIFIKATION ==={Colors.NC}")
+        print(f"Aktuell: {Colors.GREEN}{'an' if self.verify_replay else 'aus'}{Colors.NC} "
+              f"(±{self.verify_px}px, ±{self.verify_ms}ms)")
+        print(f"{Colors.GRAY}Schneidet die abgespielten Events mit (XInput2, bei uinput der evdev-Knoten) "
+              f"und bricht den Loop bei Abweichungen ab{Colors.NC}")
+        
+        try:
+            choice = input(f"\n{Colors.CYAN}Verifikation aktivieren? (j/n): {Colors.NC}").strip().lower()
+            self.verify_replay = choice == 'j'
+            if self.verify_replay:
+                self.verify_px = float(input(f"Toleranz Position in px [{self.verify_px}]: ") or self.verify_px)
+                self.verify_ms = float(input(f"Toleranz Zeit in ms [{self.verify_ms}]: ") or self.verify_ms)
+                if self.playback_backend == "bash":
+                    print(f"{Colors.YELLOW}⚠️  Bash-Backend wird nicht verifiziert - Injection-Backend wählen{Colors.NC}")
+        except ValueError as e:
+            self.log(f"Ungültige Eingabe: {e}", "ERROR")
+            return False
+        print(f"{Colors.GREEN}✅ Verifikation: {'an' if self.verify_replay else 'aus'}{Colors.NC}")
+        return True
+    
+    def configure_backend(self):
+        """Wähle das Injection-Backend"""
+        print(f"\n{Colors.CYAN}=== INJECTION BACKEND ==={Colors.NC}")
+        print(f"Aktuell: {Colors.GREEN}{self.playback_backend}{Colors.NC}")
+        print(f"\n{Colors.YELLOW}[1]{Colors.NC} Auto (XTest, sonst xdotool)")
+        print(f"{Colors.YELLOW}[2]{Colors.NC} XTest - persistente X-Verbindung")
+        print(f"{Colors.YELLOW}[3]{Colors.NC} xdotool - ein Aufruf pro Event")
+        print(f"{Colors.YELLOW}[4]{Colors.NC} Bash-Script (Kompatibilität)")
+        print(f"{Colors.YELLOW}[5]{Colors.NC} uinput - virtueller Multi-Touch Screen (Schreibrechte auf /dev/uinput)")
+        resampling = self.resampler.describe() if self.resampler else "aus"
+        print(f"{Colors.YELLOW}[6]{Colors.NC} 🎞️  Resampling der Drags ({resampling})")
+        
+        choice = input(f"\n{Colors.CYAN}Backend [1-6]: {Colors.NC}")
+        if choice == '6':
+            return self.configure_resampling()
+        backends = {'1': "auto", '2': "xtest", '3': "xdotool", '4': "bash", '5': "uinput"}
+        if choice not in backends:
+            return False
+        
+        self.playback_backend = backends[choice]
+        self.calibration = None
+        self.reachable_speeds = {}
+        if self.capture:
+            self.capture.close()
+            self.capture = None
+        if self.injector:
+            self.injector.close()
+            self.injector = None
+            self.engine = None
+        print(f"{Colors.GREEN}✅ Backend: {self.playback_backend}{Colors.NC}")
+        return True
+    
+    def configure_resampling(self):
+        """Drag-Punkte beim Replay zusammenfassen oder auf die Frame-Rate der App legen (nur Injection-Backends)"""
+        print(f"\n{Colors.CYAN}=== RESAMPLING ==={Colors.NC}")
+        print(f"{Colors.GRAY}Die App tastet Input nur einmal pro Frame ab - dichtere Moves kosten nur Round-Trips.{Colors.NC}")
+        print(f"{Colors.GRAY}Der Pfad bleibt innerhalb der Toleranz (Standard 1px), Zeiten gelten in Playback-Zeit.{Colors.NC}")
+        print(f"{Colors.YELLOW}frame:60{Colors.NC}         ein Move pro Frame bei 60 Hz (auch 120, 144, ...)")
+        print(f"{Colors.YELLOW}frame:60:2:up{Colors.NC}    2px Toleranz, spärliche Drags auf 60 Hz auffüllen")
+        print(f"{Colors.YELLOW}window:8{Colors.NC}         Moves innerhalb von 8ms zusammenfassen")
+        print(f"{Colors.YELLOW}aus{Colors.NC}              alle aufgezeichneten Punkte abspielen")
+        
+        text = input(f"\n{Colors.CYAN}Resampling: {Colors.NC}").strip()
+        if text.lower() in ('aus', 'off', ''):
+            self.resampler = None
+            print(f"{Colors.GREEN}✅ Resampling aus{Colors.NC}")
+            return True
+        try:
+            self.resampler = parse_resample(text)
+        except ValueError as e:
+            self.log(str(e), "ERROR")
+            return False
+        if self.playback_backend == "bash":
+            print(f"{Colors.YELLOW}⚠️  Bash-Backend spielt das Script unverändert ab - Injection-Backend wählen{Colors.NC}")
+        print(f"{Colors.GREEN}✅ Resampling: {self.resampler.describe()}{Colors.NC}")
+        if self.selected_script:
+            original = len(self.plan_cache.get(self.selected_script))
+            resampled = len(self.replay_plan())
+            if original:
+                print(f"{Colors.GRAY}{os.path.basename(self.selected_script)}: {original} → {resampled} Events "
+                      f"({(1 - resampled / original) * 100:.0f}% weniger){Colors.NC}")
+        return True
+    
+    def replay_plan(self):
+        """Plan des ausgewählten Recordings, ggf. resampled (Raster in Playback-Zeit bei fester Speed)"""
+        resampler = self.resampler
+        if resampler and not self.speed_curve and self.target_rate is None:
+            resampler = resampler.for_speed(self.playback_speed)
+        return self.plan_cache.get(self.selected_script, resampler)
+    
     def play_script(self):
         """Spiele das Script einmal ab"""
+        if self.playback_backend != "bash":
+            return self.play_recording()
+        if self.speed_curve:
+            self.log(f"Bash-Backend unterstützt keine Speed-Kurve - spiele mit {self.playback_speed}x", "WARN")
+        elif self.target_rate is not None:
+            self.log(f"Bash-Backend unterstützt keinen Durchsatz-Modus - spiele mit {self.playback_speed}x", "WARN")
+        if self.overhead_compensation and self.script_overhead is None:
+            self.calibrate_script()
+        
         # Erstelle speed-angepasstes Script
         script_to_play = self.create_speed_adjusted_script()
         if not script_to_play:
@@ -505,7 +1022,9 @@ class EnhancedTouchPlayer:
             return False
         
         speed_info = f" @ {self.playback_speed}x Speed" if self.playback_speed != 1.0 else ""
-        self.log(f"Starte Playback #{self.play_count + 1}{speed_info}")
+        loop = self.play_count + 1
+        self.log(f"Starte Playback #{loop}{speed_info}")
+        start_time = time.perf_counter()
         
         try:
             # Führe Script aus
@@ -526,10 +1045,17 @@ class EnhancedTouchPlayer:
                     
             # Warte auf Ende
             self.current_process.wait()
+            returncode = self.current_process.returncode
+            elapsed = time.perf_counter() - start_time
+            duration = self.estimate_duration(self.selected_script)
+            effective = duration / elapsed if returncode == 0 and duration and elapsed > 0 else 0.0
+            self.write_fidelity(loop, {'completed': returncode == 0, 'returncode': returncode,
+                                       'elapsed': elapsed, 'effective_speed': effective})
             
-            if self.current_process.returncode == 0:
+            if returncode == 0:
                 self.play_count += 1
-                self.log(f"Playback #{self.play_count} erfolgreich{speed_info}")
+                reached = f" ({effective:.2f}x erreicht)" if effective else ""
+                self.log(f"Playback #{self.play_count} erfolgreich{speed_info}{reached}")
                 return True
             else:
                 self.log(f"Playback Fehler: Return Code {self.current_process.returncode}", "ERROR")
@@ -545,6 +1071,7 @@ class EnhancedTouchPlayer:
         """Hauptloop für Playback mit Random Speed Support"""
         self.running = True
         self.play_count = 0
+        self.curve_elapsed = 0.0
         start_time = time.time()
         
         # Speed History für Statistiken
@@ -553,6 +1080,10 @@ class EnhancedTouchPlayer:
         speed_info = f" @ {self.playback_speed}x" if self.playback_speed != 1.0 else ""
         if self.use_random_speed:
             speed_info = f" mit Random Speed ({self.random_speed_min}x-{self.random_speed_max}x)"
+        elif self.speed_curve:
+            speed_info = f" mit Speed-Kurve ({self.speed_curve.describe()})"
+        elif self.target_rate is not None:
+            speed_info = f" mit {self.speed_label()}"
         
         self.log(f"Starte Loop-Modus: {self.loop_mode}{speed_info}")
         
@@ -636,9 +1167,12 @@ class EnhancedTouchPlayer:
         print(f"{Colors.GREEN}📊 PLAYBACK STATISTIKEN{Colors.NC}")
         print(f"{Colors.GREEN}╚══════════════════════════════════════╝{Colors.NC}")
         print(f"Script: {Colors.BLUE}{os.path.basename(self.selected_script)}{Colors.NC}")
-        print(f"Geschwindigkeit: {Colors.YELLOW}{self.playback_speed}x{Colors.NC}")
+        print(f"Geschwindigkeit: {Colors.YELLOW}{self.speed_label()}{Colors.NC}")
         print(f"Durchläufe: {Colors.YELLOW}{self.play_count}{Colors.NC}")
         print(f"Log-Datei: {Colors.BLUE}{self.log_file}{Colors.NC}")
+        _, jsonl_path = self.fidelity_paths()
+        if os.path.exists(jsonl_path):
+            print(f"Fidelity: {Colors.BLUE}{jsonl_path}{Colors.NC}")
     
     def monitor_mode(self):
         """Live-Monitor Modus mit Speed-Anzeige und Random Speed Support"""
@@ -649,7 +1183,7 @@ class EnhancedTouchPlayer:
             print(f"Speed Mode: {Colors.YELLOW}RANDOM ({self.random_speed_min}x - {self.random_speed_max}x){Colors.NC}")
             print(f"Change Mode: {Colors.YELLOW}{self.speed_change_mode}{Colors.NC}")
         else:
-            print(f"Speed: {Colors.YELLOW}{self.playback_speed}x{Colors.NC}")
+            print(f"Speed: {Colors.YELLOW}{self.speed_label()}{Colors.NC}")
             
         print(f"Status: {Colors.GREEN}LÄUFT{Colors.NC}")
         print(f"\n{Colors.YELLOW}[Strg+C zum Stoppen]{Colors.NC}\n")
@@ -679,6 +1213,8 @@ class EnhancedTouchPlayer:
                         if len(speed_log) > 1:
                             trend = "↑" if speed_log[-1] > speed_log[-2] else "↓"
                             status += f" {trend}"
+                elif self.speed_curve and self.engine:
+                    status += f" | 📉 Speed: {self.engine.current_speed:.2f}x"
                 else:
                     status += f" | Speed: {self.playback_speed}x"
                     
@@ -705,6 +1241,8 @@ class EnhancedTouchPlayer:
         print(f"Teste verschiedene Geschwindigkeiten...")
         
         test_speeds = [0.5, 1.0, 1.5, 2.0, 3.0]
+        speed_curve, self.speed_curve = self.speed_curve, None  # Feste Stufen testen
+        target_rate, self.target_rate = self.target_rate, None
         
         for speed in test_speeds:
             self.playback_speed = speed
@@ -713,7 +1251,14 @@ class EnhancedTouchPlayer:
             start_time = time.time()
             if self.play_script():
                 elapsed = time.time() - start_time
-                print(f"{Colors.GREEN}✓ {speed}x: {elapsed:.1f}s{Colors.NC}")
+                fidelity = ""
+                lateness = (self.last_fidelity or {}).get('lateness')
+                if lateness and lateness['count']:
+                    fidelity = f" | p99 {lateness['p99']:.2f}ms, Drift {self.last_fidelity['drift_ms']:+.2f}ms"
+                effective = (self.last_fidelity or {}).get('effective_speed')
+                reached = f" → {effective:.2f}x erreicht" if effective else ""
+                color = Colors.GREEN if not effective or effective >= speed * 0.97 else Colors.YELLOW
+                print(f"{color}✓ {speed}x: {elapsed:.1f}s{reached}{fidelity}{Colors.NC}")
             else:
                 print(f"{Colors.RED}✗ {speed}x: Fehler{Colors.NC}")
             
@@ -723,8 +1268,71 @@ class EnhancedTouchPlayer:
         
         # Reset auf normal
         self.playback_speed = 1.0
+        self.speed_curve = speed_curve
+        self.target_rate = target_rate
         print(f"\n{Colors.GREEN}Speed-Test abgeschlossen!{Colors.NC}")
     
+    def farm_mode(self):
+        """Recording parallel auf mehreren Displays abspielen (ein Prozess pro Display, Plan in Shared Memory)"""
+        print(f"\n{Colors.CYAN}=== PARALLEL-PLAYBACK ==={Colors.NC}")
+        print(f"{Colors.GRAY}Zahl = so viele lokale Xvfb-Server starten, Liste = vorhandene Displays (:1,:2,...){Colors.NC}")
+        if self.playback_backend in ("bash", "uinput"):
+            print(f"{Colors.YELLOW}⚠️  {self.playback_backend} ist nicht pro Display nutzbar - verwende auto{Colors.NC}")
+        backend = self.playback_backend if self.playback_backend not in ("bash", "uinput") else "auto"
+        
+        servers = []
+        try:
+            target = input(f"\n{Colors.CYAN}Displays [4]: {Colors.NC}").strip() or "4"
+            loops = int(input(f"Durchläufe pro Display [{self.loop_count}]: ") or self.loop_count)
+            plan = self.replay_plan()
+            meta = recording_info(self.selected_script).meta
+            if target.isdigit():
+                servers = start_xvfb(int(target), (meta.get('width', 1920), meta.get('height', 1080)))
+                displays = [server.display for server in servers]
+                offset = (0, 0)
+                self.log(f"Xvfb gestartet: {', '.join(displays)}")
+            else:
+                displays = [display.strip() for display in target.split(',') if display.strip()]
+                offset = self.get_replay_offset()
+            
+            jobs = [{'display': display, 'recording': self.selected_script, 'plan': plan, 'backend': backend,
+                     'speed': self.speed_curve or self.playback_speed, 'rate': self.target_rate,
+                     'loops': loops, 'offset': offset}
+                    for display in displays]
+            self.log(f"Parallel-Playback: {len(jobs)} Displays x {loops} Durchläufe @ {self.speed_label()}")
+            summary, results = run_farm(jobs)
+        except (OSError, ValueError) as e:
+            self.log(f"Parallel-Playback nicht möglich: {e}", "ERROR")
+            return False
+        finally:
+            for server in servers:
+                server.stop()
+        
+        for result in results:
+            if result['error']:
+                self.log(f"{result['display']}: {result['error']}", "ERROR")
+                continue
+            done = sum(1 for loop in result['loops'] if loop['completed'])
+            histogram = result['histogram']
+            self.log(f"{result['display']} [{result['backend']}]: {done}/{loops} Durchläufe | "
+                     f"p50 {histogram['p50']:.2f}ms | p99 {histogram['p99']:.2f}ms | max {histogram['max']:.2f}ms",
+                     "INFO" if done == loops else "WARN")
+        lateness = summary['lateness_ms']
+        self.log(f"Gesamt: {summary['events']} Events in {summary['wall_s']:.1f}s ({summary['events_per_s']:.0f}/s, "
+                 f"{summary['workers']} Worker) | p50 {lateness['p50']:.2f}ms | p99 {lateness['p99']:.2f}ms | "
+                 f"max {lateness['max']:.2f}ms", "INFO" if summary['completed'] else "WARN")
+        
+        _, jsonl_path = self.fidelity_paths()
+        entry = {'farm': summary, 'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                 'recording': os.path.basename(self.selected_script), 'speed': self.speed_label(),
+                 'displays': results}
+        try:
+            with open(jsonl_path, 'a') as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            self.log(f"Fidelity-Report nicht schreibbar: {e}", "WARN")
+        return summary['completed']
+    
     def run(self):
         """Hauptprogramm"""
         print(f"{Colors.MAGENTA}╔═══════════════════════════════════════╗{Colors.NC}")
@@ -744,7 +1352,7 @@ class EnhancedTouchPlayer:
                 if self.use_random_speed:
                     print(f"🎲 Speed: {Colors.YELLOW}Random ({self.random_speed_min}x-{self.random_speed_max}x){Colors.NC}")
                 else:
-                    print(f"🎮 Speed: {Colors.GREEN}{self.playback_speed}x{Colors.NC}")
+                    print(f"🎮 Speed: {Colors.GREEN}{self.speed_label()}{Colors.NC}")
                     
                 # Loop-Anzeige
                 if self.loop_mode == "duration":
@@ -761,6 +1369,9 @@ class EnhancedTouchPlayer:
             print(f"{Colors.YELLOW}[5]{Colors.NC} 📊 Monitor-Modus")
             print(f"{Colors.YELLOW}[6]{Colors.NC} 🧪 Speed-Test (alle Geschwindigkeiten)")
             print(f"{Colors.YELLOW}[7]{Colors.NC} 📈 Statistiken")
+            print(f"{Colors.YELLOW}[8]{Colors.NC} 🔌 Injection-Backend ({self.playback_backend})")
+            print(f"{Colors.YELLOW}[9]{Colors.NC} 🔍 Verifikation ({'an' if self.verify_replay else 'aus'})")
+            print(f"{Colors.YELLOW}[10]{Colors.NC} 🖥️  Parallel-Playback (mehrere Displays)")
             print(f"{Colors.YELLOW}[0]{Colors.NC} Beenden")
             
             choice = input(f"\n{Colors.CYAN}Auswahl: {Colors.NC}")
@@ -803,6 +1414,18 @@ class EnhancedTouchPlayer:
                     self.show_stats()
                 else:
                     print(f"{Colors.YELLOW}Noch keine Statistiken vorhanden{Colors.NC}")
+                    
+            elif choice == '8':
+                self.configure_backend()
+                
+            elif choice == '9':
+                self.configure_verification()
+                
+            elif choice == '10':
+                if self.selected_script:
+                    self.farm_mode()
+                else:
+                    print(f"{Colors.RED}❌ Bitte erst Recording auswählen!{Colors.NC}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Farm-Replay - Recordings parallel auf mehreren X Displays abspielen
+
+Startet auf Wunsch N lokale Xvfb-Server (:1..:N bzw. die nächsten freien
+Nummern) oder nutzt vorhandene Displays. Pro Display läuft ein Worker-Prozess
+mit eigenem Injection-Backend; die kompilierten Pläne liegen einmal in
+Shared Memory. Mehrere Recordings werden reihum auf die Displays verteilt.
+Exit-Code 0 = alle Durchläufe vollständig, 1 = Abbruch/Fehler, 2 = Setup-Fehler.
+
+Verwendung:
+    python3 farm-replay.py login.trec --xvfb 8 --loops 20
+    python3 farm-replay.py login.trec search.trec --displays :1,:2,:3 --speed ramp:1:3:30
+    python3 farm-replay.py login.trec --xvfb 4 --workers 2 --report farm.json
+    python3 farm-replay.py login.trec --xvfb 4 --rate max     # Aufnahme-Timing ignorieren
+    python3 farm-replay.py login.trec --xvfb 4 --resample frame:60
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from touch_format import recording_info
+from touch_replay import PlanCache, parse_rate
+from touch_speed import parse_curve, ConstantSpeed
+from touch_geometry import parse_resample
+from touch_farm import run_farm, start_xvfb
+
+# Farben
+class Colors:
+    RED = '\033[0;31m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    CYAN = '\033[0;36m'
+    GRAY = '\033[0;90m'
+    NC = '\033[0m'
+
+
+def parse_size(text):
+    width, _, height = text.lower().partition('x')
+    return int(width), int(height)
+
+
+def parse_offset(text):
+    x, _, y = text.partition(',')
+    return int(x), int(y)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('recordings', nargs='+', help='.trec oder .sh (reihum auf die Displays verteilt)')
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--xvfb', type=int, metavar='N', help='N lokale Xvfb-Server starten')
+    target.add_argument('--displays', help='Vorhandene Displays, z.B. :1,:2,:3')
+    parser.add_argument('--size', type=parse_size, help='Xvfb-Auflösung BxH (Standard: größter Monitor der Recordings)')
+    parser.add_argument('--backend', choices=['auto', 'xtest', 'xdotool'], default='auto',
+                        help='uinput ist systemweit und nicht pro Display nutzbar')
+    parser.add_argument('--workers', type=int, help='Parallele Prozesse (Standard: min(Displays, CPU-Kerne))')
+    parser.add_argument('--speed', default='1.0', help='Faktor oder Speed-Kurve (ramp:1:3:30, sine:1:0.5:10, ...)')
+    parser.add_argument('--rate', type=parse_rate,
+                        help='Durchsatz statt Aufnahme-Timing: max oder Events/s (ersetzt --speed)')
+    parser.add_argument('--resample', type=parse_resample,
+                        help='Drags vor dem Replay ausdünnen: frame:HZ[:PX][:up] oder window:MS[:PX]')
+    parser.add_argument('--loops', type=int, default=1)
+    parser.add_argument('--offset', type=parse_offset,
+                        help='Offset X,Y (Standard: 0,0 bei Xvfb, sonst aufgezeichnete Monitor-Position)')
+    parser.add_argument('--report', help='Zusammenfassung + Ergebnisse pro Display als JSON')
+    args = parser.parse_args()
+
+    try:
+        cache = PlanCache()
+        metas = [recording_info(path).meta for path in args.recordings]
+        speed = parse_curve(args.speed)
+        if isinstance(speed, ConstantSpeed):
+            speed = speed.speed
+        resampler = args.resample
+        if resampler and isinstance(speed, float) and args.rate is None:
+            resampler = resampler.for_speed(speed)
+        plans = [cache.get(path, resampler) for path in args.recordings]
+    except (OSError, ValueError) as e:
+        print(f"{Colors.RED}✗ {e}{Colors.NC}")
+        return 2
+
+    servers = []
+    if args.xvfb:
+        size = args.size or (max(meta.get('width', 1920) for meta in metas),
+                             max(meta.get('height', 1080) for meta in metas))
+        try:
+            servers = start_xvfb(args.xvfb, size)
+        except OSError as e:
+            print(f"{Colors.RED}✗ {e}{Colors.NC}")
+            return 2
+        displays = [server.display for server in servers]
+        print(f"{Colors.CYAN}Xvfb gestartet: {', '.join(displays)} ({size[0]}x{size[1]}){Colors.NC}")
+    else:
+        displays = [display.strip() for display in args.displays.split(',') if display.strip()]
+
+    jobs = []
+    for n, display in enumerate(displays):
+        index = n % len(plans)
+        meta = metas[index]
+        offset = args.offset or ((0, 0) if servers else (meta.get('monitor_x', 0), meta.get('monitor_y', 0)))
+        jobs.append({'display': display, 'recording': args.recordings[index], 'plan': plans[index],
+                     'backend': args.backend, 'speed': speed, 'rate': args.rate, 'loops': args.loops, 'offset': offset})
+
+    workers = args.workers or min(len(jobs), os.cpu_count() or 1)
+    print(f"{Colors.CYAN}{len(jobs)} Displays, {workers} Worker, {args.loops} Durchläufe pro Display{Colors.NC}")
+    try:
+        summary, results = run_farm(jobs, workers)
+    finally:
+        for server in servers:
+            server.stop()
+
+    for result in results:
+        name = os.path.basename(result['recording'])
+        if result['error']:
+            print(f"{Colors.RED}✗ {result['display']} {name}: {result['error']}{Colors.NC}")
+            continue
+        loops = result['loops']
+        done = sum(1 for loop in loops if loop['completed'])
+        histogram = result['histogram']
+        mark = f"{Colors.GREEN}✓" if done == args.loops else f"{Colors.YELLOW}⚠"
+        print(f"{mark} {result['display']} {name} [{result['backend']}]: {done}/{args.loops} Durchläufe, "
+              f"{sum(loop['events'] for loop in loops)} Events, p50 {histogram['p50']:.2f}ms "
+              f"p99 {histogram['p99']:.2f}ms max {histogram['max']:.2f}ms{Colors.NC}")
+
+    lateness = summary['lateness_ms']
+    print(f"\n{Colors.CYAN}Gesamt: {summary['events']} Events in {summary['wall_s']:.1f}s "
+          f"({summary['events_per_s']:.0f} Events/s), Verspätung p50 {lateness['p50']:.2f}ms "
+          f"p99 {lateness['p99']:.2f}ms max {lateness['max']:.2f}ms{Colors.NC}")
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({'summary': summary, 'displays': results, 'speed': args.speed, 'rate': args.rate,
+                       'resampling': resampler.spec() if resampler else None}, f, indent=2)
+        print(f"{Colors.GRAY}Report: {args.report}{Colors.NC}")
+
+    return 0 if summary['completed'] and results else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
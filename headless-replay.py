@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Headless-Replay - Reproduzierbarer Performance-Check gegen ein eigenes Xvfb
+
+Startet ein lokales Xvfb in der Auflösung des Recordings (RECORDED_WIDTH x
+RECORDED_HEIGHT), öffnet darin ein bildschirmfüllendes Logging-Fenster und
+spielt das Recording über die Replay-Engine ab. Ausgewertet werden Durchsatz,
+Ausgabe-Verspätung (geplant vs. tatsächlich) und die im Fenster angekommenen
+Events (Latenz und Positionsabweichung pro Geste). Keine Rückfragen, kein
+Desktop und keine Hardware nötig.
+Exit-Code 0 = alle Durchläufe innerhalb der Grenzen, 1 = Grenze verletzt, 2 = Setup-Fehler.
+
+Verwendung:
+    python3 headless-replay.py login.trec
+    python3 headless-replay.py login.trec --loops 5 --max-p99 2 --px 1 --ms 10 --report ci.json
+    python3 headless-replay.py login.trec --rate 2000 --min-rate 1900   # Durchsatz statt Aufnahme-Timing
+    python3 headless-replay.py login.trec --resample frame:60 --px 1     # ein Move pro 60 Hz Frame
+    xvfb-run -s "-screen 0 1920x1080x24" python3 headless-replay.py login.trec --display "$DISPLAY"
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from touch_format import recording_info
+from touch_replay import open_backend, ReplayEngine, PlanCache, parse_rate
+from touch_speed import parse_curve, ConstantSpeed
+from touch_stats import LatencyHistogram
+from touch_geometry import parse_resample
+from touch_verify import XWindowCapture, XInputCapture, verify
+from touch_farm import XvfbServer, free_display_numbers
+
+# Farben
+class Colors:
+    RED = '\033[0;31m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    CYAN = '\033[0;36m'
+    GRAY = '\033[0;90m'
+    NC = '\033[0m'
+
+
+def play_loop(engine, capture, plan, speed, args):
+    """Ein Durchlauf mit Mitschnitt; liefert Kennzahlen und Gesten-Abgleich"""
+    capture.start()
+    result = engine.play(plan, speed, (0, 0), rate=args.rate)
+    time.sleep(args.settle)
+    received = capture.stop()
+    summary, gestures = verify(plan, result['trace'], received, result['origin'], (0, 0), args.px, args.ms)
+    report = result['trace'].report(plan)
+    elapsed = result['elapsed']
+    return {
+        'events': result['events'],
+        'received_events': len(received),
+        'elapsed_s': round(elapsed, 4),
+        'events_per_s': round(result['events_per_s'], 1),
+        'gestures_per_s': round(result['gestures_per_s'], 2),
+        'rate_shortfall': round(result.get('rate_shortfall', 0.0), 4),
+        'lateness': {k: round(v, 4) for k, v in report['lateness'].items()},
+        'drift_ms': round(report['drift_ms'], 4),
+        'worst_gestures': report['worst_gestures'],
+        'verification': summary,
+        'completed': result['completed'],
+    }, result['trace'], gestures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('recording', help='.trec oder .sh')
+    parser.add_argument('--display', help='Vorhandenes Display nutzen statt ein Xvfb zu starten')
+    parser.add_argument('--backend', choices=['auto', 'xtest', 'xdotool'], default='auto')
+    parser.add_argument('--capture', choices=['window', 'xinput'], default='window',
+                        help='Logging-Fenster (Core Events, Standard) oder XInput2 Raw Events am Root-Fenster')
+    parser.add_argument('--speed', default='1.0', help='Faktor oder Speed-Kurve')
+    parser.add_argument('--rate', type=parse_rate,
+                        help='Durchsatz statt Aufnahme-Timing: max oder Events/s (ersetzt --speed)')
+    parser.add_argument('--min-rate', type=float, help='Untergrenze für die erreichten Events/s pro Durchlauf')
+    parser.add_argument('--resample', type=parse_resample,
+                        help='Drags vor dem Replay ausdünnen: frame:HZ[:PX][:up] oder window:MS[:PX]')
+    parser.add_argument('--loops', type=int, default=3, help='Gemessene Durchläufe')
+    parser.add_argument('--warmup', type=int, default=1, help='Durchläufe vorab, die nicht zählen')
+    parser.add_argument('--px', type=float, default=1.0, help='Toleranz Position (Standard: 1px)')
+    parser.add_argument('--ms', type=float, default=10.0, help='Toleranz Start/Ende pro Geste (Standard: 10ms)')
+    parser.add_argument('--max-p99', type=float, help='Grenze für die p99 Ausgabe-Verspätung in ms')
+    parser.add_argument('--settle', type=float, default=0.1, help='Wartezeit auf Nachzügler nach jedem Durchlauf (s)')
+    parser.add_argument('--report', help='Ergebnis als JSON')
+    args = parser.parse_args()
+
+    try:
+        cache = PlanCache()
+        meta = recording_info(args.recording).meta
+        speed = parse_curve(args.speed)
+        if isinstance(speed, ConstantSpeed):
+            speed = speed.speed
+        resampler = args.resample
+        if resampler and isinstance(speed, float) and args.rate is None:
+            resampler = resampler.for_speed(speed)
+        original = len(cache.get(args.recording))
+        plan = cache.get(args.recording, resampler)
+    except (OSError, ValueError) as e:
+        print(f"{Colors.RED}✗ {e}{Colors.NC}")
+        return 2
+    size = (meta.get('width') or 1920, meta.get('height') or 1080)
+
+    server = backend = capture = None
+    try:
+        if args.display:
+            display = args.display
+        else:
+            server = XvfbServer(free_display_numbers(1, 90)[0], size)
+            display = server.display
+        if args.capture == 'window':
+            capture = XWindowCapture(display, size)
+        else:
+            capture = XInputCapture(display)
+        backend = open_backend(args.backend, display)
+    except OSError as e:
+        print(f"{Colors.RED}✗ {e}{Colors.NC}")
+        if capture:
+            capture.close()
+        if server:
+            server.stop()
+        return 2
+
+    print(f"{Colors.CYAN}{args.recording}: {len(plan)} Events, {size[0]}x{size[1]} auf {display}, "
+          f"Backend {backend.name}, Mitschnitt {capture.name}{Colors.NC}")
+    if resampler:
+        print(f"{Colors.GRAY}Resampling {resampler.describe()}: {original} → {len(plan)} Events{Colors.NC}")
+    engine = ReplayEngine(backend)
+    histogram = LatencyHistogram()  # Ausgabe-Verspätung aller gemessenen Events (ns)
+    loops = []
+    try:
+        for n in range(args.warmup + args.loops):
+            warmup = n < args.warmup
+            entry, trace, gestures = play_loop(engine, capture, plan, speed, args)
+            if not entry['completed']:
+                break
+            if warmup:
+                print(f"{Colors.GRAY}  Aufwärmen {n + 1}/{args.warmup}: {entry['elapsed_s']:.2f}s{Colors.NC}")
+                continue
+            for late in trace.lateness_ms():
+                histogram.record(int(late * 1e6))
+            entry['loop'] = len(loops) + 1
+            entry['gestures'] = gestures
+            loops.append(entry)
+
+            summary = entry['verification']
+            lateness = entry['lateness']
+            passed = (summary['passed'] and (args.max_p99 is None or lateness['p99'] <= args.max_p99)
+                      and (args.min_rate is None or entry['events_per_s'] >= args.min_rate))
+            entry['passed'] = passed
+            mark = f"{Colors.GREEN}✓" if passed else f"{Colors.RED}✗"
+            print(f"{mark} #{entry['loop']}: {entry['events']} Events in {entry['elapsed_s']:.2f}s "
+                  f"({entry['events_per_s']:.0f}/s) | Ausgabe p50 {lateness['p50']:.2f}ms p99 {lateness['p99']:.2f}ms "
+                  f"| angekommen {summary['matched']}/{summary['gestures']} Gesten, "
+                  f"Latenz p50 {summary['latency_ms']['p50']:.2f}ms, max {summary['px']['max']:.1f}px{Colors.NC}")
+    except KeyboardInterrupt:
+        engine.stop()
+    finally:
+        capture.close()
+        backend.close()
+        if server:
+            server.stop()
+
+    total = histogram.summary()
+    events = sum(entry['events'] for entry in loops)
+    elapsed = sum(entry['elapsed_s'] for entry in loops)
+    passed = len(loops) == args.loops and all(entry['passed'] for entry in loops)
+    result = {
+        'recording': args.recording,
+        'display': 'xvfb' if server else display,
+        'size': list(size),
+        'backend': backend.name,
+        'capture': capture.name,
+        'speed': args.speed,
+        'rate': args.rate,
+        'resampling': resampler.spec() if resampler else None,
+        'recorded_events': original,
+        'loops': len(loops),
+        'events': events,
+        'events_per_s': round(events / elapsed, 1) if elapsed > 0 else 0.0,
+        'lateness_ms': total,
+        'gesture_latency_ms': max((entry['verification']['latency_ms']['max'] for entry in loops), default=0.0),
+        'px_max': max((entry['verification']['px']['max'] for entry in loops), default=0.0),
+        'passed': passed,
+    }
+    color = Colors.GREEN if passed else Colors.RED
+    print(f"\n{color}{'✅ OK' if passed else '❌ FEHLER'}: {len(loops)}/{args.loops} Durchläufe, "
+          f"{result['events_per_s']:.0f} Events/s, Ausgabe p99 {total['p99']:.2f}ms max {total['max']:.2f}ms, "
+          f"Gesten-Latenz max {result['gesture_latency_ms']:.2f}ms, max {result['px_max']:.1f}px{Colors.NC}")
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({'summary': result, 'loops': loops}, f, indent=2)
+        print(f"{Colors.GRAY}Report: {args.report}{Colors.NC}")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,101 +1,157 @@
 #!/usr/bin/env python3
 """
 Einfache Touch-Kalibrierung - Standalone Tool
+
+Liest Achsenbereiche per EVIOCGABS, lässt 3/4/9 Zielpunkte antippen, fittet
+eine affine Kalibriermatrix (Least-Squares) und speichert sie als Profil pro
+Device und Monitor. smooth-touch-recorder.py lädt das Profil automatisch.
 """
 
+import argparse
 import subprocess
+import shutil
 import re
-import time
-import sys
+
+from touch_evdev import EvdevReader, SlotTracker
+from touch_calibration import (CalibrationMatrix, calibration_targets, device_axes,
+                               save_profile)
 
 # Farben
 RED = '\033[0;31m'
 GREEN = '\033[0;32m'
 YELLOW = '\033[1;33m'
 CYAN = '\033[0;36m'
+GRAY = '\033[0;90m'
 NC = '\033[0m'
 
-def calibrate_touch(device_num):
-    """Einfache Touch-Kalibrierung"""
+def get_monitors():
+    """Monitore aus xrandr: name -> (width, height, x, y)"""
+    monitors = {}
+    try:
+        result = subprocess.run(['xrandr'], capture_output=True, text=True)
+    except OSError:
+        return monitors
+    for line in result.stdout.split('\n'):
+        if ' connected' in line:
+            match = re.search(r'(\d+)x(\d+)\+(\d+)\+(\d+)', line)
+            if match:
+                monitors[line.split()[0]] = tuple(int(v) for v in match.groups())
+    return monitors
+
+def choose_monitor(name=None):
+    """Monitor per Name oder Auswahl; ohne xrandr Größe manuell eingeben"""
+    monitors = get_monitors()
+    if name and name in monitors:
+        return name, monitors[name]
+    if not monitors:
+        print(f"{YELLOW}Keine Monitore über xrandr gefunden - bitte Größe eingeben{NC}")
+        width = int(input("  Breite [1920]: ") or 1920)
+        height = int(input("  Höhe [1200]: ") or 1200)
+        return name or "default", (width, height, 0, 0)
+
+    names = list(monitors)
+    for i, monitor in enumerate(names):
+        width, height, x, y = monitors[monitor]
+        print(f"{YELLOW}[{i+1}]{NC} {monitor}: {width}x{height} @ ({x},{y})")
+    choice = int(input(f"\nMonitor wählen [1-{len(names)}]: "))
+    return names[choice - 1], monitors[names[choice - 1]]
+
+def capture_tap(frames, tracker):
+    """Warte auf einen Tap und liefere die Median-Rohposition des ersten Kontakts"""
+    samples = []
+    slot = None
+    for _, events in frames:
+        tracker.update(events)
+        if slot is None and tracker.began:
+            slot = next(iter(tracker.began))
+            samples = []
+        if slot is None:
+            continue
+        if slot in tracker.positions and slot not in tracker.ended:
+            samples.append(tuple(tracker.positions[slot]))
+        if slot in tracker.ended:
+            if samples:
+                # Median gegen Ausreißer beim Aufsetzen/Abheben
+                xs = sorted(x for x, _ in samples)
+                ys = sorted(y for _, y in samples)
+                return xs[len(xs) // 2], ys[len(ys) // 2]
+            slot = None
+    raise EOFError("Device geschlossen")
+
+def calibrate_touch(device_num, monitor=None, point_count=9):
+    """Touch-Kalibrierung mit Profil-Speicherung"""
     device_path = f"/dev/input/event{device_num}"
-    
+
     print(f"\n{YELLOW}🎯 TOUCH-KALIBRIERUNG{NC}")
     print(f"Device: {device_path}")
-    print(f"\n{GREEN}Anleitung:{NC}")
-    print("1. Ich zeige dir die Touch-Werte")
-    print("2. Berühre Oben Links → notiere X,Y")
-    print("3. Berühre Unten Rechts → notiere X,Y")
-    print("4. Drücke Strg+C zum Beenden")
-    print(f"\n{RED}Enter zum Start...{NC}")
-    input()
-    
-    cmd = ['sudo', 'evtest', device_path]
-    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
-    
-    last_x = 0
-    last_y = 0
-    
-    print(f"\n{CYAN}Touch-Events (berühre den Screen):{NC}")
-    print("-" * 40)
-    
+
+    reader = EvdevReader(device_path)
     try:
-        for line in proc.stdout:
-            # X-Koordinate
-            if "ABS_MT_POSITION_X" in line or "ABS_X" in line:
-                match = re.search(r'value (\d+)', line)
-                if match:
-                    last_x = int(match.group(1))
-                    
-            # Y-Koordinate
-            elif "ABS_MT_POSITION_Y" in line or "ABS_Y" in line:
-                match = re.search(r'value (\d+)', line)
-                if match:
-                    last_y = int(match.group(1))
-                    # Zeige aktuelle Position
-                    print(f"\rPosition: X={last_x:5d}, Y={last_y:5d}", end='', flush=True)
-                    
+        device_name = reader.name()
+        (x_min, x_max), (y_min, y_max), (res_x, res_y) = device_axes(reader)
+        print(f"Name: {device_name}")
+        print(f"Achsen (EVIOCGABS): X {x_min}..{x_max}, Y {y_min}..{y_max}")
+        if res_x and res_y:
+            print(f"{GRAY}Auflösung: {res_x}/mm x {res_y}/mm → "
+                  f"{(x_max - x_min) / res_x:.0f} x {(y_max - y_min) / res_y:.0f} mm{NC}")
+
+        monitor, (width, height, offset_x, offset_y) = choose_monitor(monitor)
+        print(f"Monitor: {monitor} {width}x{height} @ ({offset_x},{offset_y})")
+
+        targets = calibration_targets(width, height, point_count)
+        use_pointer = shutil.which('xdotool') is not None
+
+        print(f"\n{GREEN}Anleitung:{NC}")
+        if use_pointer:
+            print(f"Der Mauszeiger markiert nacheinander {len(targets)} Punkte - tippe jeweils genau darauf")
+        else:
+            print(f"Tippe nacheinander auf die {len(targets)} angegebenen Pixel-Positionen")
+        print(f"\n{RED}Enter zum Start...{NC}")
+        input()
+
+        frames = reader.frames()
+        tracker = SlotTracker()
+        raw_points = []
+        for i, (tx, ty) in enumerate(targets, 1):
+            if use_pointer:
+                subprocess.run(['xdotool', 'mousemove', str(offset_x + tx), str(offset_y + ty)])
+            print(f"{CYAN}Punkt {i}/{len(targets)}: ({tx}, {ty}){NC} ", end='', flush=True)
+            raw = capture_tap(frames, tracker)
+            raw_points.append(raw)
+            print(f"→ Rohwert X={raw[0]:5d}, Y={raw[1]:5d}")
     except KeyboardInterrupt:
-        print(f"\n\n{GREEN}Kalibrierung beendet{NC}")
-        
+        print(f"\n\n{YELLOW}Kalibrierung abgebrochen{NC}")
+        return
     finally:
-        proc.terminate()
-        
-    # Manuelle Eingabe
-    print(f"\n{YELLOW}Bitte gib die notierten Werte ein:{NC}")
-    
-    try:
-        print("\nOben Links:")
-        x_min = int(input("  X-Wert: "))
-        y_min = int(input("  Y-Wert: "))
-        
-        print("\nUnten Rechts:")
-        x_max = int(input("  X-Wert: "))
-        y_max = int(input("  Y-Wert: "))
-        
-        # Berechne Bereich
-        touch_max_x = x_max - x_min
-        touch_max_y = y_max - y_min
-        
-        print(f"\n{GREEN}✅ ERGEBNIS:{NC}")
-        print(f"Touch-Bereich: {touch_max_x} x {touch_max_y}")
-        print(f"Touch-Offset: ({x_min}, {y_min})")
-        
-        print(f"\n{CYAN}Füge diese Werte in touchscreen-simple.py ein:{NC}")
-        print(f"self.touch_max_x = {touch_max_x}")
-        print(f"self.touch_max_y = {touch_max_y}")
-        print(f"self.touch_offset_x = {x_min}")
-        print(f"self.touch_offset_y = {y_min}")
-        
-    except ValueError:
-        print(f"{RED}Ungültige Eingabe!{NC}")
+        reader.close()
+
+    matrix = CalibrationMatrix.fit(raw_points, targets)
+    errors = matrix.residuals(raw_points, targets)
+    linear = CalibrationMatrix.from_axes(x_min, x_max, y_min, y_max, width, height)
+    linear_errors = linear.residuals(raw_points, targets)
+
+    print(f"\n{GREEN}✅ ERGEBNIS:{NC}")
+    a, b, c, d, e, f = matrix.coefficients
+    print(f"x' = {a:.6f}*x + {b:+.6f}*y + {c:+.2f}")
+    print(f"y' = {d:.6f}*x + {e:+.6f}*y + {f:+.2f}")
+    print(f"Fehler (Matrix):     Ø {sum(errors) / len(errors):.1f}px, max {max(errors):.1f}px")
+    print(f"Fehler (nur Achsen): Ø {sum(linear_errors) / len(linear_errors):.1f}px, max {max(linear_errors):.1f}px")
+
+    path = save_profile(device_name, monitor, width, height, matrix, round(max(errors), 2))
+    print(f"\n{CYAN}Profil gespeichert: {path}{NC}")
+    print(f"{GRAY}smooth-touch-recorder.py verwendet es automatisch für '{device_name}' auf {monitor}{NC}")
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        device = input("Touch-Device Nummer (z.B. 15): ")
-    else:
-        device = sys.argv[1]
-        
+    parser = argparse.ArgumentParser(description="Touch-Kalibrierung (affine Matrix pro Device und Monitor)")
+    parser.add_argument('device', nargs='?', help="Touch-Device Nummer (z.B. 15)")
+    parser.add_argument('--monitor', help="xrandr Monitor-Name (Standard: Auswahl)")
+    parser.add_argument('--points', type=int, choices=(3, 4, 9), default=9,
+                        help="Anzahl Kalibrierpunkte (Standard: 9 = 3x3 Raster)")
+    args = parser.parse_args()
+
+    device = args.device or input("Touch-Device Nummer (z.B. 15): ")
+
     try:
-        calibrate_touch(int(device))
+        calibrate_touch(int(device), args.monitor, args.points)
     except Exception as e:
         print(f"{RED}Fehler: {e}{NC}")
@@ -6,12 +6,24 @@ Precision Touchscreen Recorder - Mit exaktem Timing und Resolution Validation
 import os
 import sys
 import time
+import argparse
 import subprocess
 import re
+import queue
+import threading
 from datetime import datetime
 from collections import deque
 import json
 
+from touch_format import (RecordingBuilder, write_trec, load_recording,
+                          script_header, script_footer, gesture_lines)
+from touch_geometry import StreamingSimplifier
+from touch_catalog import RecordingCatalog
+from touch_calibration import CalibrationMatrix, device_axes, load_profile
+from touch_stats import LatencyHistogram
+from touch_evdev import (open_event_source, EvdevReader, MultiDeviceReader, SlotTracker, KEY_SYMS,
+                         EV_ABS, EV_KEY, BTN_TOUCH, ABS_X, ABS_Y, ABS_MT_POSITION_X, ABS_MT_POSITION_Y)
+
 # Farben
 class Colors:
     RED = '\033[0;31m'
@@ -23,6 +35,294 @@ class Colors:
     GRAY = '\033[0;90m'
     NC = '\033[0m'
 
+class RecordingWriter(threading.Thread):
+    """Schreibt Script-Zeilen und Debug-NDJSON im Hintergrund über eine begrenzte Queue"""
+    
+    def __init__(self, output_file, debug_file=None, flush_policy="gesture", flush_interval=1.0,
+                 fsync=False, queue_size=1024):
+        super().__init__(name="recording-writer", daemon=True)
+        self.output = open(output_file, 'a')
+        self.debug = open(debug_file, 'a') if debug_file else None
+        self.flush_policy = flush_policy  # gesture: nach jeder Geste, interval: alle flush_interval s
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.error = None
+        self.write_histogram = LatencyHistogram()  # ns pro Eintrag inkl. Flush (nur vom Writer-Thread befüllt)
+        self.start()
+    
+    def write_lines(self, lines):
+        """Script-Zeilen einer Geste einreihen"""
+        self.queue.put(('script', lines))
+    
+    def write_debug(self, record):
+        """Debug-Datensatz einer Geste einreihen (eine JSON-Zeile)"""
+        if self.debug:
+            self.queue.put(('debug', record))
+    
+    def _flush(self):
+        for f in (self.output, self.debug):
+            if f:
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+    
+    def run(self):
+        last_flush = time.monotonic()
+        while True:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None
+            
+            try:
+                started = time.perf_counter_ns()
+                if item is not None:
+                    kind, payload = item
+                    if kind == 'stop':
+                        break
+                    if kind == 'script':
+                        self.output.writelines(payload)
+                    else:
+                        self.debug.write(json.dumps(payload) + "\n")
+                
+                now = time.monotonic()
+                if (item is not None and self.flush_policy == "gesture") or now - last_flush >= self.flush_interval:
+                    self._flush()
+                    last_flush = now
+                if item is not None:
+                    self.write_histogram.record(time.perf_counter_ns() - started)
+            except OSError as e:
+                self.error = e
+        
+        self._flush()
+    
+    def close(self, footer=None):
+        """Restliche Einträge schreiben, optional Footer anhängen und Dateien schließen"""
+        if footer:
+            self.queue.put(('script', [footer]))
+        self.queue.put(('stop', None))
+        self.join()
+        self.output.close()
+        if self.debug:
+            self.debug.close()
+        if self.error:
+            raise self.error
+
+
+class StatusDisplay(threading.Thread):
+    """Live-Statuszeile mit fester Rate aus gemeinsamen Zählern - Terminal-I/O bremst die Event-Schleife nicht"""
+    
+    CLEAR_LINE = '\r\033[K'
+    
+    def __init__(self, rate_hz=10.0, quiet=False, stream=None, max_notes=50):
+        super().__init__(name="status-display", daemon=True)
+        if not 0 < rate_hz < float('inf'):
+            raise ValueError(f"Status-Rate muss endlich und > 0 Hz sein, nicht {rate_hz} (keine Statuszeile: --quiet)")
+        self.interval = 1.0 / rate_hz
+        self.quiet = quiet
+        self.stream = stream or sys.stdout
+        self.notes = deque(maxlen=max_notes)  # Meldungen (Gesten), werden beim nächsten Refresh ausgegeben
+        self.skipped_notes = 0
+        self.stopped = threading.Event()
+        
+        # Gemeinsame Zähler - nur von der Event-Schleife geschrieben
+        self.touches = 0
+        self.points = 0
+        self.events = 0
+        self.position = None
+        self.min_interval = float('inf')
+        self.max_interval = 0
+        
+        self.rate = 0.0
+        self._last_events = 0
+        self._last_time = time.monotonic()
+        if not quiet:
+            self.start()
+    
+    def note(self, line):
+        """Meldung für den nächsten Refresh einreihen (älteste fallen bei Überlauf weg)"""
+        if self.quiet:
+            return
+        if len(self.notes) == self.notes.maxlen:
+            self.skipped_notes += 1
+        self.notes.append(line)
+    
+    def status_line(self):
+        position = f"({self.position[0]:4},{self.position[1]:4})" if self.position else "(   -,   -)"
+        interval = f"{self.min_interval}-{self.max_interval}ms" if self.min_interval < float('inf') else "-"
+        return (f"{Colors.GRAY}⏺ {self.touches} touches | {self.points} points | {position} | "
+                f"{self.rate:,.0f} ev/s | Δt {interval}{Colors.NC}")
+    
+    def render(self):
+        now = time.monotonic()
+        events = self.events
+        if now > self._last_time:
+            self.rate = (events - self._last_events) / (now - self._last_time)
+        self._last_events = events
+        self._last_time = now
+        
+        out = []
+        while self.notes:
+            out.append(self.CLEAR_LINE + self.notes.popleft() + "\n")
+        if self.skipped_notes:
+            out.append(f"{self.CLEAR_LINE}{Colors.GRAY}  ... {self.skipped_notes} Meldungen übersprungen{Colors.NC}\n")
+            self.skipped_notes = 0
+        out.append(self.CLEAR_LINE + self.status_line())
+        self.stream.write(''.join(out))
+        self.stream.flush()
+    
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.render()
+    
+    def close(self):
+        """Letzten Stand ausgeben und Renderer beenden"""
+        if self.quiet:
+            return
+        self.stopped.set()
+        self.join()
+        self.render()
+        self.stream.write("\n")
+        self.stream.flush()
+
+
+class ContactTrack:
+    """Punkte eines Kontakts (MT-Slot) innerhalb einer Geste, Zeiten relativ zum Gestenstart"""
+    
+    def __init__(self, x, y, rel_time, tolerance_px, tolerance_ms, max_points):
+        self.path = StreamingSimplifier(tolerance_px, tolerance_ms, max_points)
+        self.path.add([x, y, rel_time])
+        self.last_x = x
+        self.last_y = y
+        self.last_rel_time = rel_time
+        self.points = None
+    
+    @property
+    def raw_count(self):
+        return self.path.raw_count
+    
+    def finish(self, x, y, rel_time, hold=False):
+        """Letzten Punkt übernehmen; hold=True verlängert den Track bis zum Abheben"""
+        if x != self.last_x or y != self.last_y or (hold and rel_time > self.last_rel_time):
+            self.path.add([x, y, rel_time])
+        self.points = self.path.finish()
+        return self.points
+
+
+class GestureAssembler:
+    """Baut Gesten aus evdev-Frames: Start beim ersten Kontakt, Ende wenn alle Kontakte abgehoben sind"""
+    
+    def __init__(self, recorder, calibration=None):
+        self.recorder = recorder
+        # Rohwerte → Monitor-Pixel; ohne Kalibrierung linear über den Standard-Achsenbereich
+        self.calibration = calibration or recorder.default_calibration()
+        self.tracker = SlotTracker()
+        self.active = {}  # slot -> ContactTrack
+        self.tracks = []  # alle Tracks der laufenden Geste in Touch-Down Reihenfolge
+        self.start_time = 0
+        self.dropped = False  # laufende Geste von SYN_DROPPED betroffen
+        self.began = []  # (x, y) der neuen Kontakte im letzten Frame
+        self.added = 0  # neue Punkte im letzten Frame
+        self.position = None  # zuletzt aufgezeichnete Position
+        self.min_interval = float('inf')
+        self.max_interval = 0
+    
+    def transform(self, raw_x, raw_y):
+        """Touch-Koordinaten → Bildschirm-Pixel"""
+        return self.calibration.apply(raw_x, raw_y)
+    
+    @property
+    def raw_count(self):
+        return sum(track.raw_count for track in self.tracks)
+    
+    def feed(self, event_time, events):
+        """Frame verarbeiten; liefert (start_time, duration_ms, tracks, dropped) wenn eine Geste endet"""
+        tracker = self.tracker
+        tracker.update(events)
+        self.began = []
+        self.added = 0
+        rel_time = int((event_time - self.start_time) * 1000)
+        if tracker.dropped and self.tracks:
+            self.dropped = True
+        
+        # Alle Kontakte des Frames in einem Durchlauf abbilden
+        positions = tracker.positions
+        screen = dict(zip(positions, self.calibration.apply_many(positions.values())))
+        
+        for slot in tracker.moved:
+            track = self.active.get(slot)
+            if track is None or slot in tracker.began:
+                continue
+            x, y = screen[slot]
+            # Prüfe ob signifikante Bewegung
+            distance = ((x - track.last_x)**2 + (y - track.last_y)**2)**0.5
+            if distance >= self.recorder.min_movement_threshold:
+                track.path.add([x, y, rel_time])
+                interval = rel_time - track.last_rel_time
+                self.min_interval = min(self.min_interval, interval)
+                self.max_interval = max(self.max_interval, interval)
+                track.last_x = x
+                track.last_y = y
+                track.last_rel_time = rel_time
+                self.position = (x, y)
+                self.added += 1
+        
+        for slot in tracker.ended:
+            track = self.active.pop(slot, None)
+            if track is None:
+                continue
+            if slot in screen and slot not in tracker.began:
+                x, y = screen[slot]
+            else:
+                x, y = track.last_x, track.last_y
+            # Bei mehreren Kontakten endet jeder Track exakt beim eigenen Abheben
+            track.finish(x, y, rel_time, hold=len(self.tracks) > 1)
+        
+        gesture = None
+        if tracker.ended and self.tracks and not self.active:
+            gesture = (self.start_time, rel_time, self.tracks, self.dropped)
+            self.tracks = []
+            self.dropped = False
+        
+        for slot in tracker.began:
+            if not self.tracks:
+                # Touch Start - präziser Zeitpunkt (Kernel-Zeit)
+                self.start_time = event_time
+                self.dropped = tracker.dropped
+                rel_time = 0
+            x, y = screen[slot] if slot in screen else self.transform(0, 0)
+            track = ContactTrack(x, y, rel_time, self.recorder.simplify_tolerance_px,
+                                 self.recorder.simplify_tolerance_ms,
+                                 self.recorder.max_points_per_gesture)
+            self.active[slot] = track
+            self.tracks.append(track)
+            self.began.append((x, y))
+            self.position = (x, y)
+        
+        return gesture
+
+
+class KeyGestureTracker:
+    """Tastendrücke eines Keypads als Gesten: Down → Up mit Haltedauer (Auto-Repeat ignoriert)"""
+    
+    def __init__(self):
+        self.pressed = {}  # code -> Kernel-Zeit des Drückens
+    
+    def feed(self, event_time, events):
+        """Frame verarbeiten; liefert [(start_time, duration_ms, code), ...] losgelassener Tasten"""
+        released = []
+        for ev_type, code, value in events:
+            if ev_type != EV_KEY:
+                continue
+            if value == 1:
+                self.pressed.setdefault(code, event_time)
+            elif value == 0 and code in self.pressed:
+                start = self.pressed.pop(code)
+                released.append((start, int((event_time - start) * 1000), code))
+        return released
+
+
 class PrecisionTouchRecorder:
     def __init__(self):
         self.record_dir = "/home/dai/recordings"
@@ -35,15 +335,52 @@ class PrecisionTouchRecorder:
         self.touch_max_x = 16382
         self.touch_max_y = 9598
         
+        # Output settings: Flush nach jeder Geste (max. eine Geste Verlust bei Absturz)
+        self.flush_policy = "gesture"  # gesture, interval
+        self.flush_interval = 1.0  # Sekunden (bei "interval")
+        self.fsync_output = False  # True: auch bei Stromausfall sicher, kostet I/O im Writer-Thread
+        
         # Precision tracking settings
         self.min_movement_threshold = 2  # Noch präziser
-        self.max_points_per_gesture = 500  # Limit für sehr lange Gesten
+        self.max_points_per_gesture = 500  # Limit für sehr lange Gesten (Toleranz wird dann erhöht)
+        self.simplify_tolerance_px = 1.5  # Max. Abweichung vom Originalpfad
+        self.simplify_tolerance_ms = 10  # Max. Timing-Abweichung
+        
+        # Input Backend: "auto" (evdev, Fallback evtest), "evdev", "evtest"
+        self.input_backend = "auto"
+        
+        # Punkte in der .trec: "raw" (mmap, am schnellsten geladen), "varint" oder "zlib" (kompakt, siehe touch_codec)
+        self.trec_packing = "raw"
+        
+        # Live-Anzeige: feste Refresh-Rate statt einer Zeile pro Event, quiet für maximalen Durchsatz
+        self.status_rate = 10.0  # Hz
+        self.quiet = False
+        self.countdown = 3  # Sekunden vor Aufnahmestart
+        
+        # Timing-Nachweis: max. p99 Capture-Lag, damit eine Aufnahme als Performance-Baseline gilt
+        self.capture_lag_budget_ms = 2.0
         
         # Monitor-Konfiguration
         self.monitors = {}
         self.selected_monitor = None
         self.get_monitor_setup()
     
+    def default_calibration(self):
+        """Lineare Abbildung über den Standard-Achsenbereich (Fallback ohne ioctl, z.B. evtest)"""
+        return CalibrationMatrix.from_axes(0, self.touch_max_x, 0, self.touch_max_y,
+                                           self.screen_width, self.screen_height)
+    
+    def calibration_for(self, reader, device_name):
+        """Matrix eines Devices: gespeichertes Profil, sonst EVIOCGABS min/max - liefert (matrix, quelle)"""
+        matrix = load_profile(device_name, self.selected_monitor, self.screen_width, self.screen_height)
+        if matrix is not None:
+            return matrix, 'profile'
+        (x_min, x_max), (y_min, y_max), _ = device_axes(reader)
+        if x_max <= x_min or y_max <= y_min:
+            return self.default_calibration(), 'default'
+        return CalibrationMatrix.from_axes(x_min, x_max, y_min, y_max,
+                                           self.screen_width, self.screen_height), 'evdev'
+    
     def get_current_resolution(self, monitor_name):
         """Hole aktuelle Auflösung eines Monitors"""
         try:
@@ -110,8 +447,13 @@ class PrecisionTouchRecorder:
         return False
     
     def record_touches(self, device_num, name="touch", debug_mode=False):
-        """Precision Recording mit exaktem Timing"""
-        device_path = f"/dev/input/event{device_num}"
+        """Precision Recording mit exaktem Timing
+
+        device_num: Nummer (15) oder mehrere Devices ("15,16,7") für eine gemeinsame Zeitachse
+        """
+        numbers = device_num if isinstance(device_num, (list, tuple)) else str(device_num).split(',')
+        device_paths = [f"/dev/input/event{int(n)}" for n in numbers]
+        device_path = device_paths[0]
         
         if not self.selected_monitor:
             print(f"{Colors.RED}❌ Kein Monitor ausgewählt! Wähle Option 3.{Colors.NC}")
@@ -119,7 +461,8 @@ class PrecisionTouchRecorder:
         
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         output_file = os.path.join(self.record_dir, f"{name}_{timestamp}.sh")
-        debug_file = os.path.join(self.record_dir, f"{name}_{timestamp}_debug.json") if debug_mode else None
+        trec_file = os.path.join(self.record_dir, f"{name}_{timestamp}.trec")
+        debug_file = os.path.join(self.record_dir, f"{name}_{timestamp}_debug.ndjson") if debug_mode else None
         
         monitor_info = self.monitors.get(self.selected_monitor, {'x': 0, 'y': 0})
         monitor_x = monitor_info['x']
@@ -128,389 +471,287 @@ class PrecisionTouchRecorder:
         # Get current resolution for validation
         current_resolution = self.get_current_resolution(self.selected_monitor)
         
+        # Metadaten für Script-Header und .trec
+        meta = {
+            'device': device_path,
+            'recorded_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'monitor': self.selected_monitor,
+            'width': self.screen_width,
+            'height': self.screen_height,
+            'monitor_x': monitor_x,
+            'monitor_y': monitor_y,
+            'touch_max_x': self.touch_max_x,
+            'touch_max_y': self.touch_max_y,
+            'resolution': current_resolution,
+        }
+        recording = RecordingBuilder(meta)
+        
         # Script Header mit Resolution Check
         with open(output_file, 'w') as f:
-            f.write(f'''#!/bin/bash
-# Precision Touch Recording with Exact Timing
-# Device: {device_path}
-# Recording Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-# 
-# RECORDED CONFIGURATION:
-# Monitor: {self.selected_monitor}
-# Resolution: {self.screen_width}x{self.screen_height}
-# Position: ({monitor_x},{monitor_y})
-# Touch Device Range: {self.touch_max_x}x{self.touch_max_y}
-
-# Recording parameters (DO NOT MODIFY)
-RECORDED_MONITOR="{self.selected_monitor}"
-RECORDED_WIDTH={self.screen_width}
-RECORDED_HEIGHT={self.screen_height}
-MONITOR_X={monitor_x}
-MONITOR_Y={monitor_y}
-
-# Verify resolution matches recording
-verify_resolution() {{
-    local current_output=$(xrandr | grep "^$RECORDED_MONITOR connected" | head -1)
-    
-    if [ -z "$current_output" ]; then
-        echo "❌ FEHLER: Monitor '$RECORDED_MONITOR' nicht gefunden!"
-        echo "   Verfügbare Monitore:"
-        xrandr | grep " connected" | awk '{{print "   - " $1}}'
-        exit 1
-    fi
-    
-    # Extract current resolution
-    local current_res=$(echo "$current_output" | grep -oP '\\d+x\\d+' | head -1)
-    local current_pos=$(echo "$current_output" | grep -oP '\\+\\d+\\+\\d+' | head -1)
-    
-    if [ "$current_res" != "${{RECORDED_WIDTH}}x${{RECORDED_HEIGHT}}" ]; then
-        echo "⚠️  WARNUNG: Auflösung hat sich geändert!"
-        echo "   Aufnahme: ${{RECORDED_WIDTH}}x${{RECORDED_HEIGHT}}"
-        echo "   Aktuell:  $current_res"
-        echo ""
-        read -p "Trotzdem fortfahren? (j/n): " -n 1 -r
-        echo
-        if [[ ! $REPLY =~ ^[Jj]$ ]]; then
-            echo "Abbruch."
-            exit 1
-        fi
-    fi
-    
-    # Check position if changed
-    local expected_pos="+${{MONITOR_X}}+${{MONITOR_Y}}"
-    if [ "$current_pos" != "$expected_pos" ]; then
-        echo "ℹ️  Monitor-Position hat sich geändert von $expected_pos zu $current_pos"
-        # Update position dynamically
-        MONITOR_X=$(echo "$current_pos" | cut -d+ -f2)
-        MONITOR_Y=$(echo "$current_pos" | cut -d+ -f3)
-    fi
-    
-    echo "✅ Monitor-Konfiguration validiert:"
-    echo "   Monitor: $RECORDED_MONITOR"
-    echo "   Auflösung: ${{RECORDED_WIDTH}}x${{RECORDED_HEIGHT}}"
-    echo "   Position: (${{MONITOR_X}},${{MONITOR_Y}})"
-}}
-
-# High precision sleep function
-sleep_ms() {{
-    local ms=$1
-    if [ $ms -gt 0 ]; then
-        sleep $(echo "scale=6; $ms/1000" | bc)
-    fi
-}}
-
-# Precise tap with timing
-do_tap() {{
-    local x=$(($1 + $MONITOR_X))
-    local y=$(($2 + $MONITOR_Y))
-    local duration=${{3:-50}}  # Default 50ms touch duration
-    
-    echo "🔵 Tap at ($1,$2) → absolute ($x,$y)"
-    xdotool mousemove "$x" "$y"
-    xdotool mousedown 1
-    sleep_ms $duration
-    xdotool mouseup 1
-}}
-
-# Timed drag with precise movement points
-do_timed_drag() {{
-    local points="$1"  # JSON array of [x, y, time_ms] points
-    
-    # Parse JSON und erstelle Arrays
-    echo "$points" | python3 -c "
-import sys, json
-points = json.loads(sys.stdin.read())
-if len(points) < 2:
-    print('Error: Need at least 2 points for drag')
-    sys.exit(1)
-
-# Start point
-x0, y0, t0 = points[0]
-print(f'xdotool mousemove {{x0 + $MONITOR_X}} {{y0 + $MONITOR_Y}}')
-print(f'xdotool mousedown 1')
-
-# Move through points with precise timing
-for i in range(1, len(points)):
-    x, y, t = points[i]
-    delay = t - points[i-1][2]
-    if delay > 0:
-        print(f'sleep_ms {{delay}}')
-    print(f'xdotool mousemove {{x + $MONITOR_X}} {{y + $MONITOR_Y}}')
-
-# Release
-print(f'xdotool mouseup 1')
-" | bash
-}}
-
-# Simple drag for backwards compatibility
-do_drag() {{
-    local coords=("$@")
-    local num_points=${{#coords[@]}}
-    
-    if [ $num_points -lt 4 ]; then
-        echo "Error: Need at least 2 points"
-        return
-    fi
-    
-    # Mouse down at start
-    local x1=$((${{coords[0]}} + $MONITOR_X))
-    local y1=$((${{coords[1]}} + $MONITOR_Y))
-    xdotool mousemove "$x1" "$y1"
-    xdotool mousedown 1
-    
-    # Move through points
-    for ((i=2; i<num_points; i+=2)); do
-        local x=$((${{coords[$i]}} + $MONITOR_X))
-        local y=$((${{coords[$i+1]}} + $MONITOR_Y))
-        xdotool mousemove "$x" "$y"
-        sleep 0.002  # 2ms zwischen Punkten
-    done
-    
-    # Mouse up at end
-    xdotool mouseup 1
-}}
-
-# Run verification
-verify_resolution
-
-echo ""
-echo "🎬 STARTING REPLAY auf $RECORDED_MONITOR"
-echo "==========================================="
-start_replay=$(date +%s%N)
-
-# RECORDED EVENTS:
-''')
+            f.write(script_header(meta))
         
-        print(f"\n{Colors.YELLOW}🎬 AUFNAHME STARTET IN 3 SEK...{Colors.NC}")
+        if self.countdown:
+            print(f"\n{Colors.YELLOW}🎬 AUFNAHME STARTET IN {self.countdown} SEK...{Colors.NC}")
         print(f"{Colors.GRAY}Precision Mode: Timing accuracy ±1ms{Colors.NC}")
-        time.sleep(3)
+        time.sleep(self.countdown)
         
         print(f"{Colors.RED}⏺️  AUFNAHME LÄUFT!{Colors.NC}")
         print(f"{Colors.CYAN}Drücke Strg+C zum Stoppen{Colors.NC}\n")
         
-        # Starte evtest
-        cmd = ['sudo', 'evtest', device_path]
-        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+        # Öffne Device(s) - ein Device nativ per evdev (Fallback evtest), mehrere per selectors/epoll
+        if len(device_paths) == 1:
+            source = open_event_source(device_path, self.input_backend)
+            readers = [source]
+            frames = ((event_time, 0, events) for event_time, events in source.frames())
+        else:
+            source = MultiDeviceReader(device_paths)
+            readers = source.readers
+            frames = source.frames()
+        print(f"{Colors.GRAY}Input Backend: {source.backend}{Colors.NC}")
+        
+        # Pro Device: Gesten aus Kontakten (Multi-Touch über MT-Slots, Single-Touch als Slot 0)
+        # oder Tastendrücke (Keypads ohne absolute Achsen)
+        handlers = []
+        meta['devices'] = []
+        for index, reader in enumerate(readers):
+            info = {'path': reader.device_path, 'name': '', 'kind': 'pointer', 'calibration': 'default'}
+            handler = None
+            if isinstance(reader, EvdevReader):
+                try:
+                    info['name'] = reader.name()
+                    if not reader.is_pointer():
+                        info['kind'] = 'keys'
+                        info['calibration'] = None
+                        handler = KeyGestureTracker()
+                    else:
+                        # Kalibrierprofil oder Achsenbereich per EVIOCGABS
+                        calibration, info['calibration'] = self.calibration_for(reader, info['name'])
+                        handler = GestureAssembler(self, calibration)
+                except OSError:
+                    pass  # z.B. Fixture-Datei statt Device
+            handler = handler or GestureAssembler(self)
+            if isinstance(handler, GestureAssembler):
+                info['matrix'] = handler.calibration.to_list()
+            handlers.append(handler)
+            meta['devices'].append(info)
+            if len(readers) > 1 or info['calibration'] not in (None, 'default'):
+                details = info['kind'] + (f", Kalibrierung: {info['calibration']}" if info['calibration'] else '')
+                print(f"{Colors.GRAY}  [{index}] {info['path']} {info['name']} ({details}){Colors.NC}")
+        assemblers = [h for h in handlers if isinstance(h, GestureAssembler)]
+        
+        # Timing-Histogramme in ns: Capture-Lag (Wanduhr bei Verarbeitung - Kernel-Zeit) und Stufen
+        capture_lag = LatencyHistogram()
+        stages = {'parse': LatencyHistogram(), 'assembly': LatencyHistogram(), 'serialization': LatencyHistogram()}
+        for reader in readers:
+            reader.parse_histogram = stages['parse']
+        clock = time.time_ns  # eine Uhr für Lag und Stufen: ein Aufruf pro Messpunkt
         
         # Tracking Variablen
         start_time = time.time()
-        last_event_time = start_time
         event_count = 0
         touch_count = 0
+        key_count = 0
         
-        # Touch state mit präzisem Timing
-        touch_active = False
-        touch_start_time = 0
-        current_x = 0
-        current_y = 0
+        # Gemeinsame Zeitachse: delay = Abstand zum Ende der vorherigen Geste (negativ bei Überlappung)
+        timeline_end = None
         
-        # Movement tracking mit Timestamps
-        movement_points = []  # Liste von [x, y, timestamp_ms]
-        last_x = 0
-        last_y = 0
+        def place(gesture_start):
+            nonlocal timeline_end
+            delay = round((gesture_start - timeline_end) * 1000)
+            if 0 <= delay <= 10:  # Nur signifikante Pausen
+                delay = 0
+            timeline_end += delay / 1000.0
+            return delay
         
-        # Event buffer
-        event_buffer = []
-        debug_data = []
+        def advance():
+            # Ende der zuletzt gespeicherten Geste (Drags enden mit ihrem letzten Punkt)
+            nonlocal timeline_end
+            timeline_end += recording.gestures['duration'][-1] / 1000.0
+        
+        # Statuszeile mit fester Rate (kein print pro Event)
+        status = StatusDisplay(self.status_rate, self.quiet)
+        
+        # Hintergrund-Writer: Datei bleibt offen, I/O blockiert die Event-Schleife nicht
+        writer = RecordingWriter(output_file, debug_file, self.flush_policy, self.flush_interval,
+                                 self.fsync_output)
         
         # Stats
-        min_interval = float('inf')
-        max_interval = 0
         total_points = 0
+        total_raw_points = 0
+        dropped_gestures = []  # Gesten-Indizes mit SYN_DROPPED (Koordinaten unzuverlässig)
+        widened_gestures = []  # Gesten über max_points_per_gesture: gemessene größte Abweichung
         
         try:
-            for line in proc.stdout:
-                current_time = time.time()
+            # Jeder Frame endet mit SYN_REPORT und trägt die Kernel-Zeit (timeval)
+            for event_time, device, events in frames:
+                arrived = clock()
+                if timeline_end is None:
+                    # Zeitachse ab Aufnahmestart (Kernel-Zeit kann von time.time() abweichen)
+                    timeline_end = min(start_time, event_time)
+                event_count += len(events)
+                status.events = event_count
+                handler = handlers[device]
                 
-                # Parse event timestamp wenn verfügbar
-                event_match = re.search(r'Event: time (\d+\.\d+)', line)
-                if event_match:
-                    # Nutze kernel event time für noch höhere Präzision
-                    event_time = float(event_match.group(1))
-                else:
-                    event_time = current_time
+                if isinstance(handler, KeyGestureTracker):
+                    released = handler.feed(event_time, events)
+                    stages['assembly'].record(clock() - arrived)
+                    capture_lag.record(arrived - int(event_time * 1e9))
+                    for key_start, key_duration, code in released:
+                        started = clock()
+                        recording.add_key(place(key_start), code, key_duration, device)
+                        advance()
+                        writer.write_lines(gesture_lines(*recording.last_gesture()))
+                        if debug_mode:
+                            writer.write_debug({'type': 'key', 'device': device, 'start_time': key_start,
+                                                'duration': key_duration, 'code': code})
+                        stages['serialization'].record(clock() - started)
+                        key_count += 1
+                        status.note(f"{Colors.YELLOW}⌨️  KEY {KEY_SYMS.get(code, code)} [{device}] duration={key_duration}ms{Colors.NC}")
+                    continue
                 
-                # BTN_TOUCH Events - exaktes Timing
-                if "BTN_TOUCH" in line:
-                    if "value 1" in line and not touch_active:
-                        # Touch Start - präziser Zeitpunkt
-                        touch_active = True
-                        touch_start_time = event_time
-                        
-                        # Zeit seit letztem Event
-                        if last_event_time > 0:
-                            wait_time = int((event_time - last_event_time) * 1000)
-                            if wait_time > 10:  # Nur signifikante Pausen
-                                event_buffer.append(f"sleep_ms {wait_time}\n")
-                        
-                        # Initialisiere movement tracking
-                        movement_points = [[current_x, current_y, 0]]
-                        last_x = current_x
-                        last_y = current_y
-                        
-                        print(f"{Colors.GREEN}▼ TOUCH DOWN @ ({current_x},{current_y}) t={event_time:.3f}{Colors.NC}")
-                        
-                    elif "value 0" in line and touch_active:
-                        # Touch End - berechne Duration
-                        touch_duration = int((event_time - touch_start_time) * 1000)
+                assembler = handler
+                gesture = assembler.feed(event_time, events)
+                stages['assembly'].record(clock() - arrived)
+                capture_lag.record(arrived - int(event_time * 1e9))
+                
+                if assembler.tracker.dropped:
+                    resync = "Zustand neu eingelesen" if events[0][2] else "kein Resync möglich"
+                    status.note(f"{Colors.RED}⚠️  SYN_DROPPED - Kernel-Puffer übergelaufen, {resync}{Colors.NC}")
+                
+                for index, (x, y) in enumerate(assembler.began):
+                    if len(assembler.tracks) == len(assembler.began) and index == 0:
+                        status.note(f"{Colors.GREEN}▼ TOUCH DOWN @ ({x},{y}) t={event_time:.3f}{Colors.NC}")
+                    else:
+                        status.note(f"{Colors.GREEN}▼ CONTACT {len(assembler.tracks) - len(assembler.began) + index + 1} DOWN @ ({x},{y}){Colors.NC}")
+                
+                if assembler.added or assembler.began:
+                    status.position = assembler.position
+                if gesture is None:
+                    continue
+                
+                started = clock()
+                touch_start_time, touch_duration, tracks, dropped = gesture
+                gesture_delay = place(touch_start_time)
+                
+                if len(tracks) > 1:
+                    # Multi-Touch: alle Kontakte mit gemeinsamer Zeitbasis
+                    contacts = [track.points for track in tracks]
+                    raw_points = sum(track.raw_count for track in tracks)
+                    movement_points = [point for points in contacts for point in points]
+                    recording.add_multi(gesture_delay, contacts, device)
+                    status.note(f"{Colors.MAGENTA}🤏 MULTI: {len(tracks)} contacts, {len(movement_points)}/{raw_points} points, {touch_duration}ms{Colors.NC}")
+                else:
+                    movement_points = tracks[0].points
+                    raw_points = tracks[0].raw_count
+                    contacts = [movement_points]
+                    
+                    # Analysiere Geste (Klassifikation nach Roh-Punkten)
+                    if raw_points == 1:
+                        # Einfacher Tap mit Duration
+                        recording.add_tap(gesture_delay, movement_points[0][0], movement_points[0][1], touch_duration, device)
+                        status.note(f"{Colors.YELLOW}🔵 TAP: ({movement_points[0][0]},{movement_points[0][1]}) duration={touch_duration}ms{Colors.NC}")
                         
-                        # Füge letzten Punkt hinzu wenn er sich unterscheidet
-                        if movement_points and (current_x != last_x or current_y != last_y):
-                            rel_time = int((event_time - touch_start_time) * 1000)
-                            movement_points.append([current_x, current_y, rel_time])
+                    elif raw_points == 2:
+                        # Kurzer Swipe
+                        dx = movement_points[-1][0] - movement_points[0][0]
+                        dy = movement_points[-1][1] - movement_points[0][1]
+                        distance = (dx*dx + dy*dy)**0.5
                         
-                        # Analysiere Geste
-                        if len(movement_points) == 1:
-                            # Einfacher Tap mit Duration
-                            event_buffer.append(f"do_tap {movement_points[0][0]} {movement_points[0][1]} {touch_duration}\n")
-                            print(f"{Colors.YELLOW}🔵 TAP: ({movement_points[0][0]},{movement_points[0][1]}) duration={touch_duration}ms{Colors.NC}")
-                            
-                        elif len(movement_points) == 2:
-                            # Kurzer Swipe
-                            dx = movement_points[-1][0] - movement_points[0][0]
-                            dy = movement_points[-1][1] - movement_points[0][1]
-                            distance = (dx*dx + dy*dy)**0.5
-                            
-                            if distance < 20:
-                                # Tap mit mini-movement
-                                event_buffer.append(f"do_tap {movement_points[0][0]} {movement_points[0][1]} {touch_duration}\n")
-                                print(f"{Colors.YELLOW}🔵 TAP (micro-move): duration={touch_duration}ms{Colors.NC}")
-                            else:
-                                # Quick swipe
-                                json_points = json.dumps(movement_points)
-                                event_buffer.append(f"do_timed_drag '{json_points}'\n")
-                                print(f"{Colors.BLUE}→ SWIPE: {distance:.0f}px in {touch_duration}ms{Colors.NC}")
+                        if distance < 20:
+                            # Tap mit mini-movement
+                            recording.add_tap(gesture_delay, movement_points[0][0], movement_points[0][1], touch_duration, device)
+                            status.note(f"{Colors.YELLOW}🔵 TAP (micro-move): duration={touch_duration}ms{Colors.NC}")
                         else:
-                            # Complex drag mit allen Timing-Informationen
-                            # Limitiere Anzahl der Punkte wenn zu viele
-                            if len(movement_points) > self.max_points_per_gesture:
-                                # Sample down to max points
-                                step = len(movement_points) // self.max_points_per_gesture
-                                movement_points = movement_points[::step] + [movement_points[-1]]
-                            
-                            json_points = json.dumps(movement_points)
-                            event_buffer.append(f"do_timed_drag '{json_points}'\n")
-                            
-                            # Stats
-                            total_distance = sum(
-                                ((movement_points[i][0] - movement_points[i-1][0])**2 + 
-                                 (movement_points[i][1] - movement_points[i-1][1])**2)**0.5
-                                for i in range(1, len(movement_points))
-                            )
-                            avg_speed = total_distance / (touch_duration / 1000) if touch_duration > 0 else 0
-                            
-                            print(f"{Colors.CYAN}👆 DRAG: {len(movement_points)} points, {total_distance:.0f}px, {touch_duration}ms, {avg_speed:.0f}px/s{Colors.NC}")
-                        
-                        # Debug data
-                        if debug_mode:
-                            debug_data.append({
-                                'type': 'gesture',
-                                'start_time': touch_start_time,
-                                'duration': touch_duration,
-                                'points': movement_points
-                            })
-                        
-                        # Update stats
-                        touch_active = False
-                        touch_count += 1
-                        last_event_time = event_time
-                        total_points += len(movement_points)
+                            # Quick swipe
+                            recording.add_drag(gesture_delay, movement_points, device)
+                            status.note(f"{Colors.BLUE}→ SWIPE: {distance:.0f}px in {touch_duration}ms{Colors.NC}")
+                    else:
+                        # Complex drag - Form und Timing innerhalb der Toleranz erhalten
+                        recording.add_drag(gesture_delay, movement_points, device)
                         
-                        print(f"{Colors.MAGENTA}Total: {touch_count} touches, {total_points} points{Colors.NC}")
+                        # Stats
+                        total_distance = sum(
+                            ((movement_points[i][0] - movement_points[i-1][0])**2 + 
+                             (movement_points[i][1] - movement_points[i-1][1])**2)**0.5
+                            for i in range(1, len(movement_points))
+                        )
+                        avg_speed = total_distance / (touch_duration / 1000) if touch_duration > 0 else 0
                         
-                # Position Updates während Touch
-                elif touch_active:
-                    if "ABS_MT_POSITION_X" in line or "ABS_X" in line:
-                        match = re.search(r'value (\d+)', line)
-                        if match:
-                            raw = int(match.group(1))
-                            new_x = int(raw * self.screen_width / self.touch_max_x)
-                            
-                            # Nur aufzeichnen wenn signifikante Bewegung
-                            if abs(new_x - last_x) >= self.min_movement_threshold:
-                                current_x = new_x
-                                # Wird beim nächsten Y-Update gespeichert
-                                
-                    elif "ABS_MT_POSITION_Y" in line or "ABS_Y" in line:
-                        match = re.search(r'value (\d+)', line)
-                        if match:
-                            raw = int(match.group(1))
-                            new_y = int(raw * self.screen_height / self.touch_max_y)
-                            
-                            # Prüfe ob signifikante Bewegung
-                            distance = ((current_x - last_x)**2 + (new_y - last_y)**2)**0.5
-                            
-                            if distance >= self.min_movement_threshold:
-                                current_y = new_y
-                                
-                                # Berechne relative Zeit seit Touch-Start
-                                rel_time = int((event_time - touch_start_time) * 1000)
-                                
-                                # Füge Punkt mit Timing hinzu
-                                movement_points.append([current_x, current_y, rel_time])
-                                
-                                # Update tracking
-                                if len(movement_points) > 1:
-                                    interval = rel_time - movement_points[-2][2]
-                                    min_interval = min(min_interval, interval)
-                                    max_interval = max(max_interval, interval)
-                                
-                                last_x = current_x
-                                last_y = current_y
-                                
-                                # Live feedback
-                                if len(movement_points) % 10 == 0:
-                                    print(f"{Colors.GRAY}  ... {len(movement_points)} points recorded{Colors.NC}", end='\r')
+                        status.note(f"{Colors.CYAN}👆 DRAG: {len(movement_points)}/{raw_points} points, {total_distance:.0f}px, {touch_duration}ms, {avg_speed:.0f}px/s{Colors.NC}")
                 
-                # Update wenn nicht im Touch
-                elif "ABS_MT_POSITION_X" in line or "ABS_X" in line:
-                    match = re.search(r'value (\d+)', line)
-                    if match:
-                        current_x = int(int(match.group(1)) * self.screen_width / self.touch_max_x)
-                        
-                elif "ABS_MT_POSITION_Y" in line or "ABS_Y" in line:
-                    match = re.search(r'value (\d+)', line)
-                    if match:
-                        current_y = int(int(match.group(1)) * self.screen_height / self.touch_max_y)
+                advance()
                 
-                # Buffer schreiben
-                if len(event_buffer) >= 3:
-                    with open(output_file, 'a') as f:
-                        f.writelines(event_buffer)
-                    event_buffer = []
+                # Script-Zeilen aus der letzten Geste
+                lines = gesture_lines(*recording.last_gesture())
+                if dropped:
+                    dropped_gestures.append(len(recording.gestures['kind']) - 1)
+                    lines.insert(0, "# WARNUNG: SYN_DROPPED während dieser Geste - Koordinaten unzuverlässig\n")
+                    status.note(f"{Colors.RED}⚠️  Geste #{touch_count + 1} markiert (SYN_DROPPED){Colors.NC}")
+                widened = [track.path.max_error() for track in tracks if track.path.widened]
+                if widened:
+                    error_px = round(max(error[0] for error in widened), 2)
+                    error_ms = round(max(error[1] for error in widened), 2)
+                    widened_gestures.append({'gesture': len(recording.gestures['kind']) - 1,
+                                             'error_px': error_px, 'error_ms': error_ms})
+                    status.note(f"{Colors.YELLOW}⚠️  Geste #{touch_count + 1}: über {self.max_points_per_gesture} Punkte, "
+                                f"Abweichung bis {error_px:g}px/{error_ms:g}ms{Colors.NC}")
+                writer.write_lines(lines)
+                
+                # Debug data
+                if debug_mode:
+                    writer.write_debug({
+                        'type': 'gesture',
+                        'device': device,
+                        'start_time': touch_start_time,
+                        'duration': touch_duration,
+                        'raw_points': raw_points,
+                        'contacts': len(contacts),
+                        'dropped': dropped,
+                        'points': contacts[0] if len(contacts) == 1 else contacts
+                    })
+                stages['serialization'].record(clock() - started)
+                
+                # Update stats
+                touch_count += 1
+                total_points += len(movement_points)
+                total_raw_points += raw_points
+                status.touches = touch_count
+                status.points = total_points
+                status.min_interval = min(a.min_interval for a in assemblers)
+                status.max_interval = max(a.max_interval for a in assemblers)
                     
         except KeyboardInterrupt:
-            print(f"\n{Colors.RED}⏹️  AUFNAHME GESTOPPT{Colors.NC}")
+            status.note(f"{Colors.RED}⏹️  AUFNAHME GESTOPPT{Colors.NC}")
         finally:
-            proc.terminate()
+            source.close()
+            status.close()
             
-            # Rest schreiben
-            if event_buffer:
-                with open(output_file, 'a') as f:
-                    f.writelines(event_buffer)
-                    
-            # Footer mit Timing-Info
-            with open(output_file, 'a') as f:
-                f.write(f'''
-# Ende der Events
-end_replay=$(date +%s%N)
-duration=$(( (end_replay - start_replay) / 1000000 ))
-
-echo "==========================================="
-echo "✅ PRECISION REPLAY COMPLETED"
-echo "   Touches: {touch_count}"
-echo "   Total Points: {total_points}"
-echo "   Replay Duration: ${{duration}}ms"
-echo "   File: {output_file}"
-''')
+            # Rest und Footer mit Timing-Info schreiben
+            writer.close(script_footer(touch_count, total_points, output_file))
+            
+            # SYN_DROPPED Statistik in den Metadaten (Vertrauen in die Aufnahme)
+            meta['syn_dropped'] = source.dropped
+            meta['discarded_events'] = source.discarded
+            meta['dropped_gestures'] = dropped_gestures
+            meta['widened_gestures'] = widened_gestures
+            
+            # Timing-Nachweis: Capture-Lag in ms, Stufen in µs (write = Writer-Thread inkl. Flush)
+            lag = capture_lag.summary()
+            stage_summaries = {name: histogram.summary(1e-3) for name, histogram in stages.items()}
+            stage_summaries['write'] = writer.write_histogram.summary(1e-3)
+            trusted = (lag['count'] > 0 and lag['p99'] <= self.capture_lag_budget_ms
+                       and not capture_lag.underflow and not capture_lag.overflow and not source.dropped)
+            meta['timing'] = {'capture_lag_ms': lag, 'stages_us': stage_summaries,
+                              'lag_budget_ms': self.capture_lag_budget_ms, 'trusted': trusted}
+            
+            # Binäres Spalten-Format für den Player
+            write_trec(trec_file, recording.build(), self.trec_packing)
+            os.system(f"chown dai:dai {trec_file}")
             
             os.chmod(output_file, 0o755)
             os.system(f"chown dai:dai {output_file}")
             
-            # Debug file speichern
-            if debug_mode and debug_data:
-                with open(debug_file, 'w') as f:
-                    json.dump(debug_data, f, indent=2)
+            if debug_mode:
                 os.system(f"chown dai:dai {debug_file}")
             
             # Summary mit Timing Stats
@@ -519,14 +760,46 @@ echo "   File: {output_file}"
             print(f"{Colors.GREEN}║     PRECISION RECORDING COMPLETE     ║{Colors.NC}")
             print(f"{Colors.GREEN}╚══════════════════════════════════════╝{Colors.NC}")
             print(f"\n📄 Script: {Colors.BLUE}{output_file}{Colors.NC}")
+            packing = f" ({self.trec_packing}, {os.path.getsize(trec_file) / 1024:.1f} KB)" if self.trec_packing != "raw" else ""
+            print(f"💾 Binär:  {Colors.BLUE}{trec_file}{Colors.NC}{packing}")
             print(f"\n📊 STATISTIK:")
             print(f"  • Touches: {touch_count}")
+            if key_count:
+                print(f"  • Tasten: {key_count}")
             print(f"  • Total Points: {total_points}")
             print(f"  • Aufnahmedauer: {duration:.1f}s")
             if touch_count > 0:
                 print(f"  • Ø Points/Touch: {total_points/touch_count:.1f}")
-            if min_interval < float('inf'):
-                print(f"  • Point Interval: {min_interval}-{max_interval}ms")
+            if status.min_interval < float('inf'):
+                print(f"  • Point Interval: {status.min_interval}-{status.max_interval}ms")
+            if source.dropped:
+                print(f"  • {Colors.RED}SYN_DROPPED: {source.dropped}x, {source.discarded} Events verworfen, {len(dropped_gestures)} Gesten markiert{Colors.NC}")
+            else:
+                print(f"  • SYN_DROPPED: 0")
+            print(f"\n⏱️  TIMING:")
+            if capture_lag.overflow or capture_lag.underflow:
+                print(f"  • {Colors.YELLOW}Capture-Lag: {capture_lag.overflow + capture_lag.underflow} von {lag['count']} Frames "
+                      f"außerhalb des Messbereichs (Kernel-Uhr ≠ Wanduhr?){Colors.NC}")
+            else:
+                print(f"  • Capture-Lag: p50 {lag['p50']:.2f}ms | p99 {lag['p99']:.2f}ms | max {lag['max']:.2f}ms ({lag['count']} Frames)")
+            for name, label in (('parse', 'Parse/Event'), ('assembly', 'Gesten-Aufbau'),
+                                ('serialization', 'Serialisierung'), ('write', 'Schreiben')):
+                stage = stage_summaries[name]
+                if stage['count']:
+                    print(f"  • {label}: p50 {stage['p50']:.1f}µs | p99 {stage['p99']:.1f}µs | max {stage['max']:.1f}µs")
+            if trusted:
+                print(f"  • {Colors.GREEN}✅ Timing vertrauenswürdig (p99 Lag ≤ {self.capture_lag_budget_ms}ms){Colors.NC}")
+            else:
+                print(f"  • {Colors.YELLOW}⚠️  Timing nicht als Baseline geeignet (p99 Lag > {self.capture_lag_budget_ms}ms, "
+                      f"Uhr-Abweichung oder SYN_DROPPED){Colors.NC}")
+            if total_points > 0:
+                tolerance = f"±{self.simplify_tolerance_px}px/±{self.simplify_tolerance_ms}ms"
+                if widened_gestures:
+                    error_px = max(entry['error_px'] for entry in widened_gestures)
+                    error_ms = max(entry['error_ms'] for entry in widened_gestures)
+                    tolerance += (f", {len(widened_gestures)} lange Gesten bis ±{max(error_px, self.simplify_tolerance_px):g}px"
+                                  f"/±{max(error_ms, self.simplify_tolerance_ms):g}ms")
+                print(f"  • Kompression: {total_raw_points} → {total_points} Points ({total_raw_points / total_points:.1f}:1, {tolerance})")
             if debug_mode and debug_file:
                 print(f"\n🔍 Debug: {Colors.GRAY}{debug_file}{Colors.NC}")
             print(f"\n▶️  Abspielen: {Colors.CYAN}bash {output_file}{Colors.NC}")
@@ -539,10 +812,18 @@ echo "   File: {output_file}"
         print(f"{Colors.CYAN}Teste Touch mit Timing-Informationen...{Colors.NC}")
         print(f"{Colors.RED}Stoppe mit Strg+C{Colors.NC}\n")
         
-        cmd = ['sudo', 'evtest', device_path]
-        
+        source = None
+        status = None
         try:
-            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+            source = open_event_source(device_path, self.input_backend)
+            print(f"{Colors.GRAY}Input Backend: {source.backend}{Colors.NC}")
+            calibration, calibration_source = self.default_calibration(), 'default'
+            if isinstance(source, EvdevReader):
+                try:
+                    calibration, calibration_source = self.calibration_for(source, source.name())
+                except OSError:
+                    pass
+            print(f"{Colors.GRAY}Kalibrierung: {calibration_source}{Colors.NC}")
             
             touch_active = False
             touch_start = 0
@@ -550,54 +831,62 @@ echo "   File: {output_file}"
             current_y = 0
             last_update = 0
             point_count = 0
+            event_count = 0
+            
+            # Statuszeile mit fester Rate statt einer Zeile pro Y-Update
+            status = StatusDisplay(self.status_rate, self.quiet)
             
-            for line in proc.stdout:
-                current_time = time.time()
+            for event_time, events in source.frames():
+                touch_state = None
+                moved = False
+                event_count += len(events)
+                status.events = event_count
+                
+                for ev_type, code, value in events:
+                    if ev_type == EV_ABS:
+                        if code == ABS_MT_POSITION_X or code == ABS_X:
+                            current_x = value
+                            moved = True
+                        elif code == ABS_MT_POSITION_Y or code == ABS_Y:
+                            current_y = value
+                            moved = True
+                    elif ev_type == EV_KEY and code == BTN_TOUCH:
+                        touch_state = value
                 
                 # Touch Events mit Timing
-                if "BTN_TOUCH" in line:
-                    if "value 1" in line:
-                        touch_active = True
-                        touch_start = current_time
-                        point_count = 0
-                        print(f"\n{Colors.GREEN}▼ TOUCH DOWN (t=0ms){Colors.NC}")
-                    elif "value 0" in line and touch_active:
-                        duration = (current_time - touch_start) * 1000
-                        touch_active = False
-                        print(f"{Colors.RED}▲ TOUCH UP (duration={duration:.1f}ms, points={point_count}){Colors.NC}\n")
+                if touch_state == 1:
+                    touch_active = True
+                    touch_start = event_time
+                    point_count = 0
+                    status.note(f"{Colors.GREEN}▼ TOUCH DOWN (t=0ms){Colors.NC}")
+                elif touch_state == 0 and touch_active:
+                    duration = (event_time - touch_start) * 1000
+                    touch_active = False
+                    status.touches += 1
+                    status.note(f"{Colors.RED}▲ TOUCH UP (duration={duration:.1f}ms, points={point_count}){Colors.NC}")
                 
                 # Position Updates mit Timing
-                elif touch_active:
-                    if "ABS_MT_POSITION_X" in line or "ABS_X" in line:
-                        match = re.search(r'value (\d+)', line)
-                        if match:
-                            current_x = int(match.group(1))
-                    elif "ABS_MT_POSITION_Y" in line or "ABS_Y" in line:
-                        match = re.search(r'value (\d+)', line)
-                        if match:
-                            current_y = int(match.group(1))
-                            point_count += 1
-                            
-                            # Zeit seit Touch-Start
-                            elapsed = (current_time - touch_start) * 1000
-                            # Zeit seit letztem Update
-                            if last_update > 0:
-                                interval = (current_time - last_update) * 1000
-                            else:
-                                interval = 0
-                            last_update = current_time
-                            
-                            # Konvertiere zu Screen-Koordinaten
-                            screen_x = int(current_x * self.screen_width / self.touch_max_x)
-                            screen_y = int(current_y * self.screen_height / self.touch_max_y)
-                            
-                            print(f"  → [{elapsed:6.1f}ms] Pos: ({screen_x:4}, {screen_y:4}) | Δt={interval:5.1f}ms", end='\r')
+                elif touch_active and moved:
+                    point_count += 1
+                    status.points += 1
+                    
+                    # Zeit seit letztem Update
+                    if last_update > 0:
+                        interval = int((event_time - last_update) * 1000)
+                        status.min_interval = min(status.min_interval, interval)
+                        status.max_interval = max(status.max_interval, interval)
+                    last_update = event_time
+                    
+                    # Konvertiere zu Screen-Koordinaten
+                    status.position = calibration.apply(current_x, current_y)
                     
         except KeyboardInterrupt:
             print(f"\n{Colors.YELLOW}Test beendet{Colors.NC}")
         finally:
-            if 'proc' in locals():
-                proc.terminate()
+            if source:
+                source.close()
+            if status:
+                status.close()
     
     def analyze_recording(self, filename):
         """Analysiere ein Recording für Stats"""
@@ -608,33 +897,12 @@ echo "   File: {output_file}"
             
         print(f"\n{Colors.CYAN}📊 ANALYSE: {filename}{Colors.NC}")
         
-        tap_count = 0
-        drag_count = 0
-        total_duration = 0
-        
-        with open(filepath, 'r') as f:
-            for line in f:
-                if line.startswith('do_tap'):
-                    tap_count += 1
-                    # Extrahiere duration
-                    parts = line.split()
-                    if len(parts) >= 4:
-                        try:
-                            total_duration += int(parts[3])
-                        except:
-                            total_duration += 50  # default
-                elif line.startswith('do_timed_drag'):
-                    drag_count += 1
-                    # Parse JSON für Details
-                    try:
-                        json_start = line.index("'") + 1
-                        json_end = line.rindex("'")
-                        json_str = line[json_start:json_end]
-                        points = json.loads(json_str)
-                        if points:
-                            total_duration += points[-1][2]
-                    except:
-                        pass
+        recording = load_recording(filepath)
+        tap_count = recording.tap_count
+        drag_count = recording.drag_count
+        # Tap-Dauern + Drag-Dauern (ohne Pausen)
+        total_duration = sum(recording.gestures['duration'])
+        recording.close()
         
         print(f"  • Taps: {tap_count}")
         print(f"  • Drags: {drag_count}")
@@ -704,10 +972,10 @@ echo "   File: {output_file}"
                     print(f"{Colors.RED}❌ Bitte erst Monitor wählen!{Colors.NC}")
                     continue
                     
-                device = input("Device Nummer (z.B. 15): ")
+                device = input("Device Nummer(n) (z.B. 15 oder 15,16,7): ")
                 name = input("Recording Name [touch]: ").strip() or "touch"
                 try:
-                    self.record_touches(int(device), name, debug_mode=False)
+                    self.record_touches(device, name, debug_mode=False)
                 except Exception as e:
                     print(f"{Colors.RED}Fehler: {e}{Colors.NC}")
                     
@@ -717,10 +985,10 @@ echo "   File: {output_file}"
                     print(f"{Colors.RED}❌ Bitte erst Monitor wählen!{Colors.NC}")
                     continue
                     
-                device = input("Device Nummer (z.B. 15): ")
+                device = input("Device Nummer(n) (z.B. 15 oder 15,16,7): ")
                 name = input("Recording Name [precision]: ").strip() or "precision"
                 try:
-                    self.record_touches(int(device), name, debug_mode=True)
+                    self.record_touches(device, name, debug_mode=True)
                 except Exception as e:
                     print(f"{Colors.RED}Fehler: {e}{Colors.NC}")
                     
@@ -732,13 +1000,20 @@ echo "   File: {output_file}"
                 # Zeige Recordings
                 print(f"\n{Colors.CYAN}📂 Recordings:{Colors.NC}")
                 try:
-                    files = sorted([f for f in os.listdir(self.record_dir) if f.endswith('.sh')])
-                    if files:
-                        for i, f in enumerate(files[-10:], 1):  # Letzte 10
-                            path = os.path.join(self.record_dir, f)
-                            size = os.path.getsize(path)
-                            mtime = datetime.fromtimestamp(os.path.getmtime(path))
-                            print(f"  [{i:2}] {f} ({size:,} bytes) - {mtime.strftime('%Y-%m-%d %H:%M')}")
+                    catalog = RecordingCatalog(self.record_dir)
+                    try:
+                        catalog.refresh()
+                        total = catalog.count()
+                        entries = catalog.query(order_by='mtime', descending=True, limit=10)  # Letzte 10
+                    finally:
+                        catalog.close()
+                    if entries:
+                        for i, entry in enumerate(reversed(entries), 1):
+                            mtime = datetime.fromtimestamp(entry.mtime)
+                            print(f"  [{i:2}] {entry.name} ({entry.size:,} bytes) - {mtime.strftime('%Y-%m-%d %H:%M')}"
+                                  f" - {entry.gesture_count} Gesten, {entry.duration:.1f}s, {entry.monitor} {entry.resolution}")
+                        if total > len(entries):
+                            print(f"  {Colors.GRAY}... {total - len(entries)} ältere Recordings im Katalog{Colors.NC}")
                     else:
                         print("  Keine Recordings gefunden")
                 except Exception as e:
@@ -752,8 +1027,22 @@ echo "   File: {output_file}"
                 self.analyze_recording(filename)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precision Touchscreen Recorder")
+    parser.add_argument('--quiet', action='store_true',
+                        help="Keine Live-Ausgabe während Aufnahme/Test (maximaler Durchsatz)")
+    parser.add_argument('--status-rate', type=float, default=10.0,
+                        help="Refresh-Rate der Statuszeile in Hz (Standard: 10)")
+    parser.add_argument('--pack', choices=['raw', 'varint', 'zlib'], default='raw',
+                        help="Punkte in der .trec: raw (Standard, mmap), varint oder zlib (Zig-Zag-Delta, kompakt)")
+    args = parser.parse_args()
+    if not 0 < args.status_rate < float('inf'):
+        parser.error("--status-rate muss eine endliche Zahl > 0 sein (keine Statuszeile: --quiet)")
+    
     try:
         recorder = PrecisionTouchRecorder()
+        recorder.quiet = args.quiet
+        recorder.status_rate = args.status_rate
+        recorder.trec_packing = args.pack
         recorder.run()
     except KeyboardInterrupt:
         print(f"\n{Colors.RED}Programm beendet!{Colors.NC}")
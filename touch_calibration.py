@@ -0,0 +1,163 @@
+"""
+Touch Calibration - Affine Kalibriermatrix Touch-Rohwerte → Monitor-Pixel
+
+Ohne Kalibrierung wird die Matrix aus den Achsenbereichen (EVIOCGABS min/max)
+abgeleitet. Mit Kalibrierung wird sie per Least-Squares aus getippten Punkten
+(3 bis 9, z.B. ein 3x3 Raster) gefittet - das korrigiert Offset, Skalierung,
+Drehung und Scherung. Profile werden pro Device-Name und Monitor gespeichert.
+"""
+
+import os
+import json
+from datetime import datetime
+
+from touch_evdev import ABS_X, ABS_Y, ABS_MT_POSITION_X, ABS_MT_POSITION_Y
+
+
+def default_profile_path():
+    base = os.environ.get('XDG_CONFIG_HOME') or os.path.join(os.path.expanduser('~'), '.config')
+    return os.path.join(base, 'touch-recorder', 'calibration.json')
+
+
+class CalibrationMatrix:
+    """Affine Abbildung x' = a*x + b*y + c, y' = d*x + e*y + f"""
+
+    def __init__(self, a=1.0, b=0.0, c=0.0, d=0.0, e=1.0, f=0.0):
+        self.coefficients = (a, b, c, d, e, f)
+
+    @classmethod
+    def from_axes(cls, x_min, x_max, y_min, y_max, width, height):
+        """Lineare Abbildung des Achsenbereichs auf die Monitorgröße"""
+        sx = width / max(1, x_max - x_min)
+        sy = height / max(1, y_max - y_min)
+        return cls(sx, 0.0, -x_min * sx, 0.0, sy, -y_min * sy)
+
+    @classmethod
+    def fit(cls, raw_points, screen_points):
+        """Least-Squares Fit aus Paaren (raw_x, raw_y) → (screen_x, screen_y), mind. 3 Punkte"""
+        if len(raw_points) != len(screen_points) or len(raw_points) < 3:
+            raise ValueError("Mindestens 3 Punktpaare für eine affine Kalibrierung nötig")
+        # Normalgleichungen (A^T A) p = A^T b mit Zeilen [x, y, 1] - für beide Achsen dieselbe Matrix
+        ata = [[0.0] * 3 for _ in range(3)]
+        atb_x = [0.0] * 3
+        atb_y = [0.0] * 3
+        for (x, y), (sx, sy) in zip(raw_points, screen_points):
+            row = (x, y, 1.0)
+            for i in range(3):
+                for j in range(3):
+                    ata[i][j] += row[i] * row[j]
+                atb_x[i] += row[i] * sx
+                atb_y[i] += row[i] * sy
+        a, b, c = _solve3(ata, atb_x)
+        d, e, f = _solve3(ata, atb_y)
+        return cls(a, b, c, d, e, f)
+
+    def apply(self, x, y):
+        """Einen Rohpunkt abbilden (ganze Pixel)"""
+        a, b, c, d, e, f = self.coefficients
+        return int(a * x + b * y + c), int(d * x + e * y + f)
+
+    def apply_many(self, points):
+        """Alle Rohpunkte eines Frames in einem Durchlauf abbilden"""
+        a, b, c, d, e, f = self.coefficients
+        return [(int(a * x + b * y + c), int(d * x + e * y + f)) for x, y in points]
+
+    def scaled(self, sx, sy):
+        """Matrix für einen anders aufgelösten Monitor (Ausgabe skaliert)"""
+        a, b, c, d, e, f = self.coefficients
+        return CalibrationMatrix(a * sx, b * sx, c * sx, d * sy, e * sy, f * sy)
+
+    def residuals(self, raw_points, screen_points):
+        """Abstand in Pixeln je Punktpaar nach dem Fit"""
+        a, b, c, d, e, f = self.coefficients
+        return [((a * x + b * y + c - sx) ** 2 + (d * x + e * y + f - sy) ** 2) ** 0.5
+                for (x, y), (sx, sy) in zip(raw_points, screen_points)]
+
+    def to_list(self):
+        return [round(v, 9) for v in self.coefficients]
+
+    @classmethod
+    def from_list(cls, values):
+        return cls(*(float(v) for v in values))
+
+
+def _solve3(m, v):
+    """3x3 Gleichungssystem per Gauß-Elimination mit Pivotsuche"""
+    rows = [list(m[i]) + [v[i]] for i in range(3)]
+    for col in range(3):
+        pivot = max(range(col, 3), key=lambda r: abs(rows[r][col]))
+        if abs(rows[pivot][col]) < 1e-12:
+            raise ValueError("Kalibrierpunkte liegen auf einer Linie - bitte über den ganzen Screen verteilen")
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        for r in range(3):
+            if r != col:
+                factor = rows[r][col] / rows[col][col]
+                for k in range(col, 4):
+                    rows[r][k] -= factor * rows[col][k]
+    return [rows[i][3] / rows[i][i] for i in range(3)]
+
+
+def calibration_targets(width, height, count=9, margin=0.1):
+    """Zielpunkte in Monitor-Pixeln: 9 = 3x3 Raster, 4 = Ecken, 3 = Dreieck"""
+    xs = (int(width * margin), width // 2, int(width * (1 - margin)))
+    ys = (int(height * margin), height // 2, int(height * (1 - margin)))
+    if count == 9:
+        return [(x, y) for y in ys for x in xs]
+    if count == 4:
+        return [(xs[0], ys[0]), (xs[2], ys[0]), (xs[0], ys[2]), (xs[2], ys[2])]
+    if count == 3:
+        return [(xs[0], ys[0]), (xs[2], ys[1]), (xs[0], ys[2])]
+    raise ValueError("count muss 3, 4 oder 9 sein")
+
+
+def device_axes(reader):
+    """EVIOCGABS der Positionsachsen: ((x_min, x_max), (y_min, y_max), (res_x, res_y))"""
+    axis_x = ABS_MT_POSITION_X if reader.has_abs(ABS_MT_POSITION_X) else ABS_X
+    axis_y = ABS_MT_POSITION_Y if reader.has_abs(ABS_MT_POSITION_Y) else ABS_Y
+    _, x_min, x_max, _, _, res_x = reader.absinfo(axis_x)
+    _, y_min, y_max, _, _, res_y = reader.absinfo(axis_y)
+    return (x_min, x_max), (y_min, y_max), (res_x, res_y)
+
+
+def _profile_key(device_name, monitor):
+    return f"{device_name}|{monitor}"
+
+
+def load_profiles(path=None):
+    try:
+        with open(path or default_profile_path()) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def load_profile(device_name, monitor, width=None, height=None, path=None):
+    """Gespeicherte Matrix für Device + Monitor (auf aktuelle Auflösung skaliert) oder None"""
+    profile = load_profiles(path).get(_profile_key(device_name, monitor))
+    if not profile:
+        return None
+    matrix = CalibrationMatrix.from_list(profile['matrix'])
+    if width and height and (width, height) != (profile['width'], profile['height']):
+        matrix = matrix.scaled(width / profile['width'], height / profile['height'])
+    return matrix
+
+
+def save_profile(device_name, monitor, width, height, matrix, error_px=None, path=None):
+    """Matrix als Profil speichern (atomar ersetzt)"""
+    path = path or default_profile_path()
+    profiles = load_profiles(path)
+    profiles[_profile_key(device_name, monitor)] = {
+        'device': device_name,
+        'monitor': monitor,
+        'width': width,
+        'height': height,
+        'matrix': matrix.to_list(),
+        'error_px': error_px,
+        'calibrated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(profiles, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,264 @@
+"""
+Touch Catalog - Persistenter SQLite-Index der Recordings eines Verzeichnisses
+
+Pro Recording werden Monitor, Auflösung, Gesten-Zähler, Dauer, Punktzahl,
+Größe und SHA-256 gespeichert. refresh() liest nur Dateien neu ein, deren
+mtime oder Größe sich geändert hat - Listen und Filtern kostet danach
+O(Index) statt O(Summe aller Dateigrößen).
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+
+from touch_format import (load_recording, recording_file,
+                          GESTURE_TAP, GESTURE_DRAG, GESTURE_MULTI, GESTURE_KEY)
+
+CATALOG_FILE = '.touch-catalog.sqlite'
+CATALOG_VERSION = 1
+
+CATALOG_COLUMNS = (
+    'path', 'name', 'data_path', 'is_recording',
+    'mtime_ns', 'size', 'data_mtime_ns', 'data_size',
+    'monitor', 'width', 'height',
+    'gesture_count', 'tap_count', 'drag_count', 'multi_count', 'key_count',
+    'point_count', 'total_ms', 'sha256', 'indexed_at',
+)
+
+ORDER_COLUMNS = ('name', 'mtime_ns', 'size', 'total_ms', 'gesture_count', 'point_count', 'monitor')
+
+_SCHEMA = f'''
+CREATE TABLE IF NOT EXISTS recordings (
+    path TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    data_path TEXT NOT NULL,
+    is_recording INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    data_mtime_ns INTEGER NOT NULL,
+    data_size INTEGER NOT NULL,
+    monitor TEXT,
+    width INTEGER,
+    height INTEGER,
+    gesture_count INTEGER,
+    tap_count INTEGER,
+    drag_count INTEGER,
+    multi_count INTEGER,
+    key_count INTEGER,
+    point_count INTEGER,
+    total_ms INTEGER,
+    sha256 TEXT,
+    indexed_at REAL
+);
+CREATE INDEX IF NOT EXISTS recordings_monitor ON recordings (monitor);
+CREATE INDEX IF NOT EXISTS recordings_mtime ON recordings (mtime_ns);
+PRAGMA user_version = {CATALOG_VERSION};
+'''
+
+
+class CatalogEntry:
+    """Eine Zeile des Katalogs"""
+
+    def __init__(self, row):
+        for name in CATALOG_COLUMNS:
+            setattr(self, name, row[name])
+
+    @property
+    def duration(self):
+        return (self.total_ms or 0) / 1000.0
+
+    @property
+    def mtime(self):
+        return self.mtime_ns / 1e9
+
+    @property
+    def resolution(self):
+        return f"{self.width}x{self.height}"
+
+
+def file_sha256(path):
+    """SHA-256 des Dateiinhalts in 1 MB Blöcken"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_touch_script(path):
+    """Prüfe die ersten 500 Bytes eines .sh auf ein Touch-Recording"""
+    with open(path, 'r', errors='replace') as f:
+        content = f.read(500)
+    return "Touch Recording" in content or "do_tap" in content
+
+
+def scan_recordings(directory):
+    """Recording-Einträge eines Verzeichnisses: alle .sh und .trec ohne .sh daneben"""
+    scripts, trecs = set(), set()
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                if entry.name.endswith('.sh'):
+                    scripts.add(entry.path)
+                elif entry.name.endswith('.trec'):
+                    trecs.add(entry.path)
+    except FileNotFoundError:
+        return []
+    standalone = {p for p in trecs if os.path.splitext(p)[0] + '.sh' not in scripts}
+    return sorted(scripts | standalone)
+
+
+class RecordingCatalog:
+    """SQLite-Katalog im Recording-Verzeichnis, inkrementell per mtime/Größe aktualisiert"""
+
+    def __init__(self, directory, db_path=None):
+        self.directory = directory
+        self.db_path = db_path or os.path.join(directory, CATALOG_FILE)
+        self.indexed = 0  # beim letzten refresh() neu eingelesen
+        self.removed = 0
+        try:
+            self.db = sqlite3.connect(self.db_path)
+            self._init_schema()
+        except sqlite3.Error:
+            # Verzeichnis nicht beschreibbar oder DB defekt: Katalog nur im Speicher
+            self.db_path = ':memory:'
+            self.db = sqlite3.connect(self.db_path)
+            self._init_schema()
+        self.db.row_factory = sqlite3.Row
+
+    def _init_schema(self):
+        version = self.db.execute('PRAGMA user_version').fetchone()[0]
+        if version not in (0, CATALOG_VERSION):
+            self.db.execute('DROP TABLE IF EXISTS recordings')
+        self.db.executescript(_SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def refresh(self):
+        """Neue/geänderte Dateien einlesen, verschwundene entfernen - liefert Anzahl Einträge"""
+        known = {row['path']: (row['mtime_ns'], row['size'], row['data_mtime_ns'], row['data_size'])
+                 for row in self.db.execute(
+                     'SELECT path, mtime_ns, size, data_mtime_ns, data_size FROM recordings')}
+        paths = scan_recordings(self.directory)
+        self.indexed = 0
+
+        with self.db:
+            for path in paths:
+                try:
+                    data_path = recording_file(path)
+                    stat = os.stat(path)
+                    data_stat = stat if data_path == path else os.stat(data_path)
+                except OSError:
+                    continue
+                signature = (stat.st_mtime_ns, stat.st_size, data_stat.st_mtime_ns, data_stat.st_size)
+                if known.get(path) == signature:
+                    continue
+                self.db.execute(
+                    f"INSERT OR REPLACE INTO recordings ({', '.join(CATALOG_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(CATALOG_COLUMNS))})",
+                    self._index(path, data_path, signature))
+                self.indexed += 1
+
+            gone = set(known) - set(paths)
+            self.db.executemany('DELETE FROM recordings WHERE path = ?', ((p,) for p in gone))
+            self.removed = len(gone)
+
+        return len(paths)
+
+    def _index(self, path, data_path, signature):
+        """Katalog-Zeile für eine Datei (einmaliger Lese-Durchlauf)"""
+        row = dict.fromkeys(CATALOG_COLUMNS)
+        row.update(path=path, name=os.path.basename(path), data_path=data_path,
+                   mtime_ns=signature[0], size=signature[1],
+                   data_mtime_ns=signature[2], data_size=signature[3],
+                   indexed_at=time.time(), is_recording=0)
+
+        # .sh ohne .trec: nur echte Touch-Scripts aufnehmen
+        if data_path.endswith('.sh') and not is_touch_script(data_path):
+            return tuple(row[name] for name in CATALOG_COLUMNS)
+
+        try:
+            recording = load_recording(data_path)
+        except Exception:
+            return tuple(row[name] for name in CATALOG_COLUMNS)
+        try:
+            kinds = list(recording.gestures['kind'])
+            meta = recording.meta
+            row.update(
+                is_recording=1,
+                monitor=meta.get('monitor', ''),
+                width=meta.get('width', 0),
+                height=meta.get('height', 0),
+                gesture_count=recording.gesture_count,
+                tap_count=kinds.count(GESTURE_TAP),
+                drag_count=kinds.count(GESTURE_DRAG),
+                multi_count=kinds.count(GESTURE_MULTI),
+                key_count=kinds.count(GESTURE_KEY),
+                point_count=recording.point_count,
+                total_ms=recording.total_ms,
+            )
+        finally:
+            recording.close()
+        row['sha256'] = file_sha256(data_path)
+        return tuple(row[name] for name in CATALOG_COLUMNS)
+
+    def query(self, monitor=None, resolution=None, name=None, min_duration=None,
+              max_duration=None, order_by='name', descending=False, limit=None):
+        """Gefilterte, sortierte Recordings als CatalogEntry Liste
+
+        resolution als "1920x1200" oder (width, height), name als Teilstring,
+        Dauern in Sekunden.
+        """
+        if order_by == 'mtime':
+            order_by = 'mtime_ns'
+        elif order_by == 'duration':
+            order_by = 'total_ms'
+        if order_by not in ORDER_COLUMNS:
+            raise ValueError(f"Unbekannte Sortierung: {order_by} (erlaubt: {', '.join(ORDER_COLUMNS)})")
+
+        where, args = ['is_recording = 1'], []
+        if monitor:
+            where.append('monitor = ?')
+            args.append(monitor)
+        if resolution:
+            if isinstance(resolution, str):
+                resolution = tuple(int(v) for v in resolution.lower().split('x'))
+            where.append('width = ? AND height = ?')
+            args.extend(resolution)
+        if name:
+            where.append("name LIKE ? ESCAPE '\\'")
+            escaped = name.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            args.append(f'%{escaped}%')
+        if min_duration is not None:
+            where.append('total_ms >= ?')
+            args.append(int(min_duration * 1000))
+        if max_duration is not None:
+            where.append('total_ms <= ?')
+            args.append(int(max_duration * 1000))
+
+        sql = (f"SELECT {', '.join(CATALOG_COLUMNS)} FROM recordings WHERE {' AND '.join(where)} "
+               f"ORDER BY {order_by} {'DESC' if descending else 'ASC'}, name")
+        if limit:
+            sql += ' LIMIT ?'
+            args.append(int(limit))
+        return [CatalogEntry(row) for row in self.db.execute(sql, args)]
+
+    def count(self):
+        """Anzahl Recordings im Katalog"""
+        return self.db.execute('SELECT COUNT(*) FROM recordings WHERE is_recording = 1').fetchone()[0]
+
+    def get(self, path):
+        """Katalog-Eintrag eines Pfads oder None"""
+        row = self.db.execute(
+            f"SELECT {', '.join(CATALOG_COLUMNS)} FROM recordings WHERE path = ?", (path,)).fetchone()
+        return CatalogEntry(row) if row else None
+
+    def monitors(self):
+        """Alle Monitore mit Anzahl Recordings"""
+        return self.db.execute(
+            'SELECT monitor, COUNT(*) FROM recordings WHERE is_recording = 1 '
+            'GROUP BY monitor ORDER BY monitor').fetchall()
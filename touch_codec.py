@@ -0,0 +1,104 @@
+"""
+Touch Codec - Kompakte Punkt-Spalten: Zig-Zag-Delta + Varint, optional zlib
+
+Jede int32-Spalte wird als Folge von Differenzen zum Vorgänger gespeichert
+(erster Wert gegen 0). Zig-Zag bildet kleine positive und negative Differenzen
+auf kleine vorzeichenlose Zahlen ab (0, -1, 1, -2 → 0, 1, 2, 3), Varint packt
+sie in 7-Bit-Gruppen mit gesetztem Bit 8 als "es folgt noch ein Byte".
+Drag-Punkte wenige Pixel/ms auseinander brauchen so ein Byte pro Wert statt vier.
+
+Block-Layout: pro Spalte uint32 Länge + Varint-Bytes, bei compress=True der
+ganze Block mit zlib komprimiert.
+"""
+
+import re
+import struct
+import zlib
+from array import array
+from itertools import accumulate
+
+COLUMN_LENGTH = struct.Struct('<I')
+
+# Mehrbyte-Varint: Bytes mit Fortsetzungs-Bit, abgeschlossen durch ein Byte ohne
+_MULTI_BYTE = re.compile(rb'[\x80-\xff]+[\x00-\x7f]')
+
+# Einbyte-Varint (Zig-Zag 0..127) → Differenz -64..63 als vorzeichenbehaftetes Byte
+_ZIGZAG_BYTES = bytes(((z >> 1) ^ -(z & 1)) & 0xff for z in range(128)) + bytes(128)
+
+
+def encode_column(values):
+    """int-Folge als Zig-Zag-Delta-Varints"""
+    out = bytearray()
+    previous = 0
+    for value in values:
+        delta = value - previous
+        previous = value
+        z = delta << 1 if delta >= 0 else (~delta << 1) | 1
+        while z >= 0x80:
+            out.append((z & 0x7f) | 0x80)
+            z >>= 7
+        out.append(z)
+    return bytes(out)
+
+
+def decode_column(data, count):
+    """Zig-Zag-Delta-Varints zurück in ein int32 array (count Werte erwartet)
+
+    Einbyte-Werte (der Normalfall) werden blockweise per bytes.translate
+    dekodiert, nur Mehrbyte-Werte laufen durch die Python-Schleife.
+    """
+    if data and data[-1] & 0x80:
+        raise ValueError("Varint-Spalte endet mitten in einem Wert")
+    deltas = []
+    position = 0
+    for match in _MULTI_BYTE.finditer(data):
+        deltas.extend(_single_bytes(data[position:match.start()]))
+        z = shift = 0
+        for byte in match.group():
+            z |= (byte & 0x7f) << shift
+            shift += 7
+        deltas.append((z >> 1) ^ -(z & 1))
+        position = match.end()
+    deltas.extend(_single_bytes(data[position:]))
+    if len(deltas) != count:
+        raise ValueError(f"Varint-Spalte beschädigt: {len(deltas)} statt {count} Werte")
+    try:
+        return array('i', accumulate(deltas))
+    except OverflowError:
+        raise ValueError("Varint-Spalte beschädigt: Wert außerhalb int32")
+
+
+def _single_bytes(data):
+    """Differenzen eines Laufs von Einbyte-Varints"""
+    signed = array('b')
+    signed.frombytes(data.translate(_ZIGZAG_BYTES))
+    return signed
+
+
+def pack_columns(columns, compress=False):
+    """Spalten (gleiche Länge) als Block: uint32 Länge + Varints pro Spalte, optional zlib"""
+    parts = []
+    for column in columns:
+        data = encode_column(column)
+        parts.append(COLUMN_LENGTH.pack(len(data)))
+        parts.append(data)
+    block = b''.join(parts)
+    return zlib.compress(block) if compress else block
+
+
+def unpack_columns(block, names, count, compressed=False):
+    """Block aus pack_columns in {Name: int32 array} mit je count Werten"""
+    try:
+        data = zlib.decompress(block) if compressed else bytes(block)
+    except zlib.error as e:
+        raise ValueError(f"Gepackte Punkte beschädigt: {e}")
+    columns = {}
+    offset = 0
+    for name in names:
+        if offset + COLUMN_LENGTH.size > len(data):
+            raise ValueError("Gepackte Punkte unvollständig")
+        length, = COLUMN_LENGTH.unpack_from(data, offset)
+        offset += COLUMN_LENGTH.size
+        columns[name] = decode_column(data[offset:offset + length], count)
+        offset += length
+    return columns
@@ -0,0 +1,511 @@
+"""
+Touch Evdev Reader - Liest struct input_event direkt von /dev/input/eventN
+"""
+
+import os
+import re
+import fcntl
+import heapq
+import struct
+import selectors
+import subprocess
+import time
+
+# struct input_event { struct timeval time; __u16 type; __u16 code; __s32 value; }
+EVENT_FORMAT = 'llHHi'
+EVENT_SIZE = struct.calcsize(EVENT_FORMAT)
+
+# Event-Typen (linux/input-event-codes.h)
+EV_SYN = 0x00
+EV_KEY = 0x01
+EV_ABS = 0x03
+
+# SYN Codes
+SYN_REPORT = 0
+SYN_MT_REPORT = 2
+SYN_DROPPED = 3
+
+# Key Codes
+BTN_TOUCH = 0x14a
+
+# ABS Codes
+ABS_X = 0x00
+ABS_Y = 0x01
+ABS_MT_SLOT = 0x2f
+ABS_MT_POSITION_X = 0x35
+ABS_MT_POSITION_Y = 0x36
+ABS_MT_TRACKING_ID = 0x39
+
+# Tastatur/Keypad: evdev Keycode -> X Keysym (für xdotool/Bash-Export; XTest nutzt Keycode + 8)
+KEY_SYMS = {
+    1: 'Escape', 14: 'BackSpace', 15: 'Tab', 28: 'Return', 57: 'space',
+    2: '1', 3: '2', 4: '3', 5: '4', 6: '5', 7: '6', 8: '7', 9: '8', 10: '9', 11: '0',
+    16: 'q', 17: 'w', 18: 'e', 19: 'r', 20: 't', 21: 'y', 22: 'u', 23: 'i', 24: 'o', 25: 'p',
+    30: 'a', 31: 's', 32: 'd', 33: 'f', 34: 'g', 35: 'h', 36: 'j', 37: 'k', 38: 'l',
+    44: 'z', 45: 'x', 46: 'c', 47: 'v', 48: 'b', 49: 'n', 50: 'm',
+    59: 'F1', 60: 'F2', 61: 'F3', 62: 'F4', 63: 'F5', 64: 'F6', 65: 'F7', 66: 'F8', 67: 'F9', 68: 'F10',
+    71: 'KP_7', 72: 'KP_8', 73: 'KP_9', 74: 'KP_Subtract', 75: 'KP_4', 76: 'KP_5', 77: 'KP_6',
+    78: 'KP_Add', 79: 'KP_1', 80: 'KP_2', 81: 'KP_3', 82: 'KP_0', 83: 'KP_Decimal',
+    55: 'KP_Multiply', 96: 'KP_Enter', 98: 'KP_Divide',
+    102: 'Home', 103: 'Up', 104: 'Prior', 105: 'Left', 106: 'Right', 107: 'End', 108: 'Down',
+    109: 'Next', 110: 'Insert', 111: 'Delete',
+}
+
+ABS_CNT = 0x40
+KEY_MAX = 0x2ff
+
+# struct input_absinfo { __s32 value, minimum, maximum, fuzz, flat, resolution; }
+ABSINFO = struct.Struct('6i')
+
+
+def _ioc_read(nr, size):
+    """_IOR('E', nr, size) aus linux/input.h"""
+    return (2 << 30) | (size << 16) | (ord('E') << 8) | nr
+
+
+def EVIOCGABS(code):
+    return _ioc_read(0x40 + code, ABSINFO.size)
+
+
+def EVIOCGKEY(length):
+    return _ioc_read(0x18, length)
+
+
+def EVIOCGMTSLOTS(length):
+    return _ioc_read(0x0a, length)
+
+
+def EVIOCGBIT(ev_type, length):
+    return _ioc_read(0x20 + ev_type, length)
+
+
+def EVIOCGNAME(length):
+    return _ioc_read(0x06, length)
+
+
+TYPE_NAMES = {EV_SYN: 'EV_SYN', EV_KEY: 'EV_KEY', EV_ABS: 'EV_ABS'}
+CODE_NAMES = {
+    (EV_KEY, BTN_TOUCH): 'BTN_TOUCH',
+    (EV_ABS, ABS_X): 'ABS_X',
+    (EV_ABS, ABS_Y): 'ABS_Y',
+    (EV_ABS, ABS_MT_SLOT): 'ABS_MT_SLOT',
+    (EV_ABS, ABS_MT_POSITION_X): 'ABS_MT_POSITION_X',
+    (EV_ABS, ABS_MT_POSITION_Y): 'ABS_MT_POSITION_Y',
+    (EV_ABS, ABS_MT_TRACKING_ID): 'ABS_MT_TRACKING_ID',
+    (EV_SYN, SYN_REPORT): 'SYN_REPORT',
+    (EV_SYN, SYN_MT_REPORT): 'SYN_MT_REPORT',
+    (EV_SYN, SYN_DROPPED): 'SYN_DROPPED',
+}
+
+# evtest Ausgabe: "Event: time 1700000000.123456, type 3 (EV_ABS), code 53 (ABS_MT_POSITION_X), value 8000"
+EVTEST_EVENT_RE = re.compile(
+    r'Event: time (\d+)\.(\d+), type (\d+) \([^)]*\), code (\d+) \([^)]*\), value (-?\d+)')
+EVTEST_SYN_RE = re.compile(r'Event: time (\d+)\.(\d+), [-+]+ (SYN_\w+) [-+]+')
+EVTEST_SYN_CODES = {'SYN_REPORT': SYN_REPORT, 'SYN_MT_REPORT': SYN_MT_REPORT, 'SYN_DROPPED': SYN_DROPPED}
+
+
+def parse_evtest_line(line):
+    """Parse eine evtest-Zeile zu (sec, usec, type, code, value) oder None"""
+    match = EVTEST_EVENT_RE.match(line)
+    if match:
+        sec, usec, ev_type, code, value = match.groups()
+        return int(sec), int(usec), int(ev_type), int(code), int(value)
+
+    match = EVTEST_SYN_RE.match(line)
+    if match:
+        sec, usec, name = match.groups()
+        return int(sec), int(usec), EV_SYN, EVTEST_SYN_CODES.get(name, SYN_REPORT), 0
+
+    return None
+
+
+def format_evtest_line(event):
+    """Formatiere ein Event wie evtest (für Fixtures und Benchmarks)"""
+    sec, usec, ev_type, code, value = event
+    name = CODE_NAMES.get((ev_type, code), '?')
+    if ev_type == EV_SYN and code in (SYN_REPORT, SYN_DROPPED):
+        marker = '-' if code == SYN_REPORT else '+'
+        return f"Event: time {sec}.{usec:06d}, {marker * 14} {name} {marker * 12}\n"
+    return (f"Event: time {sec}.{usec:06d}, type {ev_type} ({TYPE_NAMES.get(ev_type, '?')}), "
+            f"code {code} ({name}), value {value}\n")
+
+
+class FrameAssembler:
+    """Fasst Events bis zum SYN_REPORT zu Frames (kernel_time, [(type, code, value), ...]) zusammen
+
+    Nach SYN_DROPPED werden alle Events bis zum nächsten SYN_REPORT verworfen.
+    on_drop(discarded) wird dann aufgerufen und liefert den aktuellen Device-Zustand
+    als Events (oder None); der nächste Frame beginnt mit (EV_SYN, SYN_DROPPED, 1)
+    gefolgt von diesem Zustand bzw. (EV_SYN, SYN_DROPPED, 0) ohne Zustand.
+    """
+
+    def __init__(self, on_drop=None):
+        self.on_drop = on_drop
+        self.pending = []
+        self.dropping = False
+        self.discarded = 0
+
+    def push(self, events):
+        """Events anhängen (auch blockweise); liefert die dadurch abgeschlossenen Frames"""
+        frames = []
+        pending = self.pending
+        for sec, usec, ev_type, code, value in events:
+            if ev_type == EV_SYN and code == SYN_DROPPED:
+                self.dropping = True
+                self.discarded += len(pending)
+                pending = []
+            elif ev_type == EV_SYN and code == SYN_REPORT:
+                if self.dropping:
+                    state = self.on_drop(self.discarded) if self.on_drop else None
+                    pending = [(EV_SYN, SYN_DROPPED, 1 if state is not None else 0)] + (state or [])
+                    self.dropping = False
+                    self.discarded = 0
+                frames.append((sec + usec * 1e-6, pending))
+                pending = []
+            elif self.dropping:
+                self.discarded += 1
+            elif ev_type != EV_SYN:
+                pending.append((ev_type, code, value))
+        self.pending = pending
+        return frames
+
+
+def assemble_frames(events, on_drop=None):
+    """Frames aus einem Event-Iterator (siehe FrameAssembler)"""
+    assembler = FrameAssembler(on_drop)
+    for event in events:
+        yield from assembler.push((event,))
+
+
+class SlotTracker:
+    """Verfolgt Kontakte pro MT-Slot (Protokoll B); Single-Touch Devices laufen als Slot 0"""
+
+    def __init__(self):
+        self.multitouch = False
+        self.slot = 0
+        self.ids = {}  # slot -> tracking_id (nur aktive Kontakte)
+        self.positions = {}  # slot -> [raw_x, raw_y] (letzte bekannte Position)
+        self.began = []  # Slots mit Touch-Down in diesem Frame
+        self.ended = []  # Slots mit Touch-Up in diesem Frame
+        self.moved = set()  # Slots mit neuer Position in diesem Frame
+        self.dropped = False  # Frame folgt auf SYN_DROPPED
+        self._single_position = [0, 0]
+
+    def update(self, events):
+        """Wende die Events eines Frames an"""
+        began = []
+        ended = []
+        moved = set()
+        single_touch = None
+        single_moved = False
+        previous_ids = None
+
+        self.dropped = bool(events) and events[0][:2] == (EV_SYN, SYN_DROPPED)
+        if self.dropped and events[0][2] and self.multitouch:
+            # Frame enthält den kompletten Zustand - Kontakte danach abgleichen
+            previous_ids = self.ids
+            self.ids = {}
+
+        for ev_type, code, value in events:
+            if ev_type == EV_ABS:
+                if code == ABS_MT_SLOT:
+                    self.multitouch = True
+                    self.slot = value
+                elif code == ABS_MT_TRACKING_ID:
+                    self.multitouch = True
+                    if value < 0:
+                        if self.slot in self.ids:
+                            del self.ids[self.slot]
+                            ended.append(self.slot)
+                    else:
+                        if self.slot not in self.ids:
+                            began.append(self.slot)
+                        self.ids[self.slot] = value
+                elif code == ABS_MT_POSITION_X:
+                    self.multitouch = True
+                    self.positions.setdefault(self.slot, [0, 0])[0] = value
+                    moved.add(self.slot)
+                elif code == ABS_MT_POSITION_Y:
+                    self.multitouch = True
+                    self.positions.setdefault(self.slot, [0, 0])[1] = value
+                    moved.add(self.slot)
+                elif code == ABS_X:
+                    self._single_position[0] = value
+                    single_moved = True
+                elif code == ABS_Y:
+                    self._single_position[1] = value
+                    single_moved = True
+            elif ev_type == EV_KEY and code == BTN_TOUCH:
+                single_touch = value
+
+        if previous_ids is not None:
+            began = [slot for slot, tracking_id in self.ids.items() if previous_ids.get(slot) != tracking_id]
+            ended = [slot for slot, tracking_id in previous_ids.items() if self.ids.get(slot) != tracking_id]
+
+        if not self.multitouch:
+            # Single-Touch: BTN_TOUCH + ABS_X/ABS_Y als Slot 0
+            self.positions[0] = list(self._single_position)
+            if single_moved:
+                moved.add(0)
+            if single_touch == 1 and 0 not in self.ids:
+                self.ids[0] = 0
+                began.append(0)
+            elif single_touch == 0 and 0 in self.ids:
+                del self.ids[0]
+                ended.append(0)
+
+        self.began = began
+        self.ended = ended
+        self.moved = moved
+
+
+class EvdevReader:
+    """Liest input_event Records blockweise per os.read vom Device"""
+
+    backend = "evdev"
+
+    def __init__(self, device_path, batch_size=64):
+        self.device_path = device_path
+        self.batch_size = batch_size
+        self.fd = os.open(device_path, os.O_RDONLY)
+        self.dropped = 0  # Anzahl SYN_DROPPED
+        self.discarded = 0  # verworfene Events (unvollständige Frames)
+        self.assembler = FrameAssembler(self._on_drop)
+        self.remainder = b''
+        self.more = False
+        self.parse_histogram = None  # optional: LatencyHistogram, Parse-Zeit pro Event in ns
+
+    def events(self):
+        """Liefere rohe Events (sec, usec, type, code, value)"""
+        chunk_size = EVENT_SIZE * self.batch_size
+        remainder = b''
+        while True:
+            data = os.read(self.fd, chunk_size)
+            if not data:
+                return
+            if remainder:
+                data = remainder + data
+            usable = len(data) - len(data) % EVENT_SIZE
+            remainder = data[usable:]
+            yield from struct.iter_unpack(EVENT_FORMAT, data[:usable])
+
+    def read_frames(self):
+        """Ein os.read; liefert die abgeschlossenen Frames oder None am Dateiende"""
+        chunk_size = EVENT_SIZE * self.batch_size
+        data = os.read(self.fd, chunk_size)
+        self.more = len(data) == chunk_size  # Puffer evtl. nicht leer
+        if not data:
+            return None
+        if self.remainder:
+            data = self.remainder + data
+        usable = len(data) - len(data) % EVENT_SIZE
+        self.remainder = data[usable:]
+        if self.parse_histogram is None or not usable:
+            return self.assembler.push(struct.iter_unpack(EVENT_FORMAT, data[:usable]))
+        start = time.perf_counter_ns()
+        frames = self.assembler.push(struct.iter_unpack(EVENT_FORMAT, data[:usable]))
+        self.parse_histogram.record((time.perf_counter_ns() - start) * EVENT_SIZE // usable)
+        return frames
+
+    def frames(self):
+        """Liefere komplette Frames mit Kernel-Timestamp"""
+        while True:
+            frames = self.read_frames()
+            if frames is None:
+                return
+            yield from frames
+
+    def name(self):
+        """EVIOCGNAME: Gerätename"""
+        buf = bytearray(256)
+        length = fcntl.ioctl(self.fd, EVIOCGNAME(len(buf)), buf, True)
+        return buf[:max(0, length - 1)].decode(errors='replace')
+
+    def is_pointer(self):
+        """True für Touchscreens/Digitizer (absolute Achsen), False für Tastaturen/Keypads"""
+        return self.has_abs(ABS_X) or self.has_abs(ABS_MT_POSITION_X)
+
+    def absinfo(self, code):
+        """EVIOCGABS: (value, minimum, maximum, fuzz, flat, resolution) einer Achse"""
+        buf = bytearray(ABSINFO.size)
+        fcntl.ioctl(self.fd, EVIOCGABS(code), buf, True)
+        return ABSINFO.unpack(buf)
+
+    def has_abs(self, code):
+        """EVIOCGBIT: unterstützt das Device die Achse?"""
+        buf = bytearray(ABS_CNT // 8)
+        fcntl.ioctl(self.fd, EVIOCGBIT(EV_ABS, len(buf)), buf, True)
+        return bool(buf[code // 8] & (1 << (code % 8)))
+
+    def query_state(self):
+        """Aktuellen Zustand (Tasten, Achsen, MT-Slots) per ioctl als Events abfragen"""
+        state = []
+        if self.has_abs(ABS_MT_SLOT):
+            current_slot = self.absinfo(ABS_MT_SLOT)[0]
+            slot_count = self.absinfo(ABS_MT_SLOT)[2] + 1
+            slots = {}
+            for code in (ABS_MT_TRACKING_ID, ABS_MT_POSITION_X, ABS_MT_POSITION_Y):
+                # struct input_mt_request_layout { __u32 code; __s32 values[num_slots]; }
+                buf = bytearray(struct.pack('I', code) + bytes(4 * slot_count))
+                fcntl.ioctl(self.fd, EVIOCGMTSLOTS(len(buf)), buf, True)
+                slots[code] = struct.unpack_from(f'{slot_count}i', buf, 4)
+            for slot in range(slot_count):
+                if slots[ABS_MT_TRACKING_ID][slot] < 0:
+                    continue
+                state.append((EV_ABS, ABS_MT_SLOT, slot))
+                for code in (ABS_MT_TRACKING_ID, ABS_MT_POSITION_X, ABS_MT_POSITION_Y):
+                    state.append((EV_ABS, code, slots[code][slot]))
+            state.append((EV_ABS, ABS_MT_SLOT, current_slot))
+
+        for code in (ABS_X, ABS_Y):
+            if self.has_abs(code):
+                state.append((EV_ABS, code, self.absinfo(code)[0]))
+
+        keys = bytearray(KEY_MAX // 8 + 1)
+        fcntl.ioctl(self.fd, EVIOCGKEY(len(keys)), keys, True)
+        state.append((EV_KEY, BTN_TOUCH, 1 if keys[BTN_TOUCH // 8] & (1 << (BTN_TOUCH % 8)) else 0))
+        return state
+
+    def _on_drop(self, discarded):
+        self.dropped += 1
+        self.discarded += discarded
+        try:
+            return self.query_state()
+        except OSError:
+            return None  # z.B. Fixture-Datei statt Device
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class EvtestReader:
+    """Fallback: parst die Text-Ausgabe von 'sudo evtest'"""
+
+    backend = "evtest"
+
+    def __init__(self, device_path, command=None):
+        self.device_path = device_path
+        # command: alternative Quelle für evtest-Text (z.B. synthetischer Stream im Benchmark)
+        self.proc = subprocess.Popen(command or ['sudo', 'evtest', device_path],
+                                     stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        self.dropped = 0
+        self.discarded = 0
+        self.parse_histogram = None  # optional: LatencyHistogram, Parse-Zeit pro Zeile in ns
+
+    def events(self):
+        """Liefere rohe Events (sec, usec, type, code, value)"""
+        histogram = self.parse_histogram
+        clock = time.perf_counter_ns
+        for line in self.proc.stdout:
+            if histogram is None:
+                event = parse_evtest_line(line)
+            else:
+                start = clock()
+                event = parse_evtest_line(line)
+                histogram.record(clock() - start)
+            if event:
+                yield event
+
+    def frames(self):
+        """Liefere komplette Frames mit Kernel-Timestamp"""
+        return assemble_frames(self.events(), self._on_drop)
+
+    def _on_drop(self, discarded):
+        # Ohne Device-Zugriff kein Resync möglich - Geste wird nur markiert
+        self.dropped += 1
+        self.discarded += discarded
+        return None
+
+    def close(self):
+        if self.proc is not None:
+            self.proc.terminate()
+            self.proc = None
+
+
+class MultiDeviceReader:
+    """Mehrere evdev-Devices in einer Schleife (selectors/epoll), Frames nach Kernel-Zeit gemischt
+
+    frames() liefert (kernel_time, device_index, events). Ein Frame wird erst ausgegeben,
+    wenn kein Device mit noch ungelesenen Daten einen früheren Frame liefern kann:
+    Devices, die nicht bereit sind oder deren Puffer geleert wurde, haben keine älteren Events.
+    """
+
+    backend = "evdev"
+
+    def __init__(self, device_paths, selector_class=selectors.DefaultSelector):
+        self.selector_class = selector_class
+        self.readers = []
+        try:
+            for path in device_paths:
+                self.readers.append(EvdevReader(path))
+        except OSError:
+            self.close()
+            raise
+
+    @property
+    def dropped(self):
+        return sum(reader.dropped for reader in self.readers)
+
+    @property
+    def discarded(self):
+        return sum(reader.discarded for reader in self.readers)
+
+    def frames(self):
+        """Liefere (kernel_time, device_index, events) in zeitlicher Reihenfolge"""
+        selector = self.selector_class()
+        for index, reader in enumerate(self.readers):
+            os.set_blocking(reader.fd, False)
+            selector.register(reader.fd, selectors.EVENT_READ, index)
+
+        heap = []  # (kernel_time, seq, device_index, events)
+        seq = 0
+        latest = [0.0] * len(self.readers)
+        open_devices = len(self.readers)
+        try:
+            while open_devices:
+                backlog = []  # Devices mit vollem Read - evtl. weitere Daten im Kernel-Puffer
+                for key, _ in selector.select():
+                    index = key.data
+                    reader = self.readers[index]
+                    try:
+                        frames = reader.read_frames()
+                    except BlockingIOError:
+                        continue
+                    if frames is None:
+                        selector.unregister(key.fd)
+                        open_devices -= 1
+                        continue
+                    for event_time, events in frames:
+                        heapq.heappush(heap, (event_time, seq, index, events))
+                        seq += 1
+                        latest[index] = event_time
+                    if reader.more:
+                        backlog.append(index)
+
+                bound = min((latest[index] for index in backlog), default=float('inf'))
+                while heap and heap[0][0] < bound:
+                    event_time, _, index, events = heapq.heappop(heap)
+                    yield event_time, index, events
+
+            while heap:
+                event_time, _, index, events = heapq.heappop(heap)
+                yield event_time, index, events
+        finally:
+            selector.close()
+
+    def close(self):
+        for reader in self.readers:
+            reader.close()
+
+
+def open_event_source(device_path, backend="auto"):
+    """Öffne Device nativ, bei fehlenden Rechten Fallback auf evtest"""
+    if backend in ("auto", "evdev"):
+        try:
+            return EvdevReader(device_path)
+        except OSError:
+            if backend == "evdev":
+                raise
+    return EvtestReader(device_path)
@@ -0,0 +1,250 @@
+"""
+Touch Farm - Parallel-Playback auf mehreren X Displays (z.B. lokale Xvfb-Instanzen)
+
+Ein Worker-Prozess pro Display mit eigener Injection-Verbindung. Jeder Plan
+liegt einmal als int32-Spalten in Shared Memory; die Worker lesen ihn über
+schreibgeschützte Views, ohne ihn zu kopieren oder neu zu kompilieren.
+"""
+
+import os
+import time
+import shutil
+import signal
+import subprocess
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+
+from touch_replay import PLAN_COLUMNS, ReplayPlan, ReplayEngine, open_backend
+from touch_stats import LatencyHistogram
+
+
+class SharedPlan:
+    """Plan-Spalten hintereinander in einem Shared-Memory-Block (Besitzer: erzeugender Prozess)"""
+
+    def __init__(self, plan):
+        self.events = len(plan)
+        size = self.events * 4 * len(PLAN_COLUMNS)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, size))
+        offset = 0
+        for column in plan.columns().values():
+            data = column.tobytes()
+            self.shm.buf[offset:offset + len(data)] = data
+            offset += len(data)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+class AttachedPlan:
+    """Schreibgeschützter ReplayPlan über einem SharedPlan (im Worker)"""
+
+    def __init__(self, name, events):
+        self.shm = shared_memory.SharedMemory(name=name)
+        self.view = self.shm.buf.toreadonly()
+        size = events * 4
+        self.columns = {column: self.view[i * size:(i + 1) * size].cast('i')
+                        for i, column in enumerate(PLAN_COLUMNS)}
+        self.plan = ReplayPlan(self.columns)
+
+    def close(self):
+        # Views zuerst freigeben, sonst lässt sich der Block nicht schließen
+        self.plan = None
+        for column in self.columns.values():
+            column.release()
+        self.view.release()
+        self.shm.close()
+
+
+def free_display_numbers(count, start=1):
+    """count freie X Display-Nummern ab start (kein Lock-File, kein Socket)"""
+    numbers = []
+    number = start
+    while len(numbers) < count:
+        if not (os.path.exists(f'/tmp/.X{number}-lock') or os.path.exists(f'/tmp/.X11-unix/X{number}')):
+            numbers.append(number)
+        number += 1
+    return numbers
+
+
+class XvfbServer:
+    """Lokaler Xvfb auf :number - Konstruktor wartet, bis der Server Verbindungen annimmt"""
+
+    def __init__(self, number, size=(1920, 1080), depth=24, timeout=5.0):
+        if not shutil.which('Xvfb'):
+            raise OSError("Xvfb nicht gefunden (Paket xvfb)")
+        self.number = number
+        self.display = f":{number}"
+        width, height = size
+        self.process = subprocess.Popen(
+            ['Xvfb', self.display, '-screen', '0', f'{width}x{height}x{depth}', '-nolisten', 'tcp'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        socket_path = f'/tmp/.X11-unix/X{number}'
+        deadline = time.monotonic() + timeout
+        while not os.path.exists(socket_path):
+            if self.process.poll() is not None:
+                raise OSError(f"Xvfb {self.display} beendet (Code {self.process.returncode})")
+            if time.monotonic() > deadline:
+                self.stop()
+                raise OSError(f"Xvfb {self.display} nach {timeout:g}s nicht bereit")
+            time.sleep(0.02)
+
+    def stop(self):
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+
+
+def start_xvfb(count, size=(1920, 1080), start=1):
+    """count Xvfb-Server auf freien Displays starten; bei einem Fehler laufen keine übrig"""
+    servers = []
+    try:
+        for number in free_display_numbers(count, start):
+            servers.append(XvfbServer(number, size))
+    except OSError:
+        for server in servers:
+            server.stop()
+        raise
+    return servers
+
+
+_stop_event = None
+
+
+def _init_worker(stop_event):
+    """Pool-Initializer: Ctrl+C nur im Playback behandeln, Stop-Flag aller Worker merken"""
+    global _stop_event
+    _stop_event = stop_event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def play_display(job):
+    """Worker: einen Plan aus dem Shared Memory loops-mal auf job['display'] abspielen"""
+    result = {'display': job['display'], 'recording': job['recording'], 'backend': job['backend'],
+              'loops': [], 'error': None}
+    histogram = LatencyHistogram()  # Ausgabe-Verspätung aller Events (ns)
+    attached = AttachedPlan(job['plan'], job['events'])
+    backend = None
+    try:
+        backend = open_backend(job['backend'], job['display'])
+        result['backend'] = backend.name
+        engine = ReplayEngine(backend)
+
+        def interrupt(signum, frame):
+            _stop_event.set()
+            engine.stop()
+
+        signal.signal(signal.SIGINT, interrupt)
+        curve_origin = 0.0
+        for loop in range(1, job['loops'] + 1):
+            if _stop_event is not None and _stop_event.is_set():
+                break
+            played = engine.play(attached.plan, job['speed'], job['offset'], curve_origin, job.get('rate'))
+            curve_origin += played.get('curve_elapsed', 0.0)
+            trace = played['trace']
+            for late in trace.lateness_ms():
+                histogram.record(int(late * 1e6))
+            report = trace.report(attached.plan)
+            result['loops'].append({
+                'loop': loop,
+                'events': played['events'],
+                'elapsed_s': round(played['elapsed'], 4),
+                'drift_ms': round(played['drift_ms'], 3),
+                'events_per_s': round(played['events_per_s'], 1),
+                'lateness': report['lateness'],
+                'completed': played['completed'],
+            })
+            if not played['completed']:
+                break
+    except Exception as e:
+        # z.B. Xlib-Fehler, wenn der Xvfb des Displays stirbt - die anderen Displays laufen weiter
+        result['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        if backend:
+            backend.close()
+        attached.close()
+    result['histogram'] = histogram
+    return result
+
+
+def _failed_display(task, error):
+    """Ergebnis-Eintrag für ein Display, dessen Worker kein Ergebnis geliefert hat"""
+    return {'display': task['display'], 'recording': task['recording'], 'backend': task['backend'],
+            'loops': [], 'error': f"{type(error).__name__}: {error}", 'histogram': LatencyHistogram()}
+
+
+def run_farm(jobs, workers=None):
+    """Jobs parallel abspielen: [{'display', 'recording', 'plan': ReplayPlan, 'backend', 'speed', 'loops', 'offset'}]
+
+    Optional 'rate' (Events/s, 0 = maximal) ersetzt das Aufnahme-Timing wie in ReplayEngine.play.
+
+    Jeder Plan wird einmal in Shared Memory gelegt, auch wenn mehrere Displays
+    ihn abspielen. Liefert (Zusammenfassung, Ergebnisse pro Display).
+    """
+    workers = workers or min(len(jobs), os.cpu_count() or 1)
+    shared = {}
+    stop_event = multiprocessing.Event()
+    results = []
+    start = time.perf_counter()
+    try:
+        tasks = []
+        for job in jobs:
+            plan = job['plan']
+            if id(plan) not in shared:
+                shared[id(plan)] = SharedPlan(plan)
+            task = dict(job, plan=shared[id(plan)].name, events=len(plan))
+            tasks.append(task)
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(stop_event,)) as pool:
+            futures = [pool.submit(play_display, task) for task in tasks]
+            for task, future in zip(tasks, futures):
+                while True:
+                    try:
+                        results.append(future.result())
+                        break
+                    except KeyboardInterrupt:
+                        # Laufende Worker haben SIGINT selbst erhalten, wartende starten nicht mehr
+                        stop_event.set()
+                    except Exception as e:
+                        # Worker-Prozess gestorben (BrokenProcessPool) o.ä. - nur dieses Display fällt aus
+                        results.append(_failed_display(task, e))
+                        break
+    finally:
+        for plan in shared.values():
+            plan.close()
+    return summarize_farm(results, time.perf_counter() - start, workers), results
+
+
+def summarize_farm(results, wall, workers):
+    """Ergebnisse aller Displays zusammenfassen; Histogramme werden gemischt und durch ihre Summary ersetzt"""
+    histogram = LatencyHistogram()
+    events = 0
+    loops = 0
+    for result in results:
+        histogram.merge(result['histogram'])
+        result['histogram'] = result['histogram'].summary()
+        events += sum(loop['events'] for loop in result['loops'])
+        loops += len(result['loops'])
+    failed = [result['display'] for result in results if result['error']]
+    return {
+        'displays': len(results),
+        'workers': workers,
+        'failed': failed,
+        'loops': loops,
+        'events': events,
+        'wall_s': round(wall, 3),
+        'events_per_s': round(events / wall, 1) if wall > 0 else 0.0,
+        'lateness_ms': histogram.summary(),
+        'completed': not failed and all(loop['completed'] for result in results for loop in result['loops']),
+    }
@@ -0,0 +1,726 @@
+"""
+Touch Recording Format - Binärer Spalten-Container (.trec) und Bash-Export (.sh)
+
+Layout (little-endian):
+    Header      32 Bytes (Magic, Version, Längen, Zähler, Gesamtdauer)
+    Metadaten   JSON (Monitor, Auflösung, Device), auf 4 Bytes aufgefüllt
+    Gesten      6 x int32[gesture_count]: kind, delay_ms, duration_ms, point_offset, point_count, device
+    Punkte      4 x int32[point_count]:   x, y, t_ms (relativ zum Gestenstart), contact
+                oder gepackt (Version 4, flags): Zig-Zag-Delta-Varints je Spalte, optional zlib (touch_codec)
+
+delay_ms ist der Abstand zum Ende der vorherigen Geste und darf negativ sein,
+wenn sich Gesten verschiedener Devices überlappen. device indiziert meta['devices'].
+Multi-Touch Gesten (GESTURE_MULTI) speichern alle Kontakte hintereinander,
+die contact-Spalte nummeriert sie innerhalb der Geste (0 = primärer Kontakt).
+Tasten (GESTURE_KEY) speichern einen Punkt mit x = evdev Keycode.
+Version 1 Dateien haben keine contact-, Version 1/2 keine device-Spalte.
+Ungepackte Dateien werden weiter als Version 3 geschrieben und per mmap ohne
+Kopie geladen, gepackte beim Laden einmal dekodiert.
+"""
+
+import os
+import sys
+import re
+import shutil
+import subprocess
+import json
+import mmap
+import struct
+from array import array
+
+from touch_evdev import KEY_SYMS
+from touch_codec import pack_columns, unpack_columns
+
+TREC_MAGIC = b'TREC'
+TREC_VERSION = 4
+TREC_HEADER = struct.Struct('<4sHHIIIIII')
+TREC_FLAG_PACKED = 0x1  # Punkte als Zig-Zag-Delta-Varints
+TREC_FLAG_ZLIB = 0x2    # gepackte Punkte zusätzlich zlib-komprimiert
+TREC_PACKING = {'raw': 0, 'varint': TREC_FLAG_PACKED, 'zlib': TREC_FLAG_PACKED | TREC_FLAG_ZLIB}
+
+GESTURE_TAP = 0
+GESTURE_DRAG = 1
+GESTURE_MULTI = 2
+GESTURE_KEY = 3
+
+GESTURE_COLUMNS = ('kind', 'delay', 'duration', 'offset', 'count', 'device')
+POINT_COLUMNS = ('x', 'y', 't', 'contact')
+
+
+def _int32_column(values=()):
+    column = array('i', values)
+    if column.itemsize != 4:
+        raise RuntimeError("int32 array wird von dieser Plattform nicht unterstützt")
+    return column
+
+
+class RecordingInfo:
+    """Header-Daten einer Aufnahme - ohne Punkte zu laden"""
+
+    def __init__(self, meta, gesture_count, point_count, total_ms, tap_count, drag_count):
+        self.meta = meta
+        self.gesture_count = gesture_count
+        self.point_count = point_count
+        self.total_ms = total_ms
+        self.tap_count = tap_count
+        self.drag_count = drag_count
+
+    @property
+    def duration(self):
+        return self.total_ms / 1000.0
+
+
+def _end_ms(delays, durations):
+    """Ende der letzten Geste (bei überlappenden Gesten nicht die Summe)"""
+    t = end = 0
+    for delay_ms, duration_ms in zip(delays, durations):
+        t += delay_ms + duration_ms
+        end = max(end, t)
+    return end
+
+
+class Recording(RecordingInfo):
+    """Aufnahme als Spalten (array oder mmap-memoryview)"""
+
+    def __init__(self, meta, gestures, points, source=None, totals=None):
+        self.gestures = gestures  # dict: Spaltenname -> int32 Sequenz
+        self.points = points
+        self.source = source
+        self._mmap = None
+
+        kinds = gestures['kind']
+        if totals is None:
+            # (total_ms, tap_count) - aus dem Header wenn vorhanden
+            totals = (_end_ms(gestures['delay'], gestures['duration']),
+                      sum(1 for k in kinds if k == GESTURE_TAP))
+        total_ms, tap_count = totals
+        super().__init__(meta, len(kinds), len(points['x']), total_ms,
+                         tap_count, len(kinds) - tap_count)
+
+    def gesture(self, index):
+        """Liefere (kind, delay_ms, duration_ms, [[x, y, t], ...]) einer Geste
+
+        Bei Multi-Touch Gesten enthält points nur den primären Kontakt.
+        """
+        g = self.gestures
+        offset = g['offset'][index]
+        end = offset + g['count'][index]
+        xs, ys, ts, cs = self.points['x'], self.points['y'], self.points['t'], self.points['contact']
+        points = [[xs[i], ys[i], ts[i]] for i in range(offset, end) if cs[i] == 0]
+        return g['kind'][index], g['delay'][index], g['duration'][index], points
+
+    def contacts(self, index):
+        """Punktlisten aller Kontakte einer Geste: [[[x, y, t], ...], ...]"""
+        g = self.gestures
+        offset = g['offset'][index]
+        end = offset + g['count'][index]
+        xs, ys, ts, cs = self.points['x'], self.points['y'], self.points['t'], self.points['contact']
+        tracks = []
+        for i in range(offset, end):
+            while cs[i] >= len(tracks):
+                tracks.append([])
+            tracks[cs[i]].append([xs[i], ys[i], ts[i]])
+        return tracks
+
+    def __iter__(self):
+        for index in range(self.gesture_count):
+            yield self.gesture(index)
+
+    def scaled(self, speed):
+        """Neue Aufnahme mit allen Zeiten durch speed geteilt"""
+        if speed == 1.0:
+            return self
+        gestures = {name: _int32_column(self.gestures[name]) for name in GESTURE_COLUMNS}
+        gestures['delay'] = _int32_column(int(v / speed) for v in self.gestures['delay'])
+        gestures['duration'] = _int32_column(int(v / speed) for v in self.gestures['duration'])
+        points = {
+            'x': _int32_column(self.points['x']),
+            'y': _int32_column(self.points['y']),
+            't': _int32_column(int(v / speed) for v in self.points['t']),
+            'contact': _int32_column(self.points['contact']),
+        }
+        return Recording(dict(self.meta, playback_speed=speed), gestures, points, self.source)
+
+    def close(self):
+        """Gib die mmap frei (Spalten sind danach ungültig)"""
+        if self._mmap is not None:
+            for column in list(self.gestures.values()) + list(self.points.values()):
+                column.release()
+            self._mmap.close()
+            self._mmap = None
+
+
+class RecordingBuilder:
+    """Sammelt Gesten spaltenweise während der Aufnahme"""
+
+    def __init__(self, meta):
+        self.meta = meta
+        self.gestures = {name: _int32_column() for name in GESTURE_COLUMNS}
+        self.points = {name: _int32_column() for name in POINT_COLUMNS}
+
+    def _add(self, kind, delay_ms, duration_ms, tracks, device):
+        g = self.gestures
+        g['kind'].append(kind)
+        g['delay'].append(int(delay_ms))
+        g['duration'].append(max(0, int(duration_ms)))
+        g['offset'].append(len(self.points['x']))
+        g['count'].append(sum(len(points) for points in tracks))
+        g['device'].append(device)
+        for contact, points in enumerate(tracks):
+            for x, y, t in points:
+                self.points['x'].append(x)
+                self.points['y'].append(y)
+                self.points['t'].append(t)
+                self.points['contact'].append(contact)
+
+    def add_tap(self, delay_ms, x, y, duration_ms, device=0):
+        self._add(GESTURE_TAP, delay_ms, duration_ms, [[(x, y, 0)]], device)
+
+    def add_drag(self, delay_ms, points, device=0):
+        self._add(GESTURE_DRAG, delay_ms, points[-1][2] if points else 0, [points], device)
+
+    def add_multi(self, delay_ms, tracks, device=0):
+        """Multi-Touch Geste: ein Punkt-Track pro Kontakt, Zeiten relativ zum ersten Touch-Down"""
+        self._add(GESTURE_MULTI, delay_ms, max(points[-1][2] for points in tracks), tracks, device)
+
+    def add_key(self, delay_ms, code, duration_ms, device=0):
+        """Tastendruck (evdev Keycode) mit Haltedauer"""
+        self._add(GESTURE_KEY, delay_ms, duration_ms, [[(code, 0, 0)]], device)
+
+    def last_gesture(self):
+        """Liefere (kind, delay_ms, duration_ms, points) der zuletzt hinzugefügten Geste"""
+        g = self.gestures
+        offset = g['offset'][-1]
+        end = offset + g['count'][-1]
+        xs, ys, ts, cs = self.points['x'], self.points['y'], self.points['t'], self.points['contact']
+        points = [[xs[i], ys[i], ts[i]] for i in range(offset, end) if cs[i] == 0]
+        return g['kind'][-1], g['delay'][-1], g['duration'][-1], points
+
+    def build(self):
+        return Recording(self.meta, self.gestures, self.points)
+
+
+def write_trec(path, recording, packing='raw'):
+    """Schreibe eine Aufnahme als .trec - packing: raw (mmap-fähig), varint oder zlib (siehe TREC_PACKING)"""
+    flags = TREC_PACKING[packing]
+    meta = json.dumps(recording.meta).encode('utf-8')
+    meta += b' ' * (-len(meta) % 4)
+    version = TREC_VERSION if flags else 3  # ungepackt auch für ältere Player lesbar
+    header = TREC_HEADER.pack(TREC_MAGIC, version, flags, len(meta),
+                              recording.gesture_count, recording.point_count,
+                              recording.total_ms, recording.tap_count, recording.drag_count)
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(meta)
+        for name in GESTURE_COLUMNS:
+            f.write(_as_little_endian(recording.gestures[name]))
+        if flags:
+            f.write(pack_columns((recording.points[name] for name in POINT_COLUMNS), bool(flags & TREC_FLAG_ZLIB)))
+        else:
+            for name in POINT_COLUMNS:
+                f.write(_as_little_endian(recording.points[name]))
+    os.replace(tmp_path, path)
+
+
+def _as_little_endian(column):
+    column = _int32_column(column) if not isinstance(column, array) else column
+    if sys.byteorder != 'little':
+        column = array('i', column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _parse_header(data, path):
+    if len(data) < TREC_HEADER.size:
+        raise ValueError(f"{path}: Datei zu kurz für .trec Header")
+    magic, version, flags, meta_len, gestures, points, total_ms, taps, drags = TREC_HEADER.unpack_from(data)
+    if magic != TREC_MAGIC:
+        raise ValueError(f"{path}: Kein .trec Recording")
+    if version > TREC_VERSION:
+        raise ValueError(f"{path}: .trec Version {version} wird nicht unterstützt")
+    return meta_len, gestures, points, total_ms, taps, drags
+
+
+def read_trec_info(path):
+    """Lies nur Header und Metadaten einer .trec Datei (O(1))"""
+    with open(path, 'rb') as f:
+        head = f.read(TREC_HEADER.size)
+        meta_len, gestures, points, total_ms, taps, drags = _parse_header(head, path)
+        meta = json.loads(f.read(meta_len) or b'{}')
+    return RecordingInfo(meta, gestures, points, total_ms, taps, drags)
+
+
+def load_trec(path):
+    """Lade eine .trec Datei per mmap - Spalten sind Views ohne Kopie"""
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    meta_len, gesture_count, point_count, total_ms, tap_count, _ = _parse_header(mapped, path)
+    version, flags = TREC_HEADER.unpack_from(mapped)[1:3]
+    offset = TREC_HEADER.size
+    meta = json.loads(bytes(mapped[offset:offset + meta_len]) or b'{}')
+    offset += meta_len
+
+    view = memoryview(mapped)
+    swap = sys.byteorder != 'little'
+
+    def column(count):
+        nonlocal offset
+        chunk = view[offset:offset + count * 4]
+        offset += count * 4
+        if swap:
+            values = array('i', chunk.tobytes())
+            values.byteswap()
+            return memoryview(values)
+        return chunk.cast('i')
+
+    gestures = {name: column(gesture_count) for name in GESTURE_COLUMNS[:5]}
+    if version >= 3:
+        gestures['device'] = column(gesture_count)
+    else:
+        gestures['device'] = memoryview(_int32_column([0]) * gesture_count)
+    if version >= 4 and flags & TREC_FLAG_PACKED:
+        try:
+            packed = unpack_columns(view[offset:], POINT_COLUMNS, point_count, bool(flags & TREC_FLAG_ZLIB))
+        except ValueError as e:
+            raise ValueError(f"{path}: {e}")
+        points = {name: memoryview(column) for name, column in packed.items()}
+    else:
+        points = {name: column(point_count) for name in ('x', 'y', 't')}
+        if version >= 2:
+            points['contact'] = column(point_count)
+        else:
+            points['contact'] = memoryview(_int32_column([0]) * point_count)
+    view.release()
+
+    recording = Recording(meta, gestures, points, source=path, totals=(total_ms, tap_count))
+    recording._mmap = mapped
+    return recording
+
+
+def parse_script(path):
+    """Parse ein bestehendes Bash-Recording in eine Aufnahme (ein Durchlauf)"""
+    meta = {}
+    builder = RecordingBuilder(meta)
+    pending_delay = 0
+    header_vars = {
+        'RECORDED_MONITOR': ('monitor', str),
+        'RECORDED_WIDTH': ('width', int),
+        'RECORDED_HEIGHT': ('height', int),
+        'MONITOR_X': ('monitor_x', int),
+        'MONITOR_Y': ('monitor_y', int),
+    }
+
+    with open(path, 'r') as f:
+        for line in f:
+            if line.startswith('sleep_ms '):
+                try:
+                    pending_delay += int(line.split()[1])
+                except (IndexError, ValueError):
+                    pass
+            elif line.startswith('do_tap '):
+                parts = line.split()
+                try:
+                    duration = int(parts[3]) if len(parts) >= 4 else 50
+                    builder.add_tap(pending_delay, int(parts[1]), int(parts[2]), duration)
+                    pending_delay = 0
+                except (IndexError, ValueError):
+                    pass
+            elif line.startswith('do_timed_drag '):
+                try:
+                    points = json.loads(line[line.index("'") + 1:line.rindex("'")])
+                    builder.add_drag(pending_delay, points)
+                    pending_delay = 0
+                except ValueError:
+                    pass
+            elif line.startswith('do_fast_drag '):
+                try:
+                    values = [int(v) for v in line.split()[1:]]
+                    points = [values[i:i + 3] for i in range(0, len(values) - 2, 3)]
+                    builder.add_drag(pending_delay, points)
+                    pending_delay = 0
+                except ValueError:
+                    pass
+            elif line.startswith('do_key '):
+                parts = line.split()
+                try:
+                    builder.add_key(pending_delay, int(parts[3]), int(parts[2]))
+                    pending_delay = 0
+                except (IndexError, ValueError):
+                    pass
+            elif line.startswith('do_drag '):
+                # Legacy: 2ms zwischen Punkten
+                coords = [int(v) for v in line.split()[1:] if v.lstrip('-').isdigit()]
+                points = [[coords[i], coords[i + 1], (i // 2) * 2] for i in range(0, len(coords) - 1, 2)]
+                if len(points) >= 2:
+                    builder.add_drag(pending_delay, points)
+                    pending_delay = 0
+            elif '=' in line and not line.startswith(' '):
+                name, _, value = line.strip().partition('=')
+                if name in header_vars and name not in meta:
+                    key, cast = header_vars[name]
+                    try:
+                        meta[key] = cast(value.strip('"'))
+                    except ValueError:
+                        pass
+            elif line.startswith('# Device: '):
+                meta['device'] = line[len('# Device: '):].strip()
+            elif line.startswith('# Recording Time: '):
+                meta['recorded_at'] = line[len('# Recording Time: '):].strip()
+            elif line.startswith('# Touch Device Range: '):
+                match = re.match(r'(\d+)x(\d+)', line[len('# Touch Device Range: '):])
+                if match:
+                    meta['touch_max_x'], meta['touch_max_y'] = int(match.group(1)), int(match.group(2))
+
+    recording = builder.build()
+    recording.source = path
+    return recording
+
+
+def sibling_trec(path):
+    """Pfad der .trec Datei zu einem .sh Recording"""
+    return os.path.splitext(path)[0] + '.trec'
+
+
+def recording_file(path):
+    """Datei, aus der eine Aufnahme tatsächlich geladen wird (.trec bevorzugt)"""
+    if not path.endswith('.trec'):
+        trec_path = sibling_trec(path)
+        if os.path.exists(trec_path):
+            return trec_path
+    return path
+
+
+def load_recording(path):
+    """Lade eine Aufnahme - .trec bevorzugt, sonst Bash-Script parsen"""
+    path = recording_file(path)
+    if path.endswith('.trec'):
+        return load_trec(path)
+    return parse_script(path)
+
+
+def recording_info(path):
+    """Header-Infos einer Aufnahme - O(1) für .trec, ein Parse-Durchlauf für .sh"""
+    path = recording_file(path)
+    if path.endswith('.trec'):
+        return read_trec_info(path)
+    return parse_script(path)
+
+
+# ---------------------------------------------------------------------------
+# Bash-Export
+# ---------------------------------------------------------------------------
+
+def script_header(meta):
+    """Bash-Header mit Resolution Check und Replay-Funktionen"""
+    return f'''#!/bin/bash
+# Precision Touch Recording with Exact Timing
+# Device: {meta.get('device', '')}
+# Recording Time: {meta.get('recorded_at', '')}
+#
+# RECORDED CONFIGURATION:
+# Monitor: {meta.get('monitor', '')}
+# Resolution: {meta.get('width', 0)}x{meta.get('height', 0)}
+# Position: ({meta.get('monitor_x', 0)},{meta.get('monitor_y', 0)})
+# Touch Device Range: {meta.get('touch_max_x', 0)}x{meta.get('touch_max_y', 0)}
+
+# Recording parameters (DO NOT MODIFY)
+RECORDED_MONITOR="{meta.get('monitor', '')}"
+RECORDED_WIDTH={meta.get('width', 0)}
+RECORDED_HEIGHT={meta.get('height', 0)}
+MONITOR_X={meta.get('monitor_x', 0)}
+MONITOR_Y={meta.get('monitor_y', 0)}
+
+# Verify resolution matches recording
+# Headless (z.B. Xvfb): TOUCH_SKIP_VERIFY=1 überspringt den xrandr-Check, Screen liegt bei (0,0)
+# Ohne Terminal wird nicht nachgefragt: Abbruch bei geänderter Auflösung, außer TOUCH_ASSUME_YES=1
+verify_resolution() {{
+    if [ "$TOUCH_SKIP_VERIFY" = "1" ]; then
+        MONITOR_X=0
+        MONITOR_Y=0
+        echo "ℹ️  Monitor-Check übersprungen (TOUCH_SKIP_VERIFY=1), Position (0,0)"
+        return
+    fi
+
+    local current_output=$(xrandr | grep "^$RECORDED_MONITOR connected" | head -1)
+
+    if [ -z "$current_output" ]; then
+        echo "❌ FEHLER: Monitor '$RECORDED_MONITOR' nicht gefunden!"
+        echo "   Verfügbare Monitore:"
+        xrandr | grep " connected" | awk '{{print "   - " $1}}'
+        exit 1
+    fi
+
+    # Extract current resolution
+    local current_res=$(echo "$current_output" | grep -oP '\\d+x\\d+' | head -1)
+    local current_pos=$(echo "$current_output" | grep -oP '\\+\\d+\\+\\d+' | head -1)
+
+    if [ "$current_res" != "${{RECORDED_WIDTH}}x${{RECORDED_HEIGHT}}" ]; then
+        echo "⚠️  WARNUNG: Auflösung hat sich geändert!"
+        echo "   Aufnahme: ${{RECORDED_WIDTH}}x${{RECORDED_HEIGHT}}"
+        echo "   Aktuell:  $current_res"
+        echo ""
+        if [ "$TOUCH_ASSUME_YES" = "1" ]; then
+            REPLY=j
+        elif [ -t 0 ]; then
+            read -p "Trotzdem fortfahren? (j/n): " -n 1 -r
+            echo
+        else
+            echo "   Kein Terminal für die Rückfrage (TOUCH_ASSUME_YES=1 zum Fortfahren)"
+            REPLY=n
+        fi
+        if [[ ! $REPLY =~ ^[Jj]$ ]]; then
+            echo "Abbruch."
+            exit 1
+        fi
+    fi
+
+    # Check position if changed
+    local expected_pos="+${{MONITOR_X}}+${{MONITOR_Y}}"
+    if [ "$current_pos" != "$expected_pos" ]; then
+        echo "ℹ️  Monitor-Position hat sich geändert von $expected_pos zu $current_pos"
+        # Update position dynamically
+        MONITOR_X=$(echo "$current_pos" | cut -d+ -f2)
+        MONITOR_Y=$(echo "$current_pos" | cut -d+ -f3)
+    fi
+
+    echo "✅ Monitor-Konfiguration validiert:"
+    echo "   Monitor: $RECORDED_MONITOR"
+    echo "   Auflösung: ${{RECORDED_WIDTH}}x${{RECORDED_HEIGHT}}"
+    echo "   Position: (${{MONITOR_X}},${{MONITOR_Y}})"
+}}
+
+# High precision sleep function (ms → Sekunden per printf, kein bc)
+sleep_ms() {{
+    local ms=$1
+    if [ $ms -gt 0 ]; then
+        local s
+        printf -v s '%d.%03d' $((ms / 1000)) $((ms % 1000))
+        sleep $s
+    fi
+}}
+
+# Precise tap with timing
+do_tap() {{
+    local x=$(($1 + $MONITOR_X))
+    local y=$(($2 + $MONITOR_Y))
+    local duration=${{3:-50}}  # Default 50ms touch duration
+
+    echo "🔵 Tap at ($1,$2) → absolute ($x,$y)"
+    xdotool mousemove "$x" "$y"
+    xdotool mousedown 1
+    sleep_ms $duration
+    xdotool mouseup 1
+}}
+
+# Drag als eine xdotool-Befehlskette: do_fast_drag x y t [x y t ...] (t = ms seit Gestenstart)
+# Reines bash, ein Prozess pro Drag - kein Interpreter-Start vor dem ersten Punkt
+do_fast_drag() {{
+    if [ $# -lt 6 ]; then
+        echo "Error: Need at least 2 points for drag"
+        return 1
+    fi
+
+    local args=(mousemove $(($1 + MONITOR_X)) $(($2 + MONITOR_Y)) mousedown 1)
+    local last=$3 delay s
+    shift 3
+    while [ $# -ge 3 ]; do
+        delay=$(($3 - last))
+        if [ $delay -gt 0 ]; then
+            printf -v s '%d.%03d' $((delay / 1000)) $((delay % 1000))
+            args+=(sleep "$s")
+        fi
+        args+=(mousemove $(($1 + MONITOR_X)) $(($2 + MONITOR_Y)))
+        last=$3
+        shift 3
+    done
+    xdotool "${{args[@]}}" mouseup 1
+}}
+
+# Kompatibilität: JSON-Punkte [[x, y, t], ...] ohne Interpreter an do_fast_drag übergeben
+do_timed_drag() {{
+    local flat=${{1//[][,]/ }}
+    do_fast_drag $flat
+}}
+
+# Key press (X keysym) with hold time; 3rd argument is the evdev keycode
+do_key() {{
+    echo "⌨️  Key $1"
+    xdotool keydown "$1"
+    sleep_ms ${{2:-50}}
+    xdotool keyup "$1"
+}}
+
+# Simple drag for backwards compatibility
+do_drag() {{
+    local coords=("$@")
+    local num_points=${{#coords[@]}}
+
+    if [ $num_points -lt 4 ]; then
+        echo "Error: Need at least 2 points"
+        return
+    fi
+
+    # Mouse down at start
+    local x1=$((${{coords[0]}} + $MONITOR_X))
+    local y1=$((${{coords[1]}} + $MONITOR_Y))
+    xdotool mousemove "$x1" "$y1"
+    xdotool mousedown 1
+
+    # Move through points
+    for ((i=2; i<num_points; i+=2)); do
+        local x=$((${{coords[$i]}} + $MONITOR_X))
+        local y=$((${{coords[$i+1]}} + $MONITOR_Y))
+        xdotool mousemove "$x" "$y"
+        sleep 0.002  # 2ms zwischen Punkten
+    done
+
+    # Mouse up at end
+    xdotool mouseup 1
+}}
+
+# Run verification
+verify_resolution
+
+echo ""
+echo "🎬 STARTING REPLAY auf $RECORDED_MONITOR"
+echo "==========================================="
+start_replay=$(date +%s%N)
+
+# RECORDED EVENTS:
+'''
+
+
+def script_footer(touch_count, total_points, output_file):
+    """Bash-Footer mit Timing-Info"""
+    return f'''
+# Ende der Events
+end_replay=$(date +%s%N)
+duration=$(( (end_replay - start_replay) / 1000000 ))
+
+echo "==========================================="
+echo "✅ PRECISION REPLAY COMPLETED"
+echo "   Touches: {touch_count}"
+echo "   Total Points: {total_points}"
+echo "   Replay Duration: ${{duration}}ms"
+echo "   File: {output_file}"
+'''
+
+
+def gesture_lines(kind, delay_ms, duration_ms, points):
+    """Bash-Zeilen einer Geste (inkl. vorangehender Pause)"""
+    lines = []
+    if delay_ms > 0:
+        lines.append(f"sleep_ms {delay_ms}\n")
+    if kind == GESTURE_KEY:
+        code = points[0][0]
+        if code in KEY_SYMS:
+            lines.append(f"do_key {KEY_SYMS[code]} {duration_ms} {code}\n")
+        else:
+            lines.append(f"# key code {code} ({duration_ms}ms) - kein X-Keysym bekannt\n")
+        return lines
+    if kind == GESTURE_MULTI:
+        # xdotool kennt nur einen Zeiger - Script spielt den primären Kontakt
+        lines.append("# multi-touch gesture (nur primärer Kontakt per xdotool, .trec enthält alle)\n")
+    if kind == GESTURE_TAP or len(points) < 2:
+        lines.append(f"do_tap {points[0][0]} {points[0][1]} {duration_ms}\n")
+    else:
+        lines.append(f"do_fast_drag {' '.join(f'{x} {y} {t}' for x, y, t in points)}\n")
+    return lines
+
+
+def measure_script_overhead(samples=10, display=None):
+    """Kosten pro xdotool-Aufruf und pro sleep_ms-Pause im Script (ms), in bash selbst gemessen
+
+    xdotool getmouselocation hat denselben Prozessstart und X-Roundtrip wie
+    mousemove, bewegt aber nichts. Braucht bash >= 5 ($EPOCHREALTIME).
+    """
+    if not shutil.which('xdotool'):
+        raise OSError("xdotool nicht gefunden")
+    script = (f'a=$EPOCHREALTIME; for ((i=0; i<{samples}; i++)); do xdotool getmouselocation >/dev/null 2>&1; done; '
+              f'b=$EPOCHREALTIME; for ((i=0; i<{samples}; i++)); do sleep 0; done; c=$EPOCHREALTIME; '
+              'echo "$a $b $c"')
+    env = dict(os.environ, LC_ALL='C')
+    if display:
+        env['DISPLAY'] = display
+    output = subprocess.run(['bash', '-c', script], env=env, capture_output=True, text=True).stdout.split()
+    try:
+        a, b, c = (float(value) for value in output)
+    except ValueError:
+        raise OSError("bash ohne $EPOCHREALTIME (bash >= 5 nötig)") from None
+    return {'command_ms': round((b - a) * 1000.0 / samples, 3), 'sleep_ms': round((c - b) * 1000.0 / samples, 3)}
+
+
+def gesture_overhead(kind, points, overhead):
+    """Script-Kosten einer Geste in ms: (vor dem Effekt, in der Haltezeit)"""
+    command = overhead['command_ms']
+    if kind == GESTURE_KEY:
+        if points[0][0] not in KEY_SYMS:
+            return 0.0, 0.0
+        return command, overhead['sleep_ms'] + command  # keydown | sleep_ms + keyup
+    if kind == GESTURE_TAP or len(points) < 2:
+        return 2 * command, overhead['sleep_ms'] + command  # mousemove + mousedown | sleep_ms + mouseup
+    return command, 0.0  # eine xdotool-Kette, Pausen darin laufen ohne Prozessstart
+
+
+def compensate_overhead(recording, overhead):
+    """Pausen und Haltezeiten um die Script-Kosten kürzen; was nicht abgezogen werden kann, trägt die nächste Pause
+
+    Liefert (Gesten, geschätzte Dauer in ms, Soll-Dauer in ms).
+    """
+    sleep = overhead['sleep_ms']
+    gestures = []
+    behind = 0.0  # ms hinter dem Soll
+    wall = 0.0
+    target = 0.0
+    for kind, delay_ms, duration_ms, points in recording:
+        pre, hold = gesture_overhead(kind, points, overhead)
+        target += delay_ms + duration_ms
+        pause = delay_ms - behind - pre - sleep
+        delay = int(pause) if pause >= 1 else 0  # sleep_ms 0 startet keinen Prozess
+        actual = delay + sleep + pre if delay else pre
+        duration = duration_ms
+        if hold:
+            duration = max(0, int(duration_ms - hold))
+            actual += duration + hold
+        else:
+            actual += duration_ms
+        behind += actual - delay_ms - duration_ms
+        wall += actual
+        gestures.append((kind, delay, duration, points))
+    return gestures, wall, target
+
+
+def script_speed_estimate(recording, speed, overhead):
+    """Geschwindigkeit, die ein (kompensiertes) Script bei den gemessenen Kosten erreicht"""
+    _, wall, target = compensate_overhead(recording.scaled(speed), overhead)
+    return speed * target / wall if wall > 0 else speed
+
+
+def export_script(recording, path, speed=1.0, overhead=None):
+    """Exportiere eine Aufnahme als eigenständiges Bash-Script
+
+    overhead ({'command_ms', 'sleep_ms'}, siehe measure_script_overhead) kürzt
+    Pausen und Haltezeiten um die Kosten der Script-Aufrufe.
+    """
+    if speed != 1.0:
+        recording = recording.scaled(speed)
+
+    header = script_header(recording.meta)
+    if speed != 1.0:
+        header = header.replace("# RECORDED EVENTS:", f"\n# PLAYBACK SPEED: {speed}x\n# RECORDED EVENTS:")
+    gestures = recording
+    if overhead:
+        gestures, _, _ = compensate_overhead(recording, overhead)
+        header = header.replace("# RECORDED EVENTS:", f"# OVERHEAD-KOMPENSATION: {overhead['command_ms']}ms pro "
+                                f"xdotool, {overhead['sleep_ms']}ms pro sleep\n# RECORDED EVENTS:")
+
+    with open(path, 'w') as f:
+        f.write(header)
+        for kind, delay_ms, duration_ms, points in gestures:
+            f.writelines(gesture_lines(kind, delay_ms, duration_ms, points))
+        f.write(script_footer(recording.gesture_count, recording.point_count, path))
+    os.chmod(path, 0o755)
+    return path
@@ -0,0 +1,379 @@
+"""
+Touch Geometry - Pfad-Vereinfachung und Replay-Resampling für Gesten-Punkte [x, y, t_ms]
+"""
+
+import heapq
+import math
+from array import array
+
+# Raster-Speeds pro Verdopplung: for_speed rundet auf 2^(k/4), damit Random/Chaos
+# nicht pro Speed eine eigene Plan-Variante kompilieren
+SPEED_STEPS_PER_OCTAVE = 4
+
+# Füllstand nach dem Nachvereinfachen langer Gesten (Anteil von max_points) -
+# etwas Luft, damit nicht jeder neue Punkt gleich die nächste Runde auslöst
+COMPACT_FILL = 0.9
+
+
+def _segment_error(anchor, end, point):
+    """(Raum-Fehler px, Zeit-Fehler ms) eines Punktes gegenüber dem Segment anchor → end
+
+    Der Raum-Fehler ist die synchrone euklidische Distanz: Abstand zur Position,
+    die das Segment zum Zeitpunkt des Punktes erreicht (linear in der Zeit).
+    Der Zeit-Fehler vergleicht den Zeitstempel mit der Zeit, zu der das Segment
+    die Projektion des Punktes erreicht.
+    """
+    ax, ay, at = anchor
+    dx = end[0] - ax
+    dy = end[1] - ay
+    dt = end[2] - at
+    px, py, pt = point
+
+    length_sq = dx * dx + dy * dy
+    if dt > 0:
+        r = (pt - at) / dt
+        ix = ax + r * dx
+        iy = ay + r * dy
+        space_error = ((px - ix) ** 2 + (py - iy) ** 2) ** 0.5
+    elif length_sq > 0:
+        space_error = abs((px - ax) * dy - (py - ay) * dx) / length_sq ** 0.5
+    else:
+        space_error = ((px - ax) ** 2 + (py - ay) ** 2) ** 0.5
+
+    if length_sq > 0:
+        u = ((px - ax) * dx + (py - ay) * dy) / length_sq
+        u = min(1.0, max(0.0, u))
+        time_error = abs(pt - (at + u * dt))
+    else:
+        time_error = 0.0
+    return space_error, time_error
+
+
+class StreamingSimplifier:
+    """Online-Vereinfachung (Opening Window, zeitbewusst) mit begrenzter Ausgabe
+
+    Punkte werden beim Eintreffen geprüft: solange alle Punkte seit dem letzten
+    behaltenen Punkt innerhalb der Toleranz um das Segment bis zum neuen Punkt
+    liegen, wird nichts gespeichert. Übersteigt die Ausgabe max_points, werden
+    behaltene Punkte entfernt, bis COMPACT_FILL * max_points übrig sind - immer
+    der, dessen Wegfall gegen die Rohpunkte gemessen den kleinsten Fehler ergibt.
+    tolerance_px/tolerance_ms wachsen dabei nur auf den größten so entstandenen
+    Fehler und bleiben eine Schranke für die ganze Ausgabe; widened zeigt, dass
+    sie nicht mehr die Vorgaben sind. Dafür werden die Rohpunkte kompakt
+    mitgeführt (3 doubles pro Punkt), bei max_points=inf nicht.
+    """
+
+    def __init__(self, tolerance_px=1.5, tolerance_ms=10, max_points=500, max_window=64):
+        self.tolerance_px = tolerance_px
+        self.tolerance_ms = tolerance_ms
+        self.max_points = max_points
+        self.max_window = max_window
+        self.kept = []
+        self.window = []
+        self.raw_count = 0
+        self.widened = False
+        self.raw = None if max_points == float('inf') else (array('d'), array('d'), array('d'))
+        self.raw_index = []  # Position von kept[i] in den Rohpunkten
+        self.removal_error = []  # (px, ms) ohne kept[i] gegen die Rohpunkte, None = noch unbekannt
+
+    def add(self, point):
+        """Neuen Punkt [x, y, t_ms] verarbeiten"""
+        self.raw_count += 1
+        if self.raw:
+            xs, ys, ts = self.raw
+            xs.append(point[0])
+            ys.append(point[1])
+            ts.append(point[2])
+        if not self.kept:
+            self.kept.append(point)
+            self.raw_index.append(0)
+            self.removal_error.append(None)
+            return
+
+        if self.window and (len(self.window) >= self.max_window or not self._fits(point)):
+            self._keep(self.window[-1], self.raw_count - 2)
+        self.window.append(point)
+
+    def _fits(self, point):
+        anchor = self.kept[-1]
+        for q in self.window:
+            space_error, time_error = _segment_error(anchor, point, q)
+            if space_error > self.tolerance_px or time_error > self.tolerance_ms:
+                return False
+        return True
+
+    def _keep(self, point, index):
+        self.kept.append(point)
+        self.raw_index.append(index)
+        self.removal_error.append(None)
+        self.window = []
+        if len(self.kept) > self.max_points:
+            self._compact()
+
+    def _span_error(self, a, b):
+        """Größter (Raum-Fehler px, Zeit-Fehler ms) der Rohpunkte zwischen kept[a] und kept[b]"""
+        xs, ys, ts = self.raw
+        anchor, end = self.kept[a], self.kept[b]
+        worst_space = worst_time = 0.0
+        for i in range(self.raw_index[a] + 1, self.raw_index[b]):
+            space_error, time_error = _segment_error(anchor, end, (xs[i], ys[i], ts[i]))
+            if space_error > worst_space:
+                worst_space = space_error
+            if time_error > worst_time:
+                worst_time = time_error
+        return worst_space, worst_time
+
+    def _compact(self):
+        """Behaltene Punkte mit dem kleinsten Fehler (gegen die Rohpunkte) entfernen
+
+        Raum- und Zeit-Fehler zählen relativ zur jeweiligen Toleranz, beide wachsen
+        also im gleichen Verhältnis. Die Fehler je Punkt bleiben bis zur nächsten
+        Runde gültig, solange sich seine Nachbarn nicht ändern - neu berechnet
+        werden nur neue Punkte und die Nachbarn entfernter.
+        """
+        kept = self.kept
+        errors = self.removal_error
+        count = len(kept)
+        last = count - 1
+        target = max(2, int(self.max_points * COMPACT_FILL))
+        previous = list(range(-1, last))
+        following = list(range(1, count + 1))
+        removed = [False] * count
+        scale_px, scale_ms = self.tolerance_px or 1.0, self.tolerance_ms or 1.0
+
+        def cost(i):
+            space_error, time_error = errors[i]
+            return (max(space_error / scale_px, time_error / scale_ms), space_error, time_error, i)
+
+        for i in range(1, last):
+            if errors[i] is None:
+                errors[i] = self._span_error(i - 1, i + 1)
+        heap = [cost(i) for i in range(1, last)]
+        heapq.heapify(heap)
+        worst_space, worst_time = self.tolerance_px, self.tolerance_ms
+        while count > target and heap:
+            _, space_error, time_error, i = heapq.heappop(heap)
+            if removed[i] or errors[i] != (space_error, time_error):
+                continue  # veraltet: Nachbar inzwischen entfernt
+            removed[i] = True
+            count -= 1
+            worst_space = max(worst_space, space_error)
+            worst_time = max(worst_time, time_error)
+            before, after = previous[i], following[i]
+            following[before] = after
+            previous[after] = before
+            for j in (before, after):
+                if 0 < j < last:
+                    errors[j] = self._span_error(previous[j], following[j])
+                    heapq.heappush(heap, cost(j))
+
+        self.kept = [point for point, gone in zip(kept, removed) if not gone]
+        self.raw_index = [index for index, gone in zip(self.raw_index, removed) if not gone]
+        self.removal_error = [error for error, gone in zip(errors, removed) if not gone]
+        self.tolerance_px, self.tolerance_ms = worst_space, worst_time
+        self.widened = True
+
+    def finish(self):
+        """Letzten Punkt übernehmen und vereinfachte Punkte liefern"""
+        if self.window:
+            last = self.window[-1]
+            self.window = []
+            self.kept.append(last)
+            self.raw_index.append(self.raw_count - 1)
+            self.removal_error.append(None)
+            if len(self.kept) > self.max_points:
+                self._compact()
+        return self.kept
+
+    def max_error(self):
+        """Tatsächliche größte Abweichung (px, ms) der Ausgabe von den Rohpunkten (nach finish)"""
+        worst_space = worst_time = 0.0
+        for a in range(len(self.kept) - 1):
+            space_error, time_error = self._span_error(a, a + 1)
+            worst_space = max(worst_space, space_error)
+            worst_time = max(worst_time, time_error)
+        return worst_space, worst_time
+
+    @property
+    def last(self):
+        """Zuletzt eingegangener Punkt"""
+        if self.window:
+            return self.window[-1]
+        return self.kept[-1] if self.kept else None
+
+
+def simplify(points, tolerance_px=1.5, tolerance_ms=10, max_window=64):
+    """Vereinfache eine komplette Punktliste (erster und letzter Punkt bleiben erhalten)"""
+    simplifier = StreamingSimplifier(tolerance_px, tolerance_ms, max_points=float('inf'),
+                                     max_window=max_window)
+    for point in points:
+        simplifier.add(point)
+    return simplifier.finish()
+
+
+def _refine(anchor, inner, end, tolerance_px):
+    """Punkte aus inner, ohne die der Pfad anchor → end mehr als tolerance_px abweicht (Douglas-Peucker, synchron)"""
+    worst = tolerance_px
+    index = -1
+    for i, point in enumerate(inner):
+        space_error = _segment_error(anchor, end, point)[0]
+        if space_error > worst:
+            worst, index = space_error, i
+    if index < 0:
+        return []
+    point = inner[index]
+    return (_refine(anchor, inner[:index], point, tolerance_px) + [point]
+            + _refine(point, inner[index + 1:], end, tolerance_px))
+
+
+def _position_at(points, index, t):
+    """Position zum Zeitpunkt t auf dem Segment points[index - 1] → points[index] (linear in der Zeit)"""
+    x1, y1, t1 = points[index - 1]
+    x2, y2, t2 = points[index]
+    r = (t - t1) / (t2 - t1) if t2 > t1 else 1.0
+    return [round(x1 + r * (x2 - x1)), round(y1 + r * (y2 - y1)), t]
+
+
+def quantize_speed(speed):
+    """Speed auf die nächste Stufe 2^(k/SPEED_STEPS_PER_OCTAVE) runden (höchstens ~9% daneben)"""
+    return 2.0 ** (round(math.log2(speed) * SPEED_STEPS_PER_OCTAVE) / SPEED_STEPS_PER_OCTAVE)
+
+
+class Resampler:
+    """Basis: Drag-Punkte vor dem Replay ausdünnen bzw. auf ein Raster legen
+
+    Erster und letzter Punkt bleiben erhalten. Weggelassene Punkte liegen höchstens
+    tolerance_px (plus Rundung auf ganze Pixel) neben dem Pfad, den die Engine
+    zwischen den verbleibenden Punkten abfährt.
+    """
+
+    def __call__(self, points):
+        raise NotImplementedError
+
+    def spec(self):
+        """Kurzform wie bei parse_resample (auch Cache-Key)"""
+        raise NotImplementedError
+
+    def for_speed(self, speed):
+        """Gleiches Raster in Playback-Zeit bei konstanter Speed (auf quantize_speed gerundet)"""
+        return self
+
+
+class WindowCoalescer(Resampler):
+    """Aufeinanderfolgende Moves innerhalb von window_ms zu einem zusammenfassen"""
+
+    def __init__(self, window_ms, tolerance_px=1.0):
+        self.window_ms = window_ms
+        self.tolerance_px = tolerance_px
+
+    def __call__(self, points):
+        if len(points) <= 2:
+            return points
+        result = [points[0]]
+        pending = []
+        for point in points[1:-1]:
+            if point[2] - result[-1][2] < self.window_ms:
+                pending.append(point)
+                continue
+            result.extend(_refine(result[-1], pending, point, self.tolerance_px))
+            result.append(point)
+            pending = []
+        result.extend(_refine(result[-1], pending, points[-1], self.tolerance_px))
+        result.append(points[-1])
+        return result
+
+    def spec(self):
+        return f"window:{self.window_ms:g}:{self.tolerance_px:g}"
+
+    def for_speed(self, speed):
+        speed = quantize_speed(speed)
+        return self if speed == 1.0 else WindowCoalescer(self.window_ms * speed, self.tolerance_px)
+
+    def describe(self):
+        return f"Fenster {self.window_ms:g}ms, ±{self.tolerance_px:g}px"
+
+
+class FrameResampler(Resampler):
+    """Punkte auf ein Frame-Raster mit rate_hz bündeln (Zeit ab Gesten-Start)
+
+    Pro Frame bleibt nur der letzte Punkt - die Position, die die App beim
+    nächsten Frame abtastet. Mit upsample=True bekommen auch Frames zwischen weit
+    auseinanderliegenden Punkten einen interpolierten Move (gleichmäßige Drags
+    bei spärlichen Aufnahmen).
+    """
+
+    def __init__(self, rate_hz, tolerance_px=1.0, upsample=False):
+        self.rate_hz = rate_hz
+        self.tolerance_px = tolerance_px
+        self.upsample = upsample
+        self.frame_ms = 1000.0 / rate_hz
+
+    def __call__(self, points):
+        if len(points) < 2:
+            return points
+        frame_ms = self.frame_ms
+        last = points[-1]
+        start = points[0][2]
+        result = [points[0]]
+        inner = []  # Weggelassene Punkte seit dem letzten Ergebnis-Punkt
+        index = 1
+        frame = 1
+        while True:
+            tick = round(start + frame * frame_ms)
+            if tick >= last[2]:
+                break
+            frame += 1
+            if index < len(points) - 1 and points[index][2] <= tick:
+                while index < len(points) - 2 and points[index + 1][2] <= tick:
+                    inner.append(points[index])
+                    index += 1
+                sample = points[index]
+                index += 1
+            elif self.upsample and tick > result[-1][2]:
+                sample = _position_at(points, index, tick)
+            else:
+                continue
+            if sample[:2] == result[-1][:2]:
+                inner.append(sample)  # keine Moves ohne Bewegung
+                continue
+            result.extend(_refine(result[-1], inner, sample, self.tolerance_px))
+            result.append(sample)
+            inner = []
+        inner.extend(points[index:-1])
+        result.extend(_refine(result[-1], inner, last, self.tolerance_px))
+        result.append(last)
+        return result
+
+    def spec(self):
+        return f"frame:{self.rate_hz:g}:{self.tolerance_px:g}" + (":up" if self.upsample else "")
+
+    def for_speed(self, speed):
+        speed = quantize_speed(speed)
+        return self if speed == 1.0 else FrameResampler(self.rate_hz / speed, self.tolerance_px, self.upsample)
+
+    def describe(self):
+        return f"{self.rate_hz:g} Hz Raster, ±{self.tolerance_px:g}px" + (", mit Upsampling" if self.upsample else "")
+
+
+def parse_resample(text):
+    """Resampler aus Kurzform: window:MS[:PX] oder frame:HZ[:PX][:up] (PX = Toleranz, Standard 1px)"""
+    kind, _, args = text.strip().lower().partition(':')
+    values = [value for value in args.split(':') if value] if args else []
+    try:
+        if kind == 'window' and 1 <= len(values) <= 2:
+            window_ms = float(values[0])
+            tolerance = float(values[1]) if len(values) > 1 else 1.0
+            if window_ms > 0 and tolerance >= 0:
+                return WindowCoalescer(window_ms, tolerance)
+        elif kind == 'frame' and values:
+            upsample = values[-1] == 'up'
+            if upsample:
+                values = values[:-1]
+            if 1 <= len(values) <= 2:
+                rate_hz = float(values[0])
+                tolerance = float(values[1]) if len(values) > 1 else 1.0
+                if rate_hz > 0 and tolerance >= 0:
+                    return FrameResampler(rate_hz, tolerance, upsample)
+    except ValueError:
+        pass
+    raise ValueError(f"Ungültiges Resampling: '{text}' (window:MS[:PX] oder frame:HZ[:PX][:up])")
@@ -0,0 +1,828 @@
+"""
+Touch Replay Engine - Spielt Aufnahmen direkt über eine persistente Injection-Verbindung ab
+"""
+
+import os
+import time
+import shutil
+import struct
+import hashlib
+import ctypes
+import ctypes.util
+import fcntl
+import subprocess
+from array import array
+from collections import OrderedDict
+
+from touch_format import GESTURE_TAP, GESTURE_MULTI, GESTURE_KEY, load_recording, recording_file
+from touch_evdev import (KEY_SYMS, EVENT_FORMAT, EV_SYN, EV_KEY, EV_ABS, SYN_REPORT, BTN_TOUCH, ABS_X, ABS_Y,
+                         ABS_MT_SLOT, ABS_MT_TRACKING_ID, ABS_MT_POSITION_X, ABS_MT_POSITION_Y)
+from touch_stats import percentile, summarize_lateness, worst_gestures
+from touch_speed import SpeedCurve, TimeWarp
+
+# Aktionen im Replay-Plan
+OP_MOVE = 0
+OP_DOWN = 1
+OP_UP = 2
+OP_KEY_DOWN = 3  # x = evdev Keycode
+OP_KEY_UP = 4
+OP_NAMES = ('move', 'down', 'up', 'key_down', 'key_up')
+
+PLAN_MAGIC = b'TPLN'
+PLAN_VERSION = 2
+PLAN_HEADER = struct.Struct('<4sHHI')
+PLAN_COLUMNS = ('t', 'op', 'x', 'y', 'gesture', 'slot')
+
+
+class ReplayPlan:
+    """Flacher Event-Plan als Spalten: t_ms (Aufnahmezeit), op, x, y, Gesten-Index, Kontakt-Slot"""
+
+    def __init__(self, columns=None):
+        columns = columns or {}
+        self.t = columns.get('t', array('i'))
+        self.op = columns.get('op', array('i'))
+        self.x = columns.get('x', array('i'))
+        self.y = columns.get('y', array('i'))
+        self.gesture = columns.get('gesture', array('i'))
+        self.slot = columns.get('slot', array('i'))
+
+    def __len__(self):
+        return len(self.t)
+
+    def append(self, t_ms, op, x, y, gesture, slot=0):
+        self.t.append(t_ms)
+        self.op.append(op)
+        self.x.append(x)
+        self.y.append(y)
+        self.gesture.append(gesture)
+        self.slot.append(slot)
+
+    @property
+    def multitouch(self):
+        """True wenn der Plan mehr als einen gleichzeitigen Kontakt enthält"""
+        return any(self.slot)
+
+    def sorted(self):
+        """Plan stabil nach t sortiert (überlappende Gesten mehrerer Devices)"""
+        t = self.t
+        if all(t[i] <= t[i + 1] for i in range(len(t) - 1)):
+            return self
+        order = sorted(range(len(t)), key=t.__getitem__)
+        return ReplayPlan({name: array('i', (column[i] for i in order))
+                           for name, column in self.columns().items()})
+
+    @property
+    def duration_ms(self):
+        return self.t[-1] if self.t else 0
+
+    def columns(self):
+        return {name: getattr(self, name) for name in PLAN_COLUMNS}
+
+
+def compile_plan(recording, resampler=None):
+    """Übersetze eine Aufnahme einmal in einen Event-Plan (Zeiten ab Replay-Start, ohne Monitor-Offset)
+
+    resampler (touch_geometry.Resampler) dünnt die Punkte jedes Drags bzw.
+    Kontakts vor dem Übersetzen aus oder legt sie auf ein Frame-Raster.
+    """
+    plan = ReplayPlan()
+    t = 0
+    for index, (kind, delay_ms, duration_ms, points) in enumerate(recording):
+        t += delay_ms
+        if kind == GESTURE_MULTI:
+            tracks = recording.contacts(index)
+            if resampler:
+                tracks = [resampler(points) for points in tracks]
+            _append_contacts(plan, t, index, tracks)
+            t += duration_ms
+            continue
+        if kind == GESTURE_KEY:
+            code = points[0][0]
+            plan.append(t, OP_KEY_DOWN, code, 0, index)
+            plan.append(t + duration_ms, OP_KEY_UP, code, 0, index)
+            t += duration_ms
+            continue
+
+        x0, y0 = points[0][0], points[0][1]
+        plan.append(t, OP_MOVE, x0, y0, index)
+        plan.append(t, OP_DOWN, x0, y0, index)
+
+        if kind == GESTURE_TAP:
+            plan.append(t + duration_ms, OP_UP, x0, y0, index)
+        else:
+            if resampler:
+                points = resampler(points)
+            x, y = x0, y0
+            for x, y, pt in points[1:]:
+                plan.append(t + pt, OP_MOVE, x, y, index)
+            plan.append(t + duration_ms, OP_UP, x, y, index)
+        t += duration_ms
+    # Negative Pausen (überlappende Devices) - Events in Zeitreihenfolge bringen
+    return plan.sorted()
+
+
+def _append_contacts(plan, t, index, tracks):
+    """Alle Kontakte einer Multi-Touch Geste zeitlich gemischt anhängen (Slot = Kontakt-Nummer)"""
+    events = []
+    for slot, points in enumerate(tracks):
+        x0, y0, t0 = points[0]
+        events.append((t + t0, OP_MOVE, x0, y0, slot))
+        events.append((t + t0, OP_DOWN, x0, y0, slot))
+        x, y, pt = x0, y0, t0
+        for x, y, pt in points[1:]:
+            events.append((t + pt, OP_MOVE, x, y, slot))
+        events.append((t + pt, OP_UP, x, y, slot))
+    events.sort(key=lambda event: event[0])  # stabil: Reihenfolge pro Kontakt bleibt erhalten
+    for t_ms, op, x, y, slot in events:
+        plan.append(t_ms, op, x, y, index, slot)
+
+
+def default_cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'touch-player', 'plans')
+
+
+class PlanCache:
+    """Kompilierte Pläne im Speicher und auf Disk (LRU, Größenlimit), Key: Pfad + mtime + Inhalts-Hash + Resampling"""
+
+    def __init__(self, cache_dir=None, max_bytes=64 * 1024 * 1024, memory_entries=8):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self.memory = OrderedDict()  # (path, mtime_ns, size, resampling) -> ReplayPlan
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, path, variant=''):
+        """Disk-Key aus absolutem Pfad, mtime, SHA-256 des Inhalts und Plan-Variante (Resampling)"""
+        stat = os.stat(path)
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        ident = f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{digest.hexdigest()}"
+        if variant:
+            ident += f"|{variant}"
+        return hashlib.sha256(ident.encode()).hexdigest()
+
+    def get(self, recording_path, resampler=None):
+        """Plan eines Recordings - aus dem Speicher, von Disk oder frisch kompiliert"""
+        path = recording_file(recording_path)
+        stat = os.stat(path)
+        variant = resampler.spec() if resampler else ''
+        memory_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, variant)
+
+        plan = self.memory.get(memory_key)
+        if plan is not None:
+            self.memory.move_to_end(memory_key)
+            self.hits += 1
+            return plan
+
+        disk_key = self.key(path, variant)
+        plan_file = os.path.join(self.cache_dir, disk_key + '.plan')
+        plan = self._load(plan_file)
+        if plan is not None:
+            self.hits += 1
+            os.utime(plan_file)  # LRU: zuletzt benutzt
+        else:
+            self.misses += 1
+            recording = load_recording(path)
+            try:
+                plan = compile_plan(recording, resampler)
+            finally:
+                recording.close()
+            self._store(plan_file, plan)
+
+        self.memory[memory_key] = plan
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+        return plan
+
+    def _load(self, plan_file):
+        try:
+            with open(plan_file, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            magic, version, _, count = PLAN_HEADER.unpack_from(data)
+            if magic != PLAN_MAGIC or version != PLAN_VERSION:
+                return None
+            columns = {}
+            offset = PLAN_HEADER.size
+            for name in PLAN_COLUMNS:
+                column = array('i')
+                column.frombytes(data[offset:offset + count * column.itemsize])
+                offset += count * column.itemsize
+                if len(column) != count:
+                    return None
+                columns[name] = column
+            return ReplayPlan(columns)
+        except struct.error:
+            return None
+
+    def _store(self, plan_file, plan):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_file = plan_file + '.tmp'
+            with open(tmp_file, 'wb') as f:
+                f.write(PLAN_HEADER.pack(PLAN_MAGIC, PLAN_VERSION, 0, len(plan)))
+                for column in plan.columns().values():
+                    f.write(column.tobytes())
+            os.replace(tmp_file, plan_file)
+            self._evict()
+        except OSError:
+            pass  # Cache ist optional
+
+    def _evict(self):
+        """Älteste Pläne löschen bis das Größenlimit eingehalten ist"""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.plan'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+
+class XTestBackend:
+    """Eine persistente X-Verbindung, Events per XTest Extension (libXtst via ctypes)"""
+
+    name = "xtest"
+    multitouch = False
+    keyboard = True
+
+    def __init__(self, display=None):
+        x11_path = ctypes.util.find_library('X11') or 'libX11.so.6'
+        xtst_path = ctypes.util.find_library('Xtst') or 'libXtst.so.6'
+        self.x11 = ctypes.cdll.LoadLibrary(x11_path)
+        self.xtst = ctypes.cdll.LoadLibrary(xtst_path)
+
+        self.x11.XOpenDisplay.restype = ctypes.c_void_p
+        self.x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        self.x11.XFlush.argtypes = [ctypes.c_void_p]
+        self.x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        self.xtst.XTestQueryExtension.argtypes = [ctypes.c_void_p] + [ctypes.POINTER(ctypes.c_int)] * 4
+        self.xtst.XTestFakeMotionEvent.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int,
+                                                   ctypes.c_int, ctypes.c_ulong]
+        self.xtst.XTestFakeButtonEvent.argtypes = [ctypes.c_void_p, ctypes.c_uint, ctypes.c_int,
+                                                   ctypes.c_ulong]
+        self.xtst.XTestFakeKeyEvent.argtypes = [ctypes.c_void_p, ctypes.c_uint, ctypes.c_int,
+                                                ctypes.c_ulong]
+
+        self.display = display or os.environ.get('DISPLAY')
+        self.dpy = self.x11.XOpenDisplay(self.display.encode() if self.display else None)
+        if not self.dpy:
+            raise OSError(f"X Display '{self.display}' nicht erreichbar")
+
+        dummy = [ctypes.c_int() for _ in range(4)]
+        if not self.xtst.XTestQueryExtension(self.dpy, *[ctypes.byref(d) for d in dummy]):
+            self.close()
+            raise OSError("XTest Extension nicht verfügbar")
+
+    def move(self, x, y):
+        self.xtst.XTestFakeMotionEvent(self.dpy, -1, x, y, 0)
+        self.x11.XFlush(self.dpy)
+
+    def press(self, button=1):
+        self.xtst.XTestFakeButtonEvent(self.dpy, button, 1, 0)
+        self.x11.XFlush(self.dpy)
+
+    def release(self, button=1):
+        self.xtst.XTestFakeButtonEvent(self.dpy, button, 0, 0)
+        self.x11.XFlush(self.dpy)
+
+    def key(self, code, pressed):
+        # X Keycode = evdev Keycode + 8 (evdev/libinput Keymap)
+        self.xtst.XTestFakeKeyEvent(self.dpy, code + 8, 1 if pressed else 0, 0)
+        self.x11.XFlush(self.dpy)
+
+    def close(self):
+        if self.dpy:
+            self.x11.XCloseDisplay(self.dpy)
+            self.dpy = None
+
+
+class XdotoolBackend:
+    """Fallback ohne libXtst: ein xdotool-Aufruf pro Event (kein bash/bc/python3 dazwischen)"""
+
+    name = "xdotool"
+    multitouch = False
+    keyboard = True
+
+    def __init__(self, display=None):
+        if not shutil.which('xdotool'):
+            raise OSError("xdotool nicht gefunden")
+        self.env = dict(os.environ, DISPLAY=display) if display else None
+
+    def _run(self, *args):
+        subprocess.run(['xdotool', *args], env=self.env, check=False)
+
+    def move(self, x, y):
+        self._run('mousemove', str(x), str(y))
+
+    def press(self, button=1):
+        self._run('mousedown', str(button))
+
+    def release(self, button=1):
+        self._run('mouseup', str(button))
+
+    def key(self, code, pressed):
+        if code in KEY_SYMS:
+            self._run('keydown' if pressed else 'keyup', KEY_SYMS[code])
+
+    def close(self):
+        pass
+
+
+# uinput ioctls (linux/uinput.h)
+UI_SET_EVBIT = 0x40045564
+UI_SET_KEYBIT = 0x40045565
+UI_SET_ABSBIT = 0x40045567
+UI_SET_PROPBIT = 0x4004556e
+UI_DEV_CREATE = 0x5501
+UI_DEV_DESTROY = 0x5502
+INPUT_PROP_DIRECT = 0x01
+ABS_CNT = 0x40
+BUS_VIRTUAL = 0x06
+# struct uinput_user_dev: name[80], input_id, ff_effects_max, absmax/absmin/absfuzz/absflat[ABS_CNT]
+UINPUT_USER_DEV = struct.Struct(f'<80sHHHHI{ABS_CNT * 4}i')
+UINPUT_DEVICE_NAME = 'Touch Player Virtual Touchscreen'
+
+
+def root_window_size(display=None):
+    """Größe des X Root-Fensters (alle Monitore) über libX11"""
+    x11 = ctypes.cdll.LoadLibrary(ctypes.util.find_library('X11') or 'libX11.so.6')
+    x11.XOpenDisplay.restype = ctypes.c_void_p
+    x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+    x11.XDefaultScreen.argtypes = [ctypes.c_void_p]
+    x11.XDisplayWidth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    x11.XDisplayHeight.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+
+    display = display or os.environ.get('DISPLAY')
+    dpy = x11.XOpenDisplay(display.encode() if display else None)
+    if not dpy:
+        raise OSError(f"X Display '{display}' nicht erreichbar")
+    try:
+        screen = x11.XDefaultScreen(dpy)
+        return x11.XDisplayWidth(dpy, screen), x11.XDisplayHeight(dpy, screen)
+    finally:
+        x11.XCloseDisplay(dpy)
+
+
+class UinputTouchBackend:
+    """Virtueller Multi-Touch Touchscreen (MT Protokoll B) über /dev/uinput
+
+    Der Achsenbereich entspricht dem Root-Fenster, damit X die Koordinaten 1:1
+    abbildet. Events werden gepuffert und pro sync() in einem write() übergeben.
+    """
+
+    name = "uinput"
+    multitouch = True
+    keyboard = False
+
+    def __init__(self, display=None, screen_size=None, max_slots=10, device_path='/dev/uinput'):
+        self.width, self.height = screen_size or root_window_size(display)
+        self.max_slots = max_slots
+        self.event = struct.Struct(EVENT_FORMAT)
+        self.buffer = []
+        self.active = set()
+        self.slot = None
+        self.next_tracking_id = 1
+
+        try:
+            self.fd = os.open(device_path, os.O_WRONLY | os.O_NONBLOCK)
+        except OSError as e:
+            raise OSError(f"{device_path} nicht beschreibbar ({e.strerror}) - Rechte/udev-Regel prüfen") from e
+        try:
+            self._create()
+        except OSError:
+            os.close(self.fd)
+            self.fd = None
+            raise
+
+    def _create(self):
+        for ev_type in (EV_SYN, EV_KEY, EV_ABS):
+            fcntl.ioctl(self.fd, UI_SET_EVBIT, ev_type)
+        fcntl.ioctl(self.fd, UI_SET_KEYBIT, BTN_TOUCH)
+        fcntl.ioctl(self.fd, UI_SET_PROPBIT, INPUT_PROP_DIRECT)
+
+        absmax = [0] * ABS_CNT
+        ranges = {
+            ABS_X: self.width - 1, ABS_Y: self.height - 1,
+            ABS_MT_SLOT: self.max_slots - 1, ABS_MT_TRACKING_ID: 65535,
+            ABS_MT_POSITION_X: self.width - 1, ABS_MT_POSITION_Y: self.height - 1,
+        }
+        for code, maximum in ranges.items():
+            fcntl.ioctl(self.fd, UI_SET_ABSBIT, code)
+            absmax[code] = maximum
+        zeros = [0] * ABS_CNT
+        os.write(self.fd, UINPUT_USER_DEV.pack(UINPUT_DEVICE_NAME.encode(), BUS_VIRTUAL,
+                                               0x1234, 0x5678, 1, 0,
+                                               *absmax, *zeros, *zeros, *zeros))
+        fcntl.ioctl(self.fd, UI_DEV_CREATE)
+        time.sleep(0.2)  # X/libinput braucht einen Moment, um das neue Gerät zu öffnen
+
+    def _queue(self, ev_type, code, value):
+        self.buffer.append(self.event.pack(0, 0, ev_type, code, value))
+
+    def _select(self, slot):
+        if slot != self.slot:
+            self._queue(EV_ABS, ABS_MT_SLOT, slot)
+            self.slot = slot
+
+    def touch_down(self, slot, x, y):
+        self._select(slot)
+        self._queue(EV_ABS, ABS_MT_TRACKING_ID, self.next_tracking_id)
+        self.next_tracking_id = (self.next_tracking_id + 1) & 0xffff
+        self._queue(EV_ABS, ABS_MT_POSITION_X, x)
+        self._queue(EV_ABS, ABS_MT_POSITION_Y, y)
+        if not self.active:
+            self._queue(EV_KEY, BTN_TOUCH, 1)
+        self.active.add(slot)
+        if slot == min(self.active):
+            self._queue(EV_ABS, ABS_X, x)
+            self._queue(EV_ABS, ABS_Y, y)
+
+    def touch_move(self, slot, x, y):
+        if slot not in self.active:
+            return
+        self._select(slot)
+        self._queue(EV_ABS, ABS_MT_POSITION_X, x)
+        self._queue(EV_ABS, ABS_MT_POSITION_Y, y)
+        if slot == min(self.active):
+            self._queue(EV_ABS, ABS_X, x)
+            self._queue(EV_ABS, ABS_Y, y)
+
+    def touch_up(self, slot):
+        if slot not in self.active:
+            return
+        self._select(slot)
+        self._queue(EV_ABS, ABS_MT_TRACKING_ID, -1)
+        self.active.discard(slot)
+        if not self.active:
+            self._queue(EV_KEY, BTN_TOUCH, 0)
+
+    def empty_frame(self):
+        """Frame ohne Kontakt-Änderung über denselben write()-Weg (für die Kalibrierung)
+
+        ABS_MT_SLOT mit dem aktuellen Slot verarbeitet der Kernel selbst, ein
+        Frame ohne weitere Daten wird nicht an Clients weitergereicht - X und
+        die App sehen nichts.
+        """
+        if self.slot is None:
+            self.slot = 0
+        self._queue(EV_ABS, ABS_MT_SLOT, self.slot)
+        self.sync()
+
+    def sync(self):
+        """Gepufferte Events mit SYN_REPORT als einen Frame schreiben"""
+        if self.buffer:
+            self._queue(EV_SYN, SYN_REPORT, 0)
+            os.write(self.fd, b''.join(self.buffer))
+            self.buffer = []
+
+    def close(self):
+        if self.fd is not None:
+            for slot in list(self.active):
+                self.touch_up(slot)
+            self.sync()
+            try:
+                fcntl.ioctl(self.fd, UI_DEV_DESTROY)
+            finally:
+                os.close(self.fd)
+                self.fd = None
+
+
+BACKENDS = {
+    XTestBackend.name: XTestBackend,
+    XdotoolBackend.name: XdotoolBackend,
+    UinputTouchBackend.name: UinputTouchBackend,
+}
+
+
+def open_backend(name="auto", display=None):
+    """Öffne ein Injection-Backend - "auto" versucht XTest, dann xdotool"""
+    if name != "auto":
+        return BACKENDS[name](display)
+
+    errors = []
+    for backend_class in (XTestBackend, XdotoolBackend):
+        try:
+            return backend_class(display)
+        except OSError as e:
+            errors.append(f"{backend_class.name}: {e}")
+    raise OSError("Kein Injection-Backend verfügbar (" + "; ".join(errors) + ")")
+
+
+class EmissionTrace:
+    """Pro ausgegebenem Event: Plan-Index, geplanter und tatsächlicher Zeitpunkt (Sekunden ab Start)
+
+    Tatsächlich = nach Rückkehr des Backend-Aufrufs; bei uinput erst nach dem
+    sync(), der den Frame schreibt (flush setzt die Zeit für den ganzen Frame).
+    """
+
+    def __init__(self):
+        self.index = array('i')
+        self.planned = array('d')
+        self.emitted = array('d')
+        self.synced = 0
+
+    def __len__(self):
+        return len(self.index)
+
+    def add(self, index, planned, emitted):
+        self.index.append(index)
+        self.planned.append(planned)
+        self.emitted.append(emitted)
+
+    def flush(self, emitted):
+        """Alle seit dem letzten flush gepufferten Events gelten als zu emitted ausgegeben"""
+        for i in range(self.synced, len(self.emitted)):
+            self.emitted[i] = emitted
+        self.synced = len(self.emitted)
+
+    def lateness_ms(self):
+        return array('d', ((e - p) * 1000.0 for p, e in zip(self.planned, self.emitted)))
+
+    def rows(self, plan):
+        """(event, gesture, op, slot, planned_ms, actual_ms, lateness_ms) pro Event"""
+        for n, (i, planned, emitted) in enumerate(zip(self.index, self.planned, self.emitted)):
+            yield (n, plan.gesture[i], OP_NAMES[plan.op[i]], plan.slot[i], round(planned * 1000.0, 3),
+                   round(emitted * 1000.0, 3), round((emitted - planned) * 1000.0, 3))
+
+    def report(self, plan, worst=5):
+        """Verspätung der Ausgabe (p50/p95/p99/max), kumulierte Drift und schlechteste Gesten"""
+        lateness = self.lateness_ms()
+        tail = max(1, len(lateness) // 10)
+        return {
+            'events': len(lateness),
+            'lateness': summarize_lateness(lateness),
+            # Absolute Deadlines: Drift = Verspätung am Ende; Trend = letztes minus erstes Zehntel
+            'drift_ms': lateness[-1] if lateness else 0.0,
+            'drift_trend_ms': (sum(lateness[-tail:]) - sum(lateness[:tail])) / tail if lateness else 0.0,
+            'worst_gestures': worst_gestures((plan.gesture[i] for i in self.index), lateness, worst),
+        }
+
+
+class DeadlineScheduler:
+    """Absolute monotone Deadlines: grober Sleep, dann kurzes Spin-Wait"""
+
+    def __init__(self, spin_threshold=0.002):
+        self.spin_threshold = spin_threshold  # Sekunden vor der Deadline, ab denen gespinnt wird
+        self.origin = None
+
+    def start(self):
+        self.origin = time.perf_counter()
+
+    def wait_until(self, offset):
+        """Warte bis origin + offset (Sekunden); liefert die Verspätung in Sekunden"""
+        deadline = self.origin + offset
+        remaining = deadline - time.perf_counter()
+        if remaining > self.spin_threshold:
+            time.sleep(remaining - self.spin_threshold)
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                # Verspätung wird nicht weitergetragen - nächste Deadline bleibt absolut
+                return now - deadline
+
+
+def calibrate_backend(backend, scheduler, point, samples=20):
+    """Kurzer Kalibrier-Burst: Median der Kosten pro Injection und der Aufwach-Verspätung (ms)
+
+    Pointer-Backends bewegen den Zeiger samples-mal zwischen point (der erste
+    Punkt des Plans - dorthin springt das Playback ohnehin) und einem Nachbarpixel.
+    uinput schreibt leere Frames (empty_frame) - echte Touches wären systemweit
+    Taps auf das erste Ziel der App. Die Deadlines liegen weiter auseinander
+    als spin_threshold, damit wie im Playback erst geschlafen und dann gespinnt wird.
+    """
+    clock = time.perf_counter
+    x, y = point
+    inject = []
+    if getattr(backend, 'multitouch', False):
+        for _ in range(samples):
+            start = clock()
+            backend.empty_frame()
+            inject.append((clock() - start) * 1000.0)
+    else:
+        for i in range(samples):
+            start = clock()
+            backend.move(x + (i & 1), y)
+            inject.append((clock() - start) * 1000.0)
+
+    wake = []
+    step = scheduler.spin_threshold + 0.001
+    scheduler.start()
+    for i in range(1, samples + 1):
+        wake.append(scheduler.wait_until(i * step) * 1000.0)
+
+    inject_ms = percentile(sorted(inject), 50)
+    wake_ms = percentile(sorted(wake), 50)
+    return {'inject_ms': round(inject_ms, 4), 'wake_ms': round(wake_ms, 4), 'lead_ms': round(inject_ms + wake_ms, 4)}
+
+
+def achievable_speed(plan, speed, cost_ms, multitouch=False):
+    """Mittlere Geschwindigkeit, die bei cost_ms pro Event erreichbar ist
+
+    Simuliert die Engine mit Vorlauf: jedes Event startet cost_ms vor seiner
+    Deadline, frühestens nach dem vorherigen. Reicht die Zeit zwischen den
+    Events nicht, läuft das Playback hinterher.
+    """
+    scale = 1.0 / (speed * 1000.0)
+    cost = cost_ms / 1000.0
+    now = 0.0
+    last_t = 0
+    for t_ms, slot in zip(plan.t, plan.slot):
+        if slot and not multitouch:
+            continue
+        due = t_ms * scale
+        now = max(now, due - cost) + cost
+        last_t = t_ms
+    if now <= 0:
+        return speed
+    return min(speed, last_t / 1000.0 / now)
+
+
+def parse_rate(text):
+    """Durchsatz-Vorgabe: 'max' = ohne Pausen (0), sonst Events pro Sekunde > 0"""
+    text = text.strip().lower()
+    if text in ('max', 'maximum', '0'):
+        return 0.0
+    try:
+        rate = float(text)
+    except ValueError:
+        rate = -1.0
+    if not rate > 0:
+        raise ValueError(f"Ungültige Rate: {text!r} (max oder Events/s > 0)")
+    return rate
+
+
+class ReplayEngine:
+    """Führt einen Aktionsplan über ein Backend mit absoluten Deadlines aus"""
+
+    def __init__(self, backend, scheduler=None):
+        self.backend = backend
+        self.scheduler = scheduler or DeadlineScheduler()
+        self.running = False
+        self.speed = 1.0
+        self.warp = None
+        self.lead = 0.0  # Sekunden, um die jedes Event vor seiner Deadline startet (kalibrierte Kosten)
+
+    @property
+    def current_speed(self):
+        """Aktuelle Geschwindigkeit (bei einer Kurve der Wert am zuletzt geplanten Event)"""
+        return self.warp.speed if self.warp else self.speed
+
+    def stop(self):
+        self.running = False
+
+    def _emit(self, op, x, y, slot):
+        if getattr(self.backend, 'multitouch', False):
+            if op == OP_MOVE:
+                self.backend.touch_move(slot, x, y)
+            elif op == OP_DOWN:
+                self.backend.touch_down(slot, x, y)
+            else:
+                self.backend.touch_up(slot)
+        elif op == OP_MOVE:
+            self.backend.move(x, y)
+        elif op == OP_DOWN:
+            self.backend.press(1)
+        else:
+            self.backend.release(1)
+
+    def play(self, plan, speed=1.0, offset=(0, 0), curve_origin=0.0, rate=None):
+        """Spiele den Plan ab; liefert Event-Anzahl, Dauer und Verspätungs-Perzentile
+
+        speed ist ein fester Faktor oder eine SpeedCurve - die Kurve wird beim
+        Planen jeder Deadline als Zeit-Warp angewendet, curve_origin ist die
+        Kurvenzeit (Sekunden) beim Start dieses Durchlaufs. Jedes Event startet
+        self.lead Sekunden vor seiner Deadline, damit es nach den Kosten des
+        Backend-Aufrufs pünktlich ankommt; effective_speed ist die erreichte
+        Geschwindigkeit (Aufnahmezeit / tatsächliche Dauer).
+
+        rate (Events/s) ignoriert das Aufnahme-Timing: das n-te ausgegebene Event
+        ist bei n / rate fällig, rate=0 gibt ohne Warten so schnell wie möglich
+        aus. Reihenfolge und Down/Up-Paare bleiben wie im Plan.
+        """
+        self.running = True
+        multitouch = getattr(self.backend, 'multitouch', False)
+        keyboard = getattr(self.backend, 'keyboard', False)
+        down = set()  # gedrückte Slots
+        keys_down = set()
+        processed = 0
+        emitted = 0
+        skipped = 0
+        lateness = array('d')  # ms pro Event (Scheduler: Aufwachen gegenüber Deadline)
+        trace = EmissionTrace()
+        clock = time.perf_counter
+        lead = self.lead
+        if rate is not None:
+            self.speed, self.warp = speed, None
+            if rate > 0:
+                interval = 1.0 / rate
+                deadline = lambda t_ms: emitted * interval
+            else:
+                lead = 0.0  # Deadline = jetzt, wait_until kehrt sofort zurück
+                deadline = lambda t_ms: clock() - origin
+        elif isinstance(speed, SpeedCurve):
+            warp = self.warp = TimeWarp(speed, curve_origin)
+            deadline = lambda t_ms: warp.deadline(t_ms / 1000.0)
+        else:
+            self.speed, self.warp = speed, None
+            scale = 1.0 / (speed * 1000.0)
+            deadline = lambda t_ms: t_ms * scale
+        offset_x, offset_y = offset
+        pending_t = None  # t_ms des noch nicht per sync() abgeschlossenen Touch-Frames
+
+        scheduler = self.scheduler
+        scheduler.start()
+        origin = scheduler.origin
+        try:
+            for t_ms, op, x, y, slot in zip(plan.t, plan.op, plan.x, plan.y, plan.slot):
+                if not self.running:
+                    break
+                processed += 1
+                if slot and not multitouch:
+                    skipped += 1  # Zeiger-Backends spielen nur den primären Kontakt
+                    continue
+                if op >= OP_KEY_DOWN:
+                    if not keyboard:
+                        skipped += 1
+                        continue
+                    due = deadline(t_ms)
+                    lateness.append(scheduler.wait_until(due - lead) * 1000.0)
+                    self.backend.key(x, op == OP_KEY_DOWN)
+                    trace.add(processed - 1, due, clock() - origin)
+                    emitted += 1
+                    if op == OP_KEY_DOWN:
+                        keys_down.add(x)
+                    else:
+                        keys_down.discard(x)
+                    continue
+                if pending_t is not None and t_ms != pending_t:
+                    # Gleichzeitige Kontakte als ein Frame - vor dem Warten abschließen
+                    self.backend.sync()
+                    trace.flush(clock() - origin)
+                    pending_t = None
+                due = deadline(t_ms)
+                late = scheduler.wait_until(due - lead)
+                self._emit(op, x + offset_x, y + offset_y, slot)
+                trace.add(processed - 1, due, clock() - origin)
+                if multitouch:
+                    pending_t = t_ms
+                lateness.append(late * 1000.0)
+                emitted += 1
+                if op == OP_DOWN:
+                    down.add(slot)
+                elif op == OP_UP:
+                    down.discard(slot)
+        finally:
+            # Nie mit gedrückter Taste / aufliegendem Kontakt zurücklassen
+            if multitouch:
+                for slot in down:
+                    self.backend.touch_up(slot)
+                self.backend.sync()
+                trace.flush(clock() - origin)
+            elif down:
+                self.backend.release(1)
+            for code in keys_down:
+                self.backend.key(code, False)
+            completed = self.running
+            self.running = False
+            elapsed = time.perf_counter() - scheduler.origin
+
+        planned = deadline(plan.t[processed - 1]) if processed else 0.0
+        recorded = plan.t[processed - 1] / 1000.0 if processed else 0.0
+        result = {
+            'events': emitted,
+            'skipped_events': skipped,
+            'planned_events': len(plan),
+            'elapsed': elapsed,
+            'planned_elapsed': planned,
+            'drift_ms': (elapsed - planned) * 1000.0,
+            'effective_speed': recorded / elapsed if recorded and elapsed > 0 else 0.0,
+            'events_per_s': emitted / elapsed if elapsed > 0 else 0.0,
+            'gestures_per_s': len(set(plan.gesture[i] for i in trace.index)) / elapsed if elapsed > 0 else 0.0,
+            'lateness': summarize_lateness(lateness),
+            'completed': completed,
+            'origin': origin,
+            'trace': trace,
+        }
+        if rate:
+            result['target_rate'] = rate
+            result['rate_shortfall'] = max(0.0, 1.0 - result['events_per_s'] / rate)
+        elif self.warp:
+            result['speed_curve'] = speed.describe()
+            result['speed_range'] = (self.warp.min_speed, self.warp.max_speed)
+            result['curve_elapsed'] = self.warp.wall
+        return result
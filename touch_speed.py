@@ -0,0 +1,195 @@
+"""
+Touch Speed - Geschwindigkeitskurven als Zeit-Warp innerhalb eines Playbacks
+
+Eine Kurve liefert die Geschwindigkeit als Funktion der Playback-Zeit (Sekunden
+seit Start). TimeWarp integriert dt_aufnahme/dt_playback = speed(t_playback) und
+bildet so jeden Aufnahme-Zeitpunkt auf eine Playback-Deadline ab - ohne den
+Plan oder ein Script pro Geschwindigkeit neu zu schreiben.
+"""
+
+import math
+import random
+
+MIN_SPEED = 0.05  # Untergrenze, damit der Warp endlich bleibt
+MAX_SPEED = 20.0
+
+
+class SpeedCurve:
+    """Basis: speed_at(t) mit t = Sekunden Playback-Zeit"""
+
+    def speed_at(self, t):
+        raise NotImplementedError
+
+    def describe(self):
+        return self.__class__.__name__
+
+
+class ConstantSpeed(SpeedCurve):
+    def __init__(self, speed):
+        self.speed = speed
+
+    def speed_at(self, t):
+        return self.speed
+
+    def describe(self):
+        return f"{self.speed}x"
+
+
+class RampSpeed(SpeedCurve):
+    """Linear von start nach end über duration Sekunden, danach end"""
+
+    def __init__(self, start, end, duration):
+        self.start = start
+        self.end = end
+        self.duration = max(duration, 1e-9)
+
+    def speed_at(self, t):
+        progress = min(1.0, t / self.duration)
+        return self.start + (self.end - self.start) * progress
+
+    def describe(self):
+        return f"Rampe {self.start}x → {self.end}x in {self.duration:g}s"
+
+
+class SineSpeed(SpeedCurve):
+    """base ± amplitude mit Periode period Sekunden"""
+
+    def __init__(self, base, amplitude, period):
+        self.base = base
+        self.amplitude = amplitude
+        self.period = max(period, 1e-9)
+
+    def speed_at(self, t):
+        return self.base + self.amplitude * math.sin(2 * math.pi * t / self.period)
+
+    def describe(self):
+        return f"Sinus {self.base}x ±{self.amplitude} / {self.period:g}s"
+
+
+class StepSpeed(SpeedCurve):
+    """Stufentabelle [(ab_sekunde, speed), ...]; vor der ersten Stufe gilt deren Speed"""
+
+    def __init__(self, steps):
+        if not steps:
+            raise ValueError("Stufentabelle ist leer")
+        self.steps = sorted(steps)
+
+    def speed_at(self, t):
+        speed = self.steps[0][1]
+        for start, value in self.steps:
+            if t < start:
+                break
+            speed = value
+        return speed
+
+    def describe(self):
+        return "Stufen " + ", ".join(f"{start:g}s={speed}x" for start, speed in self.steps)
+
+
+class RandomWalkSpeed(SpeedCurve):
+    """Zufallsweg mit Seed: alle interval Sekunden ±step, begrenzt auf [minimum, maximum], linear interpoliert"""
+
+    def __init__(self, seed, start=1.0, minimum=0.5, maximum=2.0, step=0.2, interval=1.0):
+        self.seed = seed
+        self.minimum = minimum
+        self.maximum = maximum
+        self.step = step
+        self.interval = max(interval, 1e-9)
+        self.rng = random.Random(seed)
+        self.values = [max(minimum, min(maximum, start))]
+
+    def _value(self, index):
+        while len(self.values) <= index:
+            value = self.values[-1] + self.rng.uniform(-self.step, self.step)
+            self.values.append(max(self.minimum, min(self.maximum, value)))
+        return self.values[index]
+
+    def speed_at(self, t):
+        position = max(0.0, t) / self.interval
+        index = int(position)
+        a = self._value(index)
+        b = self._value(index + 1)
+        return a + (b - a) * (position - index)
+
+    def describe(self):
+        return f"Random Walk seed={self.seed} {self.minimum}x-{self.maximum}x ±{self.step}/{self.interval:g}s"
+
+
+class TimeWarp:
+    """Aufnahme-Zeit → Playback-Deadline (Sekunden) für eine Kurve, monoton fortschreitend
+
+    Integration in Playback-Schritten von höchstens resolution; Abfragen müssen
+    aufsteigend erfolgen, wie im sortierten Replay-Plan.
+    origin verschiebt den Kurvenanfang (Kurve läuft über mehrere Durchläufe weiter).
+    """
+
+    def __init__(self, curve, origin=0.0, resolution=0.005):
+        self.curve = curve
+        self.origin = origin
+        self.resolution = resolution
+        self.wall = 0.0      # Playback-Sekunden seit Start
+        self.recorded = 0.0  # Aufnahme-Sekunden bis wall
+        self.speed = self._speed(0.0)
+        self.min_speed = self.speed
+        self.max_speed = self.speed
+
+    def _speed(self, wall):
+        return max(MIN_SPEED, min(MAX_SPEED, self.curve.speed_at(self.origin + wall)))
+
+    def deadline(self, recorded):
+        """Playback-Offset in Sekunden, zu dem der Aufnahme-Zeitpunkt recorded (Sekunden) fällig ist"""
+        step = self.resolution
+        wall = self.wall
+        done = self.recorded
+        speed = self.speed
+        while done < recorded:
+            # Höchstens ein Schritt pro Iteration, der letzte endet genau auf recorded
+            dt = (recorded - done) / speed
+            if dt > step:
+                dt = step
+                done += speed * step
+            else:
+                done = recorded
+            wall += dt
+            speed = self._speed(wall)
+            if speed < self.min_speed:
+                self.min_speed = speed
+            elif speed > self.max_speed:
+                self.max_speed = speed
+        self.wall, self.recorded, self.speed = wall, done, speed
+        return wall
+
+
+def parse_curve(text):
+    """Kurve aus Kurzform: ramp:START:END:SEK, sine:BASIS:AMPL:PERIODE,
+    steps:SEK=SPEED,SEK=SPEED,..., walk:SEED[:MIN:MAX[:STEP[:INTERVALL]]] oder eine Zahl"""
+    kind, _, args = text.strip().partition(':')
+    kind = kind.lower()
+    try:
+        if not args:
+            return ConstantSpeed(float(kind))
+        if kind == 'ramp':
+            start, end, duration = (float(v) for v in args.split(':'))
+            return RampSpeed(start, end, duration)
+        if kind == 'sine':
+            base, amplitude, period = (float(v) for v in args.split(':'))
+            return SineSpeed(base, amplitude, period)
+        if kind == 'steps':
+            steps = []
+            for item in args.split(','):
+                start, _, speed = item.partition('=')
+                steps.append((float(start), float(speed)))
+            return StepSpeed(steps)
+        if kind == 'walk':
+            values = args.split(':')
+            seed = int(values[0])
+            numbers = [float(v) for v in values[1:]]
+            if len(numbers) not in (0, 2, 3, 4):
+                raise ValueError
+            minimum, maximum = numbers[:2] if numbers else (0.5, 2.0)
+            step = numbers[2] if len(numbers) > 2 else 0.2
+            interval = numbers[3] if len(numbers) > 3 else 1.0
+            return RandomWalkSpeed(seed, (minimum + maximum) / 2, minimum, maximum, step, interval)
+    except ValueError:
+        pass
+    raise ValueError(f"Ungültige Speed-Kurve: '{text}'")
@@ -0,0 +1,138 @@
+"""
+Touch Stats - Perzentile und Timing-Zusammenfassungen
+"""
+
+from array import array
+
+
+def percentile(sorted_values, p):
+    """Perzentil (0-100) einer sortierten Liste, linear interpoliert"""
+    if not sorted_values:
+        return 0.0
+    if len(sorted_values) == 1:
+        return float(sorted_values[0])
+    rank = (len(sorted_values) - 1) * p / 100.0
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def summarize_lateness(lateness_ms, tolerance_ms=1.0):
+    """p50/p95/p99/max und Anteil innerhalb der Toleranz für Verspätungen in ms"""
+    values = sorted(lateness_ms)
+    if not values:
+        return {'count': 0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0, 'within_tolerance': 1.0}
+    within = sum(1 for v in values if v <= tolerance_ms)
+    return {
+        'count': len(values),
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+        'max': values[-1],
+        'within_tolerance': within / len(values),
+    }
+
+
+def worst_gestures(gestures, lateness_ms, count=5):
+    """Gesten mit der größten Verspätung: [{'gesture', 'events', 'max_ms', 'mean_ms'}, ...]"""
+    totals = {}
+    for gesture, late in zip(gestures, lateness_ms):
+        entry = totals.get(gesture)
+        if entry is None:
+            totals[gesture] = [1, late, late]
+        else:
+            entry[0] += 1
+            entry[1] += late
+            if late > entry[2]:
+                entry[2] = late
+    ranked = sorted(totals.items(), key=lambda item: item[1][2], reverse=True)[:count]
+    return [{'gesture': gesture, 'events': n, 'max_ms': round(worst, 3), 'mean_ms': round(total / n, 3)}
+            for gesture, (n, total, worst) in ranked]
+
+
+class LatencyHistogram:
+    """HDR-artiges Histogramm mit festen log-linearen Buckets (Nanosekunden)
+
+    Werte < 128 exakt, darüber 64 Buckets pro Zweierpotenz (max. 1.6% relativer
+    Fehler). record() kostet ein paar Integer-Operationen, keine Allokation.
+    """
+
+    SUB_BITS = 7
+    HALF = 1 << (SUB_BITS - 1)
+
+    def __init__(self, max_value=1 << 40):
+        self.max_value = max_value  # ~18 min in ns, größere Werte zählen als overflow
+        top = max_value.bit_length() - self.SUB_BITS
+        self.counts = array('Q', bytes(8 * ((top + 2) * self.HALF)))
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self.underflow = 0  # negative Werte (als 0 gezählt)
+        self.overflow = 0  # Werte > max_value (als max_value gezählt)
+
+    def record(self, value):
+        """Einen Wert (int, ns) zählen"""
+        if value < 128:
+            if value < 0:
+                self.underflow += 1
+                value = 0
+            index = value
+        else:
+            if value > self.max_value:
+                self.overflow += 1
+                value = self.max_value
+            shift = value.bit_length() - 7
+            index = (shift << 6) + (value >> shift)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """Zähler eines Histogramms mit gleicher Größe übernehmen"""
+        for index, n in enumerate(other.counts):
+            if n:
+                self.counts[index] += n
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+
+    @classmethod
+    def bucket_value(cls, index):
+        """Mittelwert des Wertebereichs eines Buckets"""
+        if index < 128:
+            return index
+        shift = (index >> 6) - 1
+        low = (index - (shift << 6)) << shift
+        return low + ((1 << shift) >> 1)
+
+    def value_at(self, p):
+        """Wert am Perzentil p (0-100)"""
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * p // 100))  # aufrunden, mind. 1
+        seen = 0
+        for index, n in enumerate(self.counts):
+            if n:
+                seen += n
+                if seen >= rank:
+                    return min(self.bucket_value(index), self.max)
+        return self.max
+
+    def summary(self, scale=1e-6):
+        """count/p50/p90/p99/p999/max/mean, Werte mit scale umgerechnet (Standard ns → ms)"""
+        if not self.count:
+            return {'count': 0, 'p50': 0.0, 'p90': 0.0, 'p99': 0.0, 'p999': 0.0, 'max': 0.0, 'mean': 0.0}
+        result = {'count': self.count}
+        for name, p in (('p50', 50), ('p90', 90), ('p99', 99), ('p999', 99.9)):
+            result[name] = round(self.value_at(p) * scale, 4)
+        result['max'] = round(self.max * scale, 4)
+        result['mean'] = round(self.total / self.count * scale, 4)
+        if self.underflow:
+            result['underflow'] = self.underflow
+        if self.overflow:
+            result['overflow'] = self.overflow
+        return result
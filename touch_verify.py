@@ -0,0 +1,623 @@
+"""
+Touch Verify - Abgespielte Events mitschneiden und mit dem Replay-Plan abgleichen
+
+Quellen: XInput2 Raw Events am Root-Fenster (jedes X-Backend, auch unter
+Xvfb), der evdev-Knoten des virtuellen uinput-Touchscreens oder ein eigenes
+Logging-Fenster, das die zugestellten Core Events protokolliert. Der Abgleich
+ordnet die mitgeschnittenen Gesten den geplanten zu und misst pro Geste die
+räumliche (px) und zeitliche (ms) Abweichung.
+"""
+
+import os
+import glob
+import time
+import select
+import selectors
+import threading
+import ctypes
+import ctypes.util
+from bisect import bisect_left
+
+from touch_evdev import EvdevReader, SlotTracker
+from touch_replay import OP_MOVE, OP_DOWN, OP_UP, OP_KEY_DOWN, OP_KEY_UP, UINPUT_DEVICE_NAME
+from touch_stats import percentile
+
+# XInput2 (X11/extensions/XI2.h)
+GENERIC_EVENT = 35
+XI_ALL_MASTER_DEVICES = 1
+XI_RAW_KEY_PRESS = 13
+XI_RAW_KEY_RELEASE = 14
+XI_RAW_BUTTON_PRESS = 15
+XI_RAW_BUTTON_RELEASE = 16
+XI_RAW_MOTION = 17
+XI_RAW_TOUCH_BEGIN = 22
+XI_RAW_TOUCH_UPDATE = 23
+XI_RAW_TOUCH_END = 24
+XI_POINTER_EMULATED = 1 << 16
+XI_MASK_LEN = 4  # (XI_LASTEVENT >> 3) + 1 für XI 2.2
+
+
+class XGenericEventCookie(ctypes.Structure):
+    _fields_ = [('type', ctypes.c_int), ('serial', ctypes.c_ulong), ('send_event', ctypes.c_int),
+                ('display', ctypes.c_void_p), ('extension', ctypes.c_int), ('evtype', ctypes.c_int),
+                ('cookie', ctypes.c_uint), ('data', ctypes.c_void_p)]
+
+
+class XEvent(ctypes.Union):
+    _fields_ = [('type', ctypes.c_int), ('cookie', XGenericEventCookie), ('pad', ctypes.c_long * 24)]
+
+
+class XIValuatorState(ctypes.Structure):
+    _fields_ = [('mask_len', ctypes.c_int), ('mask', ctypes.POINTER(ctypes.c_ubyte)),
+                ('values', ctypes.POINTER(ctypes.c_double))]
+
+
+class XIRawEvent(ctypes.Structure):
+    _fields_ = [('type', ctypes.c_int), ('serial', ctypes.c_ulong), ('send_event', ctypes.c_int),
+                ('display', ctypes.c_void_p), ('extension', ctypes.c_int), ('evtype', ctypes.c_int),
+                ('time', ctypes.c_ulong), ('deviceid', ctypes.c_int), ('sourceid', ctypes.c_int),
+                ('detail', ctypes.c_int), ('flags', ctypes.c_int), ('valuators', XIValuatorState),
+                ('raw_values', ctypes.POINTER(ctypes.c_double))]
+
+
+class XIEventMask(ctypes.Structure):
+    _fields_ = [('deviceid', ctypes.c_int), ('mask_len', ctypes.c_int), ('mask', ctypes.POINTER(ctypes.c_ubyte))]
+
+
+def raw_position(raw):
+    """Achsen 0/1 aus der Valuator-Maske eines Raw Events (None wenn nicht gesetzt)"""
+    state = raw.valuators
+    x = y = None
+    index = 0
+    for axis in range(min(state.mask_len * 8, 16)):
+        if state.mask[axis >> 3] & (1 << (axis & 7)):
+            if axis == 0:
+                x = state.values[index]
+            elif axis == 1:
+                y = state.values[index]
+            index += 1
+    return x, y
+
+
+def server_to_local(events, server_times):
+    """Event-Zeiten durch die X Server-Zeit (ms) ersetzen, abgebildet auf perf_counter
+
+    Der Mitschnitt-Thread stempelt ein Event erst beim Abholen - bei einem
+    Rückstau (schnelle Replays) wären alle Zeiten zu spät. Der Versatz zwischen
+    den Uhren ist das Minimum aus Abholzeit minus Server-Zeit, also das am
+    schnellsten abgeholte Event (Genauigkeit ~1ms, Auflösung der Server-Zeit).
+    """
+    if not events:
+        return events
+    base = server_times[0]
+    seconds = [((t - base) & 0xffffffff) / 1000.0 for t in server_times]  # 32-bit Überlauf
+    offset = min(event[0] - t for event, t in zip(events, seconds))
+    return [(t + offset, *event[1:]) for event, t in zip(events, seconds)]
+
+
+class XInputCapture:
+    """XI2 Raw Events am Root-Fenster in einem Thread mitschneiden
+
+    Events: (perf_counter, op, x, y, slot). Raw Events werden unabhängig von
+    Fenstern und Grabs zugestellt. Positionen kommen aus den Valuators (XTest
+    meldet absolute Root-Koordinaten), Achsen ohne Änderung behalten den letzten
+    Wert. Zeiten stammen aus dem Server-Zeitstempel des Events (server_to_local).
+    """
+
+    name = "xinput"
+
+    def __init__(self, display=None):
+        self.x11 = ctypes.cdll.LoadLibrary(ctypes.util.find_library('X11') or 'libX11.so.6')
+        self.xi = ctypes.cdll.LoadLibrary(ctypes.util.find_library('Xi') or 'libXi.so.6')
+        x11, xi = self.x11, self.xi
+        x11.XOpenDisplay.restype = ctypes.c_void_p
+        x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        x11.XDefaultRootWindow.restype = ctypes.c_ulong
+        x11.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        x11.XConnectionNumber.argtypes = [ctypes.c_void_p]
+        x11.XPending.argtypes = [ctypes.c_void_p]
+        x11.XNextEvent.argtypes = [ctypes.c_void_p, ctypes.POINTER(XEvent)]
+        x11.XGetEventData.argtypes = [ctypes.c_void_p, ctypes.POINTER(XGenericEventCookie)]
+        x11.XFreeEventData.argtypes = [ctypes.c_void_p, ctypes.POINTER(XGenericEventCookie)]
+        x11.XQueryExtension.argtypes = [ctypes.c_void_p, ctypes.c_char_p] + [ctypes.POINTER(ctypes.c_int)] * 3
+        x11.XQueryPointer.argtypes = [ctypes.c_void_p, ctypes.c_ulong,
+                                      ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_ulong),
+                                      ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int),
+                                      ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int),
+                                      ctypes.POINTER(ctypes.c_uint)]
+        x11.XFlush.argtypes = [ctypes.c_void_p]
+        x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        xi.XIQueryVersion.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int)]
+        xi.XISelectEvents.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(XIEventMask), ctypes.c_int]
+
+        self.events = []
+        self.server_times = []  # X Server-Zeitstempel (ms) pro Event
+        self.position = (0, 0)  # letzte Zeigerposition (Raw Button Events tragen keine Achsen)
+        self.touches = {}  # XI Touch-ID -> Slot
+        self.running = False
+        self.thread = None
+        self.display = display or os.environ.get('DISPLAY')
+        self.dpy = x11.XOpenDisplay(self.display.encode() if self.display else None)
+        if not self.dpy:
+            raise OSError(f"X Display '{self.display}' nicht erreichbar")
+
+        opcode, first_event, first_error = ctypes.c_int(), ctypes.c_int(), ctypes.c_int()
+        major, minor = ctypes.c_int(2), ctypes.c_int(2)
+        if (not x11.XQueryExtension(self.dpy, b"XInputExtension", ctypes.byref(opcode),
+                                    ctypes.byref(first_event), ctypes.byref(first_error))
+                or xi.XIQueryVersion(self.dpy, ctypes.byref(major), ctypes.byref(minor)) != 0):
+            self.close()
+            raise OSError("XInput 2 nicht verfügbar")
+        self.opcode = opcode.value
+        self.touch = (major.value, minor.value) >= (2, 2)
+
+        self.root = x11.XDefaultRootWindow(self.dpy)
+        mask = (ctypes.c_ubyte * XI_MASK_LEN)()
+        events = [XI_RAW_KEY_PRESS, XI_RAW_KEY_RELEASE, XI_RAW_BUTTON_PRESS, XI_RAW_BUTTON_RELEASE, XI_RAW_MOTION]
+        if self.touch:
+            events += [XI_RAW_TOUCH_BEGIN, XI_RAW_TOUCH_UPDATE, XI_RAW_TOUCH_END]
+        for event in events:
+            mask[event >> 3] |= 1 << (event & 7)
+        event_mask = XIEventMask(XI_ALL_MASTER_DEVICES, XI_MASK_LEN, mask)
+        xi.XISelectEvents(self.dpy, self.root, ctypes.byref(event_mask), 1)
+        x11.XFlush(self.dpy)
+
+    def pointer(self):
+        """Aktuelle Zeigerposition in Root-Koordinaten"""
+        root, child = ctypes.c_ulong(), ctypes.c_ulong()
+        rx, ry, wx, wy = ctypes.c_int(), ctypes.c_int(), ctypes.c_int(), ctypes.c_int()
+        state = ctypes.c_uint()
+        self.x11.XQueryPointer(self.dpy, self.root, ctypes.byref(root), ctypes.byref(child), ctypes.byref(rx),
+                               ctypes.byref(ry), ctypes.byref(wx), ctypes.byref(wy), ctypes.byref(state))
+        return rx.value, ry.value
+
+    def _handle(self, evtype, raw, now):
+        if raw.flags & XI_POINTER_EMULATED:
+            return  # Zeiger-Emulation eines Touches - der Touch selbst wird erfasst
+        if evtype == XI_RAW_MOTION:
+            x, y = raw_position(raw)
+            last_x, last_y = self.position
+            self.position = (last_x if x is None else int(round(x)), last_y if y is None else int(round(y)))
+            self._append(raw, (now, OP_MOVE, *self.position, 0))
+        elif evtype in (XI_RAW_BUTTON_PRESS, XI_RAW_BUTTON_RELEASE):
+            if raw.detail == 1:
+                self._append(raw, (now, OP_DOWN if evtype == XI_RAW_BUTTON_PRESS else OP_UP, *self.position, 0))
+        elif evtype in (XI_RAW_KEY_PRESS, XI_RAW_KEY_RELEASE):
+            # X Keycode = evdev Keycode + 8
+            self._append(raw, (now, OP_KEY_DOWN if evtype == XI_RAW_KEY_PRESS else OP_KEY_UP, raw.detail - 8, 0, 0))
+        else:
+            x, y = raw_position(raw)
+            if evtype == XI_RAW_TOUCH_BEGIN:
+                used = set(self.touches.values())
+                slot = next(s for s in range(len(used) + 1) if s not in used)
+                self.touches[raw.detail] = slot
+                op = OP_DOWN
+            else:
+                slot = self.touches.get(raw.detail)
+                if slot is None:
+                    return
+                op = OP_MOVE
+                if evtype == XI_RAW_TOUCH_END:
+                    del self.touches[raw.detail]
+                    op = OP_UP
+            self._append(raw, (now, op, int(round(x or 0)), int(round(y or 0)), slot))
+
+    def _append(self, raw, event):
+        self.events.append(event)
+        self.server_times.append(raw.time)
+
+    def _run(self):
+        x11 = self.x11
+        fd = x11.XConnectionNumber(self.dpy)
+        event = XEvent()
+        cookie = event.cookie
+        clock = time.perf_counter
+        while self.running:
+            while x11.XPending(self.dpy):
+                x11.XNextEvent(self.dpy, ctypes.byref(event))
+                now = clock()
+                if (event.type == GENERIC_EVENT and cookie.extension == self.opcode
+                        and x11.XGetEventData(self.dpy, ctypes.byref(cookie))):
+                    try:
+                        raw = ctypes.cast(cookie.data, ctypes.POINTER(XIRawEvent)).contents
+                        self._handle(cookie.evtype, raw, now)
+                    finally:
+                        x11.XFreeEventData(self.dpy, ctypes.byref(cookie))
+            select.select([fd], [], [], 0.05)
+
+    def start(self):
+        self.events = []
+        self.server_times = []
+        self.position = self.pointer()  # Ausgangspunkt, bis das erste Raw Motion Event kommt
+        self.touches = {}
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Mitschnitt beenden; liefert die Events seit start() mit Server-Zeiten"""
+        self.running = False
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+        return server_to_local(self.events, self.server_times)
+
+    def close(self):
+        self.stop()
+        if self.dpy:
+            self.x11.XCloseDisplay(self.dpy)
+            self.dpy = None
+
+
+# Core Events (X11/X.h)
+KEY_PRESS = 2
+KEY_RELEASE = 3
+BUTTON_PRESS = 4
+BUTTON_RELEASE = 5
+MOTION_NOTIFY = 6
+MAP_NOTIFY = 19
+CORE_EVENT_MASK = (1 << 0) | (1 << 1) | (1 << 2) | (1 << 3) | (1 << 6) | (1 << 17)  # Key, Button, Motion, Structure
+CORE_OPS = {KEY_PRESS: OP_KEY_DOWN, KEY_RELEASE: OP_KEY_UP, BUTTON_PRESS: OP_DOWN, BUTTON_RELEASE: OP_UP,
+            MOTION_NOTIFY: OP_MOVE}
+
+
+class XInputEventCommon(ctypes.Structure):
+    """Gemeinsamer Anfang von XKeyEvent/XButtonEvent/XMotionEvent; detail = keycode bzw. button"""
+    _fields_ = [('type', ctypes.c_int), ('serial', ctypes.c_ulong), ('send_event', ctypes.c_int),
+                ('display', ctypes.c_void_p), ('window', ctypes.c_ulong), ('root', ctypes.c_ulong),
+                ('subwindow', ctypes.c_ulong), ('time', ctypes.c_ulong), ('x', ctypes.c_int), ('y', ctypes.c_int),
+                ('x_root', ctypes.c_int), ('y_root', ctypes.c_int), ('state', ctypes.c_uint),
+                ('detail', ctypes.c_uint)]
+
+
+class XWindowCapture:
+    """Eigenes bildschirmfüllendes Client-Fenster, das die zugestellten Core Events protokolliert
+
+    Misst den ganzen Weg bis zu einer Anwendung (Server-Dispatch, Fokus) statt
+    nur der Raw Events - gedacht für ein eigenes Xvfb ohne Window Manager.
+    Events: (perf_counter, op, x_root, y_root, 0), Zeiten aus dem Server-Zeitstempel (server_to_local).
+    """
+
+    name = "window"
+
+    def __init__(self, display=None, size=None):
+        self.x11 = ctypes.cdll.LoadLibrary(ctypes.util.find_library('X11') or 'libX11.so.6')
+        x11 = self.x11
+        x11.XOpenDisplay.restype = ctypes.c_void_p
+        x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        x11.XDefaultRootWindow.restype = ctypes.c_ulong
+        x11.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        x11.XDefaultScreen.argtypes = [ctypes.c_void_p]
+        x11.XDisplayWidth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDisplayHeight.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XCreateSimpleWindow.restype = ctypes.c_ulong
+        x11.XCreateSimpleWindow.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_int, ctypes.c_int,
+                                            ctypes.c_uint, ctypes.c_uint, ctypes.c_uint, ctypes.c_ulong,
+                                            ctypes.c_ulong]
+        x11.XSelectInput.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_long]
+        x11.XMapRaised.argtypes = [ctypes.c_void_p, ctypes.c_ulong]
+        x11.XSetInputFocus.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_int, ctypes.c_ulong]
+        x11.XDestroyWindow.argtypes = [ctypes.c_void_p, ctypes.c_ulong]
+        x11.XConnectionNumber.argtypes = [ctypes.c_void_p]
+        x11.XPending.argtypes = [ctypes.c_void_p]
+        x11.XNextEvent.argtypes = [ctypes.c_void_p, ctypes.POINTER(XEvent)]
+        x11.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+
+        self.events = []
+        self.server_times = []  # X Server-Zeitstempel (ms) pro Event
+        self.running = False
+        self.thread = None
+        self.window = None
+        self.display = display or os.environ.get('DISPLAY')
+        self.dpy = x11.XOpenDisplay(self.display.encode() if self.display else None)
+        if not self.dpy:
+            raise OSError(f"X Display '{self.display}' nicht erreichbar")
+
+        screen = x11.XDefaultScreen(self.dpy)
+        width, height = size or (x11.XDisplayWidth(self.dpy, screen), x11.XDisplayHeight(self.dpy, screen))
+        root = x11.XDefaultRootWindow(self.dpy)
+        self.window = x11.XCreateSimpleWindow(self.dpy, root, 0, 0, width, height, 0, 0, 0)
+        x11.XSelectInput(self.dpy, self.window, CORE_EVENT_MASK)
+        x11.XMapRaised(self.dpy, self.window)
+        self._wait_mapped()
+        x11.XSetInputFocus(self.dpy, self.window, 2, 0)  # RevertToParent, CurrentTime
+        x11.XSync(self.dpy, 0)
+
+    def _wait_mapped(self, timeout=2.0):
+        event = XEvent()
+        deadline = time.monotonic() + timeout
+        fd = self.x11.XConnectionNumber(self.dpy)
+        while time.monotonic() < deadline:
+            while self.x11.XPending(self.dpy):
+                self.x11.XNextEvent(self.dpy, ctypes.byref(event))
+                if event.type == MAP_NOTIFY:
+                    return
+            select.select([fd], [], [], 0.05)
+        self.close()
+        raise OSError("Logging-Fenster wurde nicht angezeigt")
+
+    def _run(self):
+        x11 = self.x11
+        fd = x11.XConnectionNumber(self.dpy)
+        event = XEvent()
+        core = ctypes.cast(ctypes.byref(event), ctypes.POINTER(XInputEventCommon)).contents
+        append = self.events.append
+        append_time = self.server_times.append
+        clock = time.perf_counter
+        while self.running:
+            while x11.XPending(self.dpy):
+                x11.XNextEvent(self.dpy, ctypes.byref(event))
+                now = clock()
+                op = CORE_OPS.get(event.type)
+                if op is None:
+                    continue
+                if op >= OP_KEY_DOWN:
+                    append((now, op, core.detail - 8, 0, 0))  # X Keycode = evdev Keycode + 8
+                elif op == OP_MOVE or core.detail == 1:
+                    append((now, op, core.x_root, core.y_root, 0))
+                else:
+                    continue
+                append_time(core.time)
+            select.select([fd], [], [], 0.05)
+
+    def start(self):
+        self.events = []
+        self.server_times = []
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Mitschnitt beenden; liefert die Events seit start() mit Server-Zeiten"""
+        self.running = False
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+        return server_to_local(self.events, self.server_times)
+
+    def close(self):
+        self.stop()
+        if self.dpy:
+            if self.window:
+                self.x11.XDestroyWindow(self.dpy, self.window)
+                self.window = None
+            self.x11.XCloseDisplay(self.dpy)
+            self.dpy = None
+
+
+def find_event_device(name):
+    """/dev/input/eventN eines Devices anhand des Namens (sysfs), sonst None"""
+    for path in sorted(glob.glob('/sys/class/input/event*/device/name')):
+        try:
+            with open(path) as f:
+                if f.read().strip() == name:
+                    return '/dev/input/' + path.split('/')[4]
+        except OSError:
+            continue
+    return None
+
+
+class EvdevCapture:
+    """Kernel-Events eines evdev-Knotens (z.B. virtueller uinput-Touchscreen) mitschneiden
+
+    Kernel-Zeitstempel (CLOCK_REALTIME) werden auf perf_counter umgerechnet.
+    """
+
+    name = "evdev"
+
+    def __init__(self, device_path):
+        self.reader = EvdevReader(device_path)
+        os.set_blocking(self.reader.fd, False)
+        self.events = []
+        self.running = False
+        self.thread = None
+
+    def _run(self):
+        tracker = SlotTracker()
+        append = self.events.append
+        clock_offset = time.perf_counter() - time.time()
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.reader.fd, selectors.EVENT_READ)
+            while self.running:
+                if not selector.select(0.05):
+                    continue
+                try:
+                    frames = self.reader.read_frames()
+                except BlockingIOError:
+                    continue
+                for kernel_time, events in frames or ():
+                    tracker.update(events)
+                    now = kernel_time + clock_offset
+                    for slot in tracker.began:
+                        append((now, OP_DOWN, *tracker.positions[slot], slot))
+                    for slot in tracker.moved:
+                        if slot not in tracker.began and slot in tracker.ids:
+                            append((now, OP_MOVE, *tracker.positions[slot], slot))
+                    for slot in tracker.ended:
+                        append((now, OP_UP, *tracker.positions.get(slot, (0, 0)), slot))
+
+    def start(self):
+        self.events = []
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+        return self.events
+
+    def close(self):
+        self.stop()
+        self.reader.close()
+
+
+def open_capture(backend, display=None):
+    """Mitschnitt passend zum Backend: evdev-Knoten des uinput-Geräts, sonst XInput2"""
+    if getattr(backend, 'name', None) == 'uinput':
+        device_path = find_event_device(UINPUT_DEVICE_NAME)
+        if device_path:
+            try:
+                return EvdevCapture(device_path)
+            except OSError:
+                pass  # keine Leserechte - XInput2 versuchen
+    return XInputCapture(display)
+
+
+# ---------------------------------------------------------------------------
+# Abgleich
+# ---------------------------------------------------------------------------
+
+def split_gestures(events):
+    """Events in Gesten zerlegen: Kontakt(e) vom ersten Down bis alle oben, Tasten von Down bis Up
+
+    Liefert [{'key': bool, 'start', 'end', 'points': {slot: [(t, x, y), ...]}}, ...]
+    """
+    gestures = []
+    current = None
+    active = set()
+    keys = {}
+    for t, op, x, y, slot in events:
+        if op == OP_KEY_DOWN:
+            keys[x] = {'key': True, 'start': t, 'end': t, 'points': {}}
+            gestures.append(keys[x])
+        elif op == OP_KEY_UP:
+            if x in keys:
+                keys.pop(x)['end'] = t
+        elif op == OP_DOWN:
+            if current is None:
+                current = {'key': False, 'start': t, 'end': t, 'points': {}}
+                gestures.append(current)
+            active.add(slot)
+            current['points'].setdefault(slot, []).append((t, x, y))
+        elif current is not None and slot in active:
+            current['points'][slot].append((t, x, y))
+            current['end'] = t
+            if op == OP_UP:
+                active.discard(slot)
+                if not active:
+                    current = None
+    return gestures
+
+
+def planned_gestures(plan, trace, offset=(0, 0)):
+    """Geplante Gesten der tatsächlich ausgegebenen Plan-Einträge (wie split_gestures)
+
+    start/end sind Deadlines in Sekunden; Punkte tragen die tatsächliche
+    Ausgabezeit, damit Scheduler-Verspätung nicht als Positionsfehler zählt.
+    """
+    offset_x, offset_y = offset
+    gestures = {}
+    for i, due, emitted in zip(trace.index, trace.planned, trace.emitted):
+        gesture_id = plan.gesture[i]
+        op = plan.op[i]
+        gesture = gestures.get(gesture_id)
+        if gesture is None:
+            gesture = gestures[gesture_id] = {'gesture': gesture_id, 'key': op >= OP_KEY_DOWN,
+                                              'start': due, 'end': due, 'emitted_start': emitted, 'points': {}}
+        gesture['end'] = due
+        if op < OP_KEY_DOWN:
+            gesture['points'].setdefault(plan.slot[i], []).append((emitted, plan.x[i] + offset_x,
+                                                                   plan.y[i] + offset_y))
+    return sorted(gestures.values(), key=lambda gesture: gesture['start'])
+
+
+def compare_gesture(planned, captured, window=0.005):
+    """Abweichung einer Geste: Start/Ende (ms), Punkt-Jitter (ms) und Position (px)
+
+    Start/Ende gegen die Deadlines; für den Punktvergleich wird die Zustell-Latenz
+    der Geste (erstes Event gegenüber seiner Ausgabe) abgezogen. Jeder geplante Punkt
+    wird mit dem räumlich nächsten mitgeschnittenen Punkt innerhalb ±window
+    Sekunden verglichen (mehrere Punkte können denselben Zeitstempel haben);
+    ohne Kandidaten im Fenster mit dem zeitlich nächsten.
+    """
+    start_ms = (captured['start'] - planned['start']) * 1000.0
+    end_ms = (captured['end'] - planned['end']) * 1000.0
+    shift = captured['start'] - planned.get('emitted_start', planned['start'])
+    distances = []
+    jitter = 0.0
+    for slot, points in planned['points'].items():
+        observed = captured['points'].get(slot)
+        if not observed:
+            continue
+        times = [t - shift for t, _, _ in observed]
+        for t, x, y in points:
+            low = bisect_left(times, t - window)
+            high = bisect_left(times, t + window, low)
+            if low == high:
+                # Kein Punkt im Fenster - zeitlich nächster
+                low = low - 1 if low == len(times) or (low and t - times[low - 1] < times[low] - t) else low
+                high = low + 1
+            best = min(range(low, high), key=lambda k: (observed[k][1] - x) ** 2 + (observed[k][2] - y) ** 2)
+            _, cx, cy = observed[best]
+            distances.append(((cx - x) ** 2 + (cy - y) ** 2) ** 0.5)
+            jitter = max(jitter, abs(times[best] - t) * 1000.0)
+    missing = sum(len(points) for slot, points in planned['points'].items() if slot not in captured['points'])
+    return {
+        'start_ms': round(start_ms, 3),
+        'end_ms': round(end_ms, 3),
+        'jitter_ms': round(jitter, 3),
+        'px_mean': round(sum(distances) / len(distances), 3) if distances else 0.0,
+        'px_max': round(max(distances), 3) if distances else 0.0,
+        'points': sum(len(points) for points in planned['points'].values()),
+        'captured': sum(len(points) for points in captured['points'].values()),
+        'missing_points': missing,
+    }
+
+
+def verify(plan, trace, captured, origin, offset=(0, 0), px_tolerance=1.0, ms_tolerance=10.0, match_window=0.5):
+    """Mitschnitt (perf_counter-Zeiten) gegen die geplanten Gesten abgleichen
+
+    origin ist der Startzeitpunkt der Engine (perf_counter). Gesten werden in
+    Reihenfolge zugeordnet; eine mitgeschnittene Geste zählt nur, wenn sie
+    innerhalb von match_window Sekunden nach der geplanten beginnt.
+    """
+    planned = planned_gestures(plan, trace, offset)
+    observed = split_gestures([(t - origin, op, x, y, slot) for t, op, x, y, slot in captured])
+
+    results = []
+    used = set()
+    j = 0
+    for expected in planned:
+        match = None
+        for k in range(j, len(observed)):
+            candidate = observed[k]
+            if candidate['start'] - expected['start'] > match_window:
+                break
+            if k not in used and candidate['key'] == expected['key'] \
+                    and candidate['start'] >= expected['start'] - match_window:
+                match = k
+                break
+        entry = {'gesture': expected['gesture'], 'kind': 'key' if expected['key'] else 'touch'}
+        if match is None:
+            entry['matched'] = False
+        else:
+            used.add(match)
+            while j in used:
+                j += 1
+            entry['matched'] = True
+            entry.update(compare_gesture(expected, observed[match]))
+        results.append(entry)
+
+    matched = [r for r in results if r['matched']]
+    latencies = sorted(abs(r['start_ms']) for r in matched)
+    spatial = sorted(r['px_max'] for r in matched)
+    summary = {
+        'gestures': len(planned),
+        'matched': len(matched),
+        'missing': len(planned) - len(matched),
+        'extra': len(observed) - len(used),
+        'latency_ms': {'p50': round(percentile(latencies, 50), 3), 'p95': round(percentile(latencies, 95), 3),
+                       'max': round(latencies[-1], 3) if latencies else 0.0},
+        'px': {'p50': round(percentile(spatial, 50), 3), 'p95': round(percentile(spatial, 95), 3),
+               'max': round(spatial[-1], 3) if spatial else 0.0},
+        'tolerance': {'px': px_tolerance, 'ms': ms_tolerance},
+    }
+    summary['passed'] = (summary['missing'] == 0 and summary['extra'] == 0
+                         and summary['px']['max'] <= px_tolerance
+                         and all(abs(r['start_ms']) <= ms_tolerance and abs(r['end_ms']) <= ms_tolerance
+                                 and not r['missing_points'] for r in matched))
+    return summary, results
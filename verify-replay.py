@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Replay-Verifikation - Recording abspielen, Eingaben mitschneiden, Abweichung prüfen
+
+Spielt ein Recording über ein Injection-Backend ab, schneidet die tatsächlich
+ankommenden Events mit (XInput2 am Root-Fenster bzw. evdev-Knoten des uinput-
+Geräts) und vergleicht sie Geste für Geste mit dem Plan. Ohne Rückfragen -
+für CI gegen Xvfb gedacht. Exit-Code 0 = alle Durchläufe innerhalb der
+Toleranz, 1 = Abweichung, 2 = Setup-Fehler.
+
+Verwendung:
+    DISPLAY=:99 python3 verify-replay.py login.trec --loops 5 --px 1 --ms 10
+    python3 verify-replay.py login.trec --display :99 --offset 0,0 --report verify.json
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from touch_format import recording_info
+from touch_replay import open_backend, ReplayEngine, PlanCache, BACKENDS
+from touch_verify import open_capture, verify
+
+# Farben
+class Colors:
+    RED = '\033[0;31m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    CYAN = '\033[0;36m'
+    GRAY = '\033[0;90m'
+    NC = '\033[0m'
+
+
+def parse_offset(text):
+    x, _, y = text.partition(',')
+    return int(x), int(y)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('recording', help='.trec oder .sh')
+    parser.add_argument('--backend', choices=['auto'] + list(BACKENDS), default='auto')
+    parser.add_argument('--display', help='X Display (Standard: $DISPLAY)')
+    parser.add_argument('--speed', type=float, default=1.0)
+    parser.add_argument('--loops', type=int, default=1)
+    parser.add_argument('--px', type=float, default=1.0, help='Toleranz Position (Standard: 1px)')
+    parser.add_argument('--ms', type=float, default=10.0, help='Toleranz Start/Ende pro Geste (Standard: 10ms)')
+    parser.add_argument('--offset', type=parse_offset,
+                        help='Monitor-Offset X,Y (Standard: aufgezeichnete Position)')
+    parser.add_argument('--settle', type=float, default=0.1, help='Wartezeit auf Nachzügler nach jedem Durchlauf (s)')
+    parser.add_argument('--report', help='Ergebnis als JSON (Zusammenfassung + Gesten pro Durchlauf)')
+    args = parser.parse_args()
+
+    try:
+        plan = PlanCache().get(args.recording)
+        meta = recording_info(args.recording).meta
+        offset = args.offset or (meta.get('monitor_x', 0), meta.get('monitor_y', 0))
+        backend = open_backend(args.backend, args.display)
+    except (OSError, ValueError) as e:
+        print(f"{Colors.RED}✗ {e}{Colors.NC}")
+        return 2
+    try:
+        capture = open_capture(backend, args.display)
+    except OSError as e:
+        backend.close()
+        print(f"{Colors.RED}✗ Mitschnitt nicht möglich: {e}{Colors.NC}")
+        return 2
+
+    print(f"{Colors.CYAN}Verifiziere {args.recording}: {len(plan)} Events, Backend {backend.name}, "
+          f"Mitschnitt {capture.name}{Colors.NC}")
+    engine = ReplayEngine(backend)
+    loops = []
+    try:
+        for loop in range(1, args.loops + 1):
+            capture.start()
+            result = engine.play(plan, args.speed, offset)
+            time.sleep(args.settle)
+            summary, gestures = verify(plan, result['trace'], capture.stop(), result['origin'], offset,
+                                       args.px, args.ms)
+            summary['source'] = capture.name
+            summary['loop'] = loop
+            summary['elapsed_s'] = round(result['elapsed'], 4)
+            loops.append({'summary': summary, 'gestures': gestures})
+
+            mark = f"{Colors.GREEN}✓" if summary['passed'] else f"{Colors.RED}✗"
+            print(f"{mark} #{loop}: {summary['matched']}/{summary['gestures']} Gesten, {summary['extra']} zusätzlich, "
+                  f"max {summary['px']['max']:.1f}px, Latenz p50 {summary['latency_ms']['p50']:.2f}ms "
+                  f"max {summary['latency_ms']['max']:.2f}ms{Colors.NC}")
+            if not result['completed']:
+                break
+    except KeyboardInterrupt:
+        engine.stop()
+    finally:
+        capture.close()
+        backend.close()
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({'recording': args.recording, 'backend': backend.name, 'speed': args.speed,
+                       'loops': loops}, f, indent=2)
+        print(f"{Colors.GRAY}Report: {args.report}{Colors.NC}")
+
+    passed = bool(loops) and all(entry['summary']['passed'] for entry in loops)
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())